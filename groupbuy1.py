@@ -1,152 +1,32 @@
+import os
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
-import datetime
-
-# ==================== USER & GROUP CLASSES ====================
-class User:
-    def __init__(self, username, password):
-        self.username = username
-        self.password = password
-        self.join_history = []
-        self.created_date = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-
-class Buyer:
-    def __init__(self, user):
-        self.user = user
-        self.final_price = 0
-        self.savings = 0
-        self.join_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-
-class GroupBuy:
-    def __init__(self, product_name, original_price, discount_percent, min_required, starter_user):
-        self.product = product_name
-        self.price = original_price
-        self.discount = discount_percent
-        self.min_required = min_required
-        self.buyers = [Buyer(starter_user)]
-        self.active = True
-        self.created_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-        self.completed_time = None
-
-    def add_buyer(self, user):
-        new_buyer = Buyer(user)
-        self.buyers.append(new_buyer)
-        user.join_history.append(f"Joined group for {self.product}")
-        return len(self.buyers)
-
-    def checkout(self):
-        current_members = len(self.buyers)
-        
-        if current_members < self.min_required:
-            self.active = False
-            fail_message = f"❌ GROUP BUY FAILED ❌\n\n"
-            fail_message += f"Product: {self.product}\n"
-            fail_message += f"Only {current_members} out of {self.min_required} required members joined.\n\n"
-            fail_message += "The group buy has been cancelled.\nBetter luck next time!"
-            return False, fail_message
-        
-        # Calculate pricing
-        discount_amount = self.price * (self.discount / 100)
-        price_per_person = self.price - discount_amount
-        total_revenue = price_per_person * current_members
-        total_savings_group = discount_amount * current_members
-
-        # Update all buyer information
-        for buyer in self.buyers:
-            buyer.final_price = price_per_person
-            buyer.savings = discount_amount
-
-        self.active = False
-        self.completed_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-
-        # Create comprehensive success message
-        success_message = f"🎉 GROUP BUY SUCCESS! 🎉\n\n"
-        success_message += f"📱 Product: {self.product}\n"
-        success_message += f"💰 Original Price: RM {self.price:.2f} per item\n"
-        success_message += f"🎯 Discount Applied: {self.discount}%\n"
-        success_message += f"💵 Final Price per Person: RM {price_per_person:.2f}\n"
-        success_message += f"💸 Individual Savings: RM {discount_amount:.2f}\n"
-        success_message += f"📊 Total Revenue for Seller: RM {total_revenue:.2f}\n"
-        success_message += f"👥 Total Participants: {current_members}\n"
-        success_message += f"🏆 Total Group Savings: RM {total_savings_group:.2f}\n\n"
-        
-        success_message += "🛒 Group Members:\n"
-        for i, buyer in enumerate(self.buyers, 1):
-            success_message += f"  {i}. {buyer.user.username} - Paid RM {buyer.final_price:.2f} (Saved RM {buyer.savings:.2f})\n"
-        
-        success_message += f"\nCompleted at: {self.completed_time}"
-        
-        return True, success_message
+
+from groupbuy_engine import (
+    GroupBuyEngine, STARTED, JOINED, COMPLETED, FAILED, ALREADY_MEMBER, ALREADY_PARTICIPATING, GROUP_CLOSED,
+    GROUP_EXPIRED, current_timestamp
+)
+from groupbuy_pricing import discount_sen, price_per_person_sen, to_percent, to_ringgit
+from groupbuy_storage import SQLiteStorage
 
 # ==================== GLOBAL APPLICATION STATE ====================
-# Product catalog
-products_catalog = [
-    {
-        "name": "Xiaomi Redmi Earbuds Pro", 
-        "price": 159.90, 
-        "discount": 30, 
-        "min_required": 3, 
-        "description": "Wireless Bluetooth earbuds with active noise cancellation and 28-hour battery life",
-        "category": "Electronics"
-    },
-    {
-        "name": "Premium iPhone 15 Case", 
-        "price": 49.90, 
-        "discount": 25, 
-        "min_required": 2, 
-        "description": "Military-grade drop protection with MagSafe compatibility and crystal clear design",
-        "category": "Accessories"
-    },
-    {
-        "name": "Smart Fitness Watch Pro", 
-        "price": 299.90, 
-        "discount": 40, 
-        "min_required": 4, 
-        "description": "Advanced health monitoring with GPS, heart rate sensor, and 7-day battery life",
-        "category": "Wearables"
-    },
-    {
-        "name": "Portable Power Bank 20000mAh", 
-        "price": 89.90, 
-        "discount": 20, 
-        "min_required": 3, 
-        "description": "Fast charging power bank with dual USB-C ports and digital display",
-        "category": "Electronics"
-    },
-    {
-        "name": "Wireless Gaming Mouse", 
-        "price": 129.90, 
-        "discount": 35, 
-        "min_required": 5, 
-        "description": "Professional gaming mouse with RGB lighting and 25000 DPI sensor",
-        "category": "Gaming"
-    },
-    {
-        "name": "Bluetooth Speaker Mini", 
-        "price": 79.90, 
-        "discount": 22, 
-        "min_required": 2, 
-        "description": "Portable waterproof speaker with 360-degree sound and 12-hour playtime",
-        "category": "Audio"
-    }
-]
-
-# Application state variables
-active_groups = []
-registered_users = {}
+# All group-buy state lives in the headless engine; the GUI only keeps widget references
+DATABASE_PATH = "groupbuy.db"
+# Optional CSV/JSON catalog file that replaces the built-in products
+CATALOG_FILE = os.environ.get("GROUPBUY_CATALOG")
+engine = GroupBuyEngine(catalog=[] if CATALOG_FILE else None, storage=SQLiteStorage(DATABASE_PATH))
+if CATALOG_FILE:
+    loaded_count, skipped_rows = engine.load_catalog(CATALOG_FILE)
+    print(f"📦 Loaded {loaded_count} products from {CATALOG_FILE} ({len(skipped_rows)} rows skipped)")
+products_catalog = engine.products_catalog
+
 current_logged_user = None
-total_seller_revenue = 0
 product_status_widgets = {}
-
-# For tracking application statistics
-app_stats = {
-    "total_groups_created": 0,
-    "successful_groups": 0,
-    "failed_groups": 0,
-    "total_users_registered": 0,
-    "total_items_sold": 0
-}
+# Retained status rows per product: {product name: {group_id: (label, button, (text, color))}}
+product_status_rows = {}
+product_status_empty_labels = {}
+product_status_more_labels = {}
 
 # ==================== UTILITY FUNCTIONS ====================
 def clear_entry_fields(*entry_widgets):
@@ -155,6 +35,10 @@ def clear_entry_fields(*entry_widgets):
         if entry and hasattr(entry, 'delete'):
             entry.delete(0, tk.END)
 
+def format_discount_tiers(steps):
+    """Describe compiled discount tiers, e.g. 3+ people 20%, 5+ people 30%"""
+    return ", ".join(f"{members}+ people {to_percent(discount_bp)}%" for members, discount_bp in steps)
+
 def create_styled_button(parent, text, bg_color, fg_color="white", command=None, width=25, height=2):
     """Create a consistent styled button"""
     return tk.Button(
@@ -171,35 +55,17 @@ def create_styled_button(parent, text, bg_color, fg_color="white", command=None,
         cursor="hand2"
     )
 
-def validate_user_input(username, password, is_registration=False):
-    """Validate user input for login/registration"""
-    if not username or not username.strip():
-        return False, "Username cannot be empty!"
-    
-    if not password or not password.strip():
-        return False, "Password cannot be empty!"
-    
-    if is_registration:
-        if len(username.strip()) < 3:
-            return False, "Username must be at least 3 characters long!"
-        
-        if len(password.strip()) < 4:
-            return False, "Password must be at least 4 characters long!"
-        
-        if username.strip() in registered_users:
-            return False, "Username already exists! Please choose a different one."
-    
-    return True, "Valid input"
+# ==================== AUTHENTICATION FUNCTIONS ====================
+# How often the Tk loop checks for password hashing running on the worker pool
+WORKER_POLL_MS = 25
 
-def update_app_statistics():
-    """Update global application statistics"""
-    app_stats["total_groups_created"] = len(active_groups)
-    app_stats["successful_groups"] = len([g for g in active_groups if not g.active and g.completed_time])
-    app_stats["failed_groups"] = len([g for g in active_groups if not g.active and not g.completed_time])
-    app_stats["total_users_registered"] = len(registered_users)
-    app_stats["total_items_sold"] = sum(len(g.buyers) for g in active_groups if not g.active and g.completed_time)
+def wait_for_engine_result(future, on_done):
+    """Call on_done(*result) from the Tk loop once a worker-pool future has finished"""
+    if future.done():
+        on_done(*future.result())
+    else:
+        main_login_window.after(WORKER_POLL_MS, wait_for_engine_result, future, on_done)
 
-# ==================== AUTHENTICATION FUNCTIONS ====================
 def register_new_user():
     """Register a new user account"""
     print("🔧 REGISTER FUNCTION CALLED")
@@ -209,61 +75,60 @@ def register_new_user():
     
     print(f"📝 Registration attempt - Username: '{username}', Password length: {len(password)}")
     
-    # Validate input
-    is_valid, error_message = validate_user_input(username, password, is_registration=True)
-    if not is_valid:
-        messagebox.showerror("Registration Error", error_message)
+    # Validate input and create new user; the password is hashed off the Tk loop
+    registration_button.configure(state="disabled")
+    wait_for_engine_result(
+        engine.submit_register_user(username, password),
+        lambda is_registered, new_user_or_error: finish_registration(username, is_registered, new_user_or_error)
+    )
+
+def finish_registration(username, is_registered, new_user_or_error):
+    """Show the registration result once the password has been hashed"""
+    registration_button.configure(state="normal")
+    if not is_registered:
+        messagebox.showerror("Registration Error", new_user_or_error)
         return
     
-    # Create new user
-    new_user = User(username, password)
-    registered_users[username] = new_user
-    app_stats["total_users_registered"] += 1
-    
     success_message = f"✅ ACCOUNT CREATED SUCCESSFULLY! ✅\n\n"
     success_message += f"Welcome {username}!\n\n"
     success_message += f"Your account has been created successfully.\n"
     success_message += f"You can now login with your credentials to start group buying!\n\n"
-    success_message += f"📊 You are user #{app_stats['total_users_registered']} to join Shopee Group Buy!"
+    success_message += f"📊 You are user #{engine.app_stats['total_users_registered']} to join Shopee Group Buy!"
     
     messagebox.showinfo("Registration Success", success_message)
     
     # Clear registration fields
     clear_entry_fields(username_reg_entry, password_reg_entry)
     
-    print(f"✅ User '{username}' registered successfully. Total users: {len(registered_users)}")
+    print(f"✅ User '{username}' registered successfully. Total users: {len(engine.registered_users)}")
 
 def login_existing_user():
     """Login with existing user credentials"""
     print("🔧 LOGIN FUNCTION CALLED")
     
-    global current_logged_user
     username = username_login_entry.get().strip()
     password = password_login_entry.get().strip()
     
     print(f"🔑 Login attempt - Username: '{username}'")
-    print(f"👥 Available users: {list(registered_users.keys())}")
-    
-    # Validate input
-    is_valid, error_message = validate_user_input(username, password, is_registration=False)
-    if not is_valid:
-        messagebox.showerror("Login Error", error_message)
-        return
-    
-    # Check if user exists
-    if username not in registered_users:
-        messagebox.showerror("Login Error", 
-                           f"Username '{username}' not found!\n\nPlease register first or check your spelling.")
-        return
+    print(f"👥 Registered users: {len(engine.registered_users)}")
     
-    # Check password
-    if registered_users[username].password != password:
-        messagebox.showerror("Login Error", 
-                           "Incorrect password!\n\nPlease try again or reset your password.")
+    # Validate input and check credentials; verification runs off the Tk loop
+    login_button.configure(state="disabled")
+    wait_for_engine_result(
+        engine.submit_authenticate_user(username, password),
+        lambda is_authenticated, user_or_error: finish_login(username, is_authenticated, user_or_error)
+    )
+
+def finish_login(username, is_authenticated, user_or_error):
+    """Open the catalog once the password has been verified"""
+    global current_logged_user
+    login_button.configure(state="normal")
+    if not is_authenticated:
+        messagebox.showerror("Login Error", user_or_error)
         return
     
     # Successful login
-    current_logged_user = registered_users[username]
+    current_logged_user = user_or_error
     
     welcome_message = f"🎉 WELCOME BACK! 🎉\n\n"
     welcome_message += f"Hello {current_logged_user.username}!\n\n"
@@ -293,6 +158,9 @@ def logout_current_user(catalog_window):
         if logout_confirmation:
             username = current_logged_user.username
             current_logged_user = None
+            # The status rows live in the catalog window; forget them before it goes
+            for product_name in list(product_status_widgets):
+                detach_product_status(product_name)
             catalog_window.destroy()
             main_login_window.deiconify()
             print(f"👋 User '{username}' logged out successfully")
@@ -306,48 +174,40 @@ def start_new_group_buy(product_info):
 
     print(f"🚀 Starting group buy for {product_info['name']}")
     
-    # Check if user is already in a group for this product
-    for existing_group in active_groups:
-        if (existing_group.active and 
-            existing_group.product == product_info["name"] and
-            any(buyer.user.username == current_logged_user.username for buyer in existing_group.buyers)):
-            
-            messagebox.showwarning(
-                "Already Participating", 
-                f"You are already participating in a group buy for {product_info['name']}!\n\n"
-                f"You cannot start another group for the same product.\n"
-                f"Wait for your current group to complete or join a different product group."
-            )
-            return
-
-    # Create new group buy
-    new_group = GroupBuy(
-        product_info["name"], 
-        product_info["price"], 
-        product_info["discount"],
-        product_info["min_required"], 
-        current_logged_user
-    )
-    
-    active_groups.append(new_group)
-    app_stats["total_groups_created"] += 1
+    # Create new group buy unless the user is already in one for this product
+    status, new_group = engine.start_group_buy(current_logged_user, product_info)
+    if status != STARTED:
+        messagebox.showwarning(
+            "Already Participating", 
+            f"You are already participating in a group buy for {product_info['name']}!\n\n"
+            f"You cannot start another group for the same product.\n"
+            f"Wait for your current group to complete or join a different product group."
+        )
+        return
     
+    show_group_started(product_info, new_group)
+    print(f"✅ Group buy created for {product_info['name']} by {current_logged_user.username}")
+
+def show_group_started(product_info, new_group):
+    """Tell the user their new group is open and refresh the product's status rows"""
+    discount_steps = new_group.pricing.steps(new_group.created_at)
     start_message = f"🚀 GROUP BUY STARTED! 🚀\n\n"
     start_message += f"📱 Product: {product_info['name']}\n"
     start_message += f"💰 Original Price: RM {product_info['price']:.2f}\n"
-    start_message += f"🎯 Discount When Complete: {product_info['discount']}% OFF\n"
-    start_message += f"💵 Final Price (if successful): RM {product_info['price'] * (1 - product_info['discount']/100):.2f}\n"
+    start_message += f"🎯 Discount When Complete: {new_group.current_discount}% OFF\n"
+    start_message += f"💵 Final Price (if successful): RM {to_ringgit(new_group.price_per_person_sen):.2f}\n"
+    if len(discount_steps) > 1:
+        start_message += f"🔓 Bigger Group, Bigger Discount: {format_discount_tiers(discount_steps)}\n"
     start_message += f"👥 Minimum People Needed: {product_info['min_required']}\n"
     start_message += f"🟢 Current Members: 1 (You)\n\n"
     start_message += f"Share this group buy with {product_info['min_required'] - 1} more friends to activate the discount!\n\n"
-    start_message += f"Group created at: {new_group.created_time}"
+    start_message += f"Group created at: {new_group.created_time}\n"
+    start_message += f"⏰ Deadline: {new_group.deadline_time} (the group fails if it is still short of the minimum by then)"
     
     messagebox.showinfo("Group Buy Started", start_message)
     
     # Update product status display
     update_product_status_display(product_info["name"])
-    
-    print(f"✅ Group buy created for {product_info['name']} by {current_logged_user.username}")
 
 def join_existing_group_buy(target_group):
     """Join an existing group buy"""
@@ -357,102 +217,194 @@ def join_existing_group_buy(target_group):
     
     print(f"🤝 Attempting to join group for {target_group.product}")
     
-    # Check if user is already in this specific group
-    if any(buyer.user.username == current_logged_user.username for buyer in target_group.buyers):
-        messagebox.showwarning("Already Joined", 
-                             f"You are already a member of this group for {target_group.product}!")
+    # Add user to the group; the engine checks out the group once it is full
+    status, join_detail = engine.join_group_buy(current_logged_user, target_group)
+    if show_join_result(target_group, status, join_detail):
+        print(f"✅ User {current_logged_user.username} joined group for {target_group.product}")
+
+def quick_join_group_buy(product_info):
+    """Join the open group closest to completion for a product, or start one if none is open"""
+    if not current_logged_user:
+        messagebox.showwarning("Authentication Required", "Please login first to join a group!")
         return
     
-    # Check if user is in another group for the same product
-    for other_group in active_groups:
-        if (other_group.active and 
-            other_group.product == target_group.product and 
-            other_group != target_group and
-            any(buyer.user.username == current_logged_user.username for buyer in other_group.buyers)):
-            
-            messagebox.showwarning(
-                "Already Participating", 
-                f"You are already in another group for {target_group.product}!\n\n"
-                f"You can only join one group per product.\n"
-                f"Complete your current group before joining another."
-            )
-            return
+    print(f"⚡ Quick join for {product_info['name']}")
+    
+    # The engine picks the group from its per-product heap, so this is O(log n) however many are open
+    status, join_detail = engine.auto_join_group_buy(current_logged_user, product_info)
+    if status == STARTED:
+        show_group_started(product_info, join_detail)
+        print(f"✅ No open group for {product_info['name']}; {current_logged_user.username} started one")
+    elif status == JOINED:
+        show_join_result(join_detail, JOINED, len(join_detail.buyers))
+        print(f"✅ User {current_logged_user.username} quick-joined group {join_detail.group_id}")
+    elif status in (COMPLETED, FAILED):
+        show_join_result(None, status, join_detail)
+    else:
+        show_join_result(join_detail, status, join_detail)
+
+def show_join_result(target_group, status, join_detail):
+    """Show the outcome of a join and refresh the product's status rows; returns True if the user joined
+
+    target_group may be None when the join checked the group out (join_detail is then the CheckoutResult).
+    """
+    if status == ALREADY_MEMBER:
+        messagebox.showwarning("Already Joined", 
+                             f"You are already a member of this group for {target_group.product}!")
+        return False
+    
+    if status == ALREADY_PARTICIPATING:
+        messagebox.showwarning(
+            "Already Participating", 
+            f"You are already in another group for {target_group.product}!\n\n"
+            f"You can only join one group per product.\n"
+            f"Complete your current group before joining another."
+        )
+        return False
     
-    # Add user to the group
-    current_member_count = target_group.add_buyer(current_logged_user)
+    if status == GROUP_CLOSED:
+        messagebox.showwarning("Group Closed", 
+                             f"This group buy for {target_group.product} has already closed!")
+        update_product_status_display(target_group.product)
+        return False
+
+    if status == GROUP_EXPIRED:
+        # The group's deadline had passed, so it was checked out without this user
+        messagebox.showwarning("Group Closed",
+                             f"This group buy for {join_detail.product} reached its deadline "
+                             f"before you joined and has closed.\n\n{join_detail.receipt}")
+        update_product_status_display(join_detail.product)
+        return False
     
     # Check if group has reached minimum requirement
-    if current_member_count >= target_group.min_required:
-        # Group is complete - process checkout
-        global total_seller_revenue
-        success, checkout_message = target_group.checkout()
-        
-        if success:
-            # Add to seller revenue
-            revenue_from_group = target_group.price * (1 - target_group.discount/100) * current_member_count
-            total_seller_revenue += revenue_from_group
-            
-            # Update statistics
-            update_app_statistics()
-            
-            messagebox.showinfo("🎉 Group Buy Complete!", checkout_message)
+    if status != JOINED:
+        # Group is complete - checkout already processed by the engine
+        if status == COMPLETED:
+            messagebox.showinfo("🎉 Group Buy Complete!", join_detail.receipt)
         else:
-            messagebox.showinfo("Group Buy Failed", checkout_message)
+            messagebox.showinfo("Group Buy Failed", join_detail.receipt)
         
-        # Update all product status displays
-        for product in products_catalog:
-            update_product_status_display(product["name"])
+        # Only this product's groups changed
+        update_product_status_display(join_detail.product)
             
     else:
         # Group still needs more members
+        current_member_count = join_detail
         join_success_message = f"✅ SUCCESSFULLY JOINED GROUP! ✅\n\n"
         join_success_message += f"📱 Product: {target_group.product}\n"
+        next_tier = target_group.next_tier()
         join_success_message += f"👥 Group Progress: {current_member_count}/{target_group.min_required} members\n"
-        join_success_message += f"🎯 Still Need: {target_group.min_required - current_member_count} more people\n"
-        join_success_message += f"💰 Current Discount: {target_group.discount}% OFF\n"
-        join_success_message += f"💵 Your Price (when complete): RM {target_group.price * (1 - target_group.discount/100):.2f}\n\n"
-        join_success_message += f"Invite more friends to complete the group and unlock the discount!"
+        if current_member_count < target_group.min_required:
+            join_success_message += f"🎯 Still Need: {target_group.min_required - current_member_count} more people\n"
+        else:
+            join_success_message += f"✅ Minimum reached: the group completes at its deadline\n"
+        join_success_message += f"⏰ Deadline: {target_group.deadline_time}\n"
+        join_success_message += f"💰 Current Discount: {target_group.current_discount}% OFF\n"
+        join_success_message += f"💵 Your Price (when complete): RM {to_ringgit(target_group.price_per_person_sen):.2f}\n"
+        if next_tier is not None:
+            join_success_message += (f"🔓 Next Tier: {next_tier[0] - current_member_count} more people "
+                                     f"→ {to_percent(next_tier[1])}% OFF\n")
+        if current_member_count < target_group.min_required:
+            join_success_message += f"\nInvite more friends to complete the group and unlock the discount!"
+        else:
+            join_success_message += f"\nInvite more friends to unlock a bigger discount!"
         
         messagebox.showinfo("Joined Group Successfully", join_success_message)
         
         # Update product status display
         update_product_status_display(target_group.product)
-    
-    print(f"✅ User {current_logged_user.username} joined group for {target_group.product}")
+    return True
+
+# Status rows shown on each catalog card before pointing to the All Groups window
+PRODUCT_STATUS_MAX_ROWS = 3
+
+def detach_product_status(product_name):
+    """Drop a product's status rows when its catalog card is recycled for another product"""
+    product_status_widgets.pop(product_name, None)
+    for group_info_label, join_group_button, _ in product_status_rows.pop(product_name, {}).values():
+        group_info_label.destroy()
+        join_group_button.destroy()
+    for labels in (product_status_empty_labels, product_status_more_labels):
+        label = labels.pop(product_name, None)
+        if label is not None:
+            label.destroy()
 
 def update_product_status_display(product_name):
-    """Update the status display for a specific product"""
+    """Update the status display for a specific product
+
+    Rows are kept between calls: only groups that opened, closed or changed
+    member count touch their widgets; every other row is reused as-is.
+    """
     if product_name not in product_status_widgets:
         return
     
     status_frame = product_status_widgets[product_name]
-    
-    # Clear existing status widgets
-    for widget in status_frame.winfo_children():
-        widget.destroy()
+    if not status_frame.winfo_exists():
+        # Its catalog window was closed; drop the stale references
+        detach_product_status(product_name)
+        return
+    rows = product_status_rows.setdefault(product_name, {})
 
-    # Find active groups for this product
-    product_active_groups = [group for group in active_groups 
-                           if group.active and group.product == product_name]
-    
+    # Find the oldest active groups for this product (catalog cards have a fixed height)
+    product_active_groups, total_open_groups = engine.open_groups_page(0, PRODUCT_STATUS_MAX_ROWS, product_name)
+    open_group_ids = {group.group_id for group in product_active_groups}
+    
+    # Point to the All Groups window when there are more groups than rows
+    more_groups_label = product_status_more_labels.get(product_name)
+    hidden_groups = total_open_groups - len(product_active_groups)
+    if hidden_groups > 0:
+        more_groups_text = f"➕ {hidden_groups} more open group(s) - see 👥 All Active Groups"
+        if more_groups_label is None:
+            more_groups_label = tk.Label(
+                status_frame, 
+                text=more_groups_text, 
+                fg="#666", 
+                bg="white",
+                font=("Arial", 9, "italic")
+            )
+            product_status_more_labels[product_name] = more_groups_label
+            more_groups_label.pack(side="bottom", anchor="w", pady=2)
+        else:
+            more_groups_label.configure(text=more_groups_text)
+    elif more_groups_label is not None:
+        more_groups_label.destroy()
+        del product_status_more_labels[product_name]
+    
+    # Remove rows for groups that have closed
+    for group_id in [group_id for group_id in rows if group_id not in open_group_ids]:
+        group_info_label, join_group_button, _ = rows.pop(group_id)
+        group_info_label.destroy()
+        join_group_button.destroy()
+    
+    no_groups_label = product_status_empty_labels.get(product_name)
     if not product_active_groups:
         # No active groups
-        no_groups_label = tk.Label(
-            status_frame, 
-            text="💡 No active groups - Be the first to start one!", 
-            fg="#999999", 
-            bg="white",
-            font=("Arial", 10, "italic")
-        )
-        no_groups_label.pack(anchor="w", pady=2)
+        if no_groups_label is None:
+            no_groups_label = tk.Label(
+                status_frame, 
+                text="💡 No active groups - Be the first to start one!", 
+                fg="#999999", 
+                bg="white",
+                font=("Arial", 10, "italic")
+            )
+            product_status_empty_labels[product_name] = no_groups_label
+            no_groups_label.pack(anchor="w", pady=2)
         return
+    
+    if no_groups_label is not None:
+        no_groups_label.destroy()
+        del product_status_empty_labels[product_name]
 
-    # Display information for each active group
+    # Add rows for new groups and refresh rows whose progress changed
     for group in product_active_groups:
         current_members = len(group.buyers)
         
-        # Group information display
-        group_info_text = f"👥 {group.buyers[0].user.username}'s group: {current_members}/{group.min_required} members"
+        # Group information display (tier lookups are O(1) in the compiled discount table)
+        group_info_text = (f"👥 {group.buyers[0].user.username}'s group: {current_members}/{group.min_required} members"
+                           f" · {group.current_discount}% OFF")
+        next_tier = group.next_tier()
+        if next_tier is not None and current_members >= group.min_required:
+            group_info_text += f" · {next_tier[0] - current_members} more → {to_percent(next_tier[1])}%"
         
         # Color coding based on progress
         if current_members >= group.min_required:
@@ -462,6 +414,14 @@ def update_product_status_display(product_name):
         else:
             info_color = "#2196F3"  # Blue - needs more people
         
+        existing_row = rows.get(group.group_id)
+        if existing_row is not None:
+            group_info_label, join_group_button, shown = existing_row
+            if shown != (group_info_text, info_color):
+                group_info_label.configure(text=group_info_text, fg=info_color)
+                rows[group.group_id] = (group_info_label, join_group_button, (group_info_text, info_color))
+            continue
+        
         group_info_label = tk.Label(
             status_frame, 
             text=group_info_text, 
@@ -489,17 +449,26 @@ def update_product_status_display(product_name):
             command=create_join_function(group)
         )
         join_group_button.pack(anchor="w", pady=2, padx=10)
+        rows[group.group_id] = (group_info_label, join_group_button, (group_info_text, info_color))
 
 # ==================== INFORMATION AND STATISTICS ====================
+# Fixed card height so the All Groups list can recycle a handful of cards
+ALL_GROUPS_ROW_HEIGHT = 220
+
 def show_all_active_groups():
-    """Display all active groups in a separate window"""
+    """Display all active groups in a separate window
+
+    The list is virtualized: only the cards inside the viewport exist, they
+    are recycled while scrolling, and each redraw asks the engine for just
+    the page of groups being shown.
+    """
     if not current_logged_user:
         messagebox.showwarning("Authentication Required", "Please login first!")
         return
 
-    currently_active_groups = [group for group in active_groups if group.active]
+    _, total_open_groups = engine.open_groups_page(0, 0)
     
-    if not currently_active_groups:
+    if not total_open_groups:
         messagebox.showinfo(
             "No Active Groups", 
             "There are no active group buys at the moment.\n\n"
@@ -526,109 +495,146 @@ def show_all_active_groups():
         fg="white"
     ).pack(expand=True)
     
+    # Visible range indicator
+    range_label = tk.Label(
+        all_groups_window, 
+        text="", 
+        font=("Arial", 10), 
+        bg="#f5f5f5", 
+        fg="#666"
+    )
+    range_label.pack(anchor="e", padx=20, pady=(8, 0))
+    
     # Main content with scrolling capability
     main_frame = tk.Frame(all_groups_window, bg="#f5f5f5")
     main_frame.pack(fill="both", expand=True, padx=15, pady=15)
     
     # Create canvas and scrollbar for scrolling
-    canvas = tk.Canvas(main_frame, bg="#f5f5f5")
+    canvas = tk.Canvas(main_frame, bg="#f5f5f5", highlightthickness=0)
     scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=canvas.yview)
-    scrollable_frame = tk.Frame(canvas, bg="#f5f5f5")
     
-    scrollable_frame.bind(
-        "<Configure>",
-        lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-    )
+    card_pool = []
+    list_state = {"total": None}
     
-    canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-    canvas.configure(yscrollcommand=scrollbar.set)
+    def join_and_close(card):
+        # Joining refreshes the affected product's status panel
+        join_existing_group_buy(card["group"])
+        all_groups_window.destroy()
     
-    # Display each active group
-    for group in currently_active_groups:
-        # Group card
-        group_card = tk.Frame(scrollable_frame, bg="white", relief="raised", bd=2)
-        group_card.pack(fill="x", pady=8, padx=5)
+    def create_group_card():
+        """Build one reusable group card and place it on the canvas"""
+        group_card = tk.Frame(canvas, bg="white", relief="raised", bd=2, height=ALL_GROUPS_ROW_HEIGHT - 16)
+        group_card.pack_propagate(False)
         
         group_content = tk.Frame(group_card, bg="white")
         group_content.pack(fill="x", padx=20, pady=15)
         
+        card = {"group": None}
+        
         # Product name
-        tk.Label(
-            group_content, 
-            text=group.product, 
-            font=("Arial", 14, "bold"), 
-            bg="white", 
-            fg="#333"
-        ).pack(anchor="w")
+        card["product_label"] = tk.Label(group_content, font=("Arial", 14, "bold"), bg="white", fg="#333")
+        card["product_label"].pack(anchor="w")
         
         # Price information
-        original_price = group.price
-        discounted_price = group.price * (1 - group.discount/100)
-        savings = original_price - discounted_price
-        
-        price_text = f"💰 RM {original_price:.2f} → RM {discounted_price:.2f} (Save RM {savings:.2f})"
-        tk.Label(
-            group_content, 
-            text=price_text, 
-            font=("Arial", 12, "bold"), 
-            bg="white", 
-            fg="#FF5722"
-        ).pack(anchor="w", pady=2)
+        card["price_label"] = tk.Label(group_content, font=("Arial", 12, "bold"), bg="white", fg="#FF5722")
+        card["price_label"].pack(anchor="w", pady=2)
         
         # Discount badge
-        discount_text = f"🎯 {group.discount}% OFF"
-        tk.Label(
+        card["discount_label"] = tk.Label(
             group_content, 
-            text=discount_text, 
             font=("Arial", 11, "bold"), 
             bg="#4CAF50", 
             fg="white",
             padx=8, 
             pady=2
-        ).pack(anchor="w", pady=2)
+        )
+        card["discount_label"].pack(anchor="w", pady=2)
         
         # Group status
-        current_members = len(group.buyers)
-        progress_text = f"👥 {current_members}/{group.min_required} people joined"
-        progress_color = "#4CAF50" if current_members >= group.min_required else "#FF9800"
-        
-        tk.Label(
-            group_content, 
-            text=progress_text, 
-            font=("Arial", 11), 
-            bg="white", 
-            fg=progress_color
-        ).pack(anchor="w", pady=2)
+        card["progress_label"] = tk.Label(group_content, font=("Arial", 11), bg="white")
+        card["progress_label"].pack(anchor="w", pady=2)
         
         # Group starter info
-        starter_text = f"Started by: {group.buyers[0].user.username} at {group.created_time}"
-        tk.Label(
-            group_content, 
-            text=starter_text, 
-            font=("Arial", 9), 
-            bg="white", 
-            fg="#666"
-        ).pack(anchor="w", pady=2)
+        card["starter_label"] = tk.Label(group_content, font=("Arial", 9), bg="white", fg="#666")
+        card["starter_label"].pack(anchor="w", pady=2)
         
         # Join button
-        def create_join_action_for_popup(target_group):
-            def join_and_close():
-                join_existing_group_buy(target_group)
-                all_groups_window.destroy()
-                # Refresh main catalog displays
-                for product in products_catalog:
-                    update_product_status_display(product["name"])
-            return join_and_close
-        
         join_button = create_styled_button(
             group_content, 
             "🚀 Join This Group", 
             "#FF5722", 
-            command=create_join_action_for_popup(group),
+            command=lambda: join_and_close(card),
             width=20,
             height=1
         )
         join_button.pack(pady=(10, 0))
+        
+        card["window_id"] = canvas.create_window((5, 0), window=group_card, anchor="nw")
+        return card
+    
+    def fill_group_card(card, group, row_index):
+        """Point a pooled card at a group and move it to that group's row"""
+        card["group"] = group
+        
+        original_price = group.price
+        discount_bp = group.current_discount_bp()
+        discounted_price = to_ringgit(price_per_person_sen(group.price_sen, discount_bp))
+        savings = to_ringgit(discount_sen(group.price_sen, discount_bp))
+        current_members = len(group.buyers)
+        next_tier = group.next_tier()
+        progress_text = f"👥 {current_members}/{group.min_required} people joined"
+        if next_tier is not None:
+            progress_text += f" · {next_tier[0]} people unlock {to_percent(next_tier[1])}% OFF"
+        
+        card["product_label"].configure(text=group.product)
+        card["price_label"].configure(
+            text=f"💰 RM {original_price:.2f} → RM {discounted_price:.2f} (Save RM {savings:.2f})")
+        card["discount_label"].configure(text=f"🎯 {to_percent(discount_bp)}% OFF")
+        card["progress_label"].configure(
+            text=progress_text,
+            fg="#4CAF50" if current_members >= group.min_required else "#FF9800")
+        card["starter_label"].configure(
+            text=f"Started by: {group.buyers[0].user.username} at {group.created_time} · ⏰ Ends {group.deadline_time}")
+        
+        canvas.coords(card["window_id"], 5, row_index * ALL_GROUPS_ROW_HEIGHT + 8)
+        canvas.itemconfigure(card["window_id"], state="normal", width=max(canvas.winfo_width() - 10, 200))
+    
+    def render_visible_rows(event=None):
+        """Fetch the page of groups in the viewport and draw it with pooled cards"""
+        if not canvas.winfo_exists():
+            return
+        first_row = max(int(canvas.canvasy(0) // ALL_GROUPS_ROW_HEIGHT), 0)
+        visible_rows = max(canvas.winfo_height() // ALL_GROUPS_ROW_HEIGHT, 1) + 2
+        page_groups, total = engine.open_groups_page(first_row, visible_rows)
+        
+        # Only touch the scroll region when the number of groups changed,
+        # otherwise every redraw would trigger another scroll callback
+        if total != list_state["total"]:
+            list_state["total"] = total
+            canvas.configure(scrollregion=(0, 0, 1, max(total, 1) * ALL_GROUPS_ROW_HEIGHT))
+        
+        while len(card_pool) < len(page_groups):
+            card_pool.append(create_group_card())
+        
+        for i, card in enumerate(card_pool):
+            if i < len(page_groups):
+                fill_group_card(card, page_groups[i], first_row + i)
+            else:
+                card["group"] = None
+                canvas.itemconfigure(card["window_id"], state="hidden")
+        
+        if page_groups:
+            range_label.configure(
+                text=f"Showing {first_row + 1}–{first_row + len(page_groups)} of {total:,} open groups")
+        else:
+            range_label.configure(text=f"{total:,} open groups")
+    
+    def on_canvas_scrolled(first, last):
+        scrollbar.set(first, last)
+        render_visible_rows()
+    
+    canvas.configure(yscrollcommand=on_canvas_scrolled, yscrollincrement=20)
+    canvas.bind("<Configure>", render_visible_rows)
     
     # Pack canvas and scrollbar
     canvas.pack(side="left", fill="both", expand=True)
@@ -638,6 +644,8 @@ def show_all_active_groups():
     def on_mousewheel(event):
         canvas.yview_scroll(int(-1*(event.delta/120)), "units")
     canvas.bind_all("<MouseWheel>", on_mousewheel)
+    
+    render_visible_rows()
 
 def show_user_statistics():
     """Show current user's group buy statistics"""
@@ -646,22 +654,10 @@ def show_user_statistics():
         return
     
     # Calculate user statistics
-    user_active_groups = []
-    user_completed_groups = []
-    user_failed_groups = []
-    total_user_savings = 0
-    
-    for group in active_groups:
-        for buyer in group.buyers:
-            if buyer.user.username == current_logged_user.username:
-                if group.active:
-                    user_active_groups.append(group)
-                elif group.completed_time:  # Successfully completed
-                    user_completed_groups.append(group)
-                    total_user_savings += buyer.savings
-                else:  # Failed group
-                    user_failed_groups.append(group)
-                break
+    user_stats = engine.user_statistics(current_logged_user)
+    user_active_groups = user_stats["active"]
+    user_completed_groups = user_stats["completed"]
+    total_user_savings = user_stats["total_savings"]
     
     # Create statistics message
     stats_message = f"📊 YOUR GROUP BUY STATISTICS 📊\n\n"
@@ -670,8 +666,8 @@ def show_user_statistics():
     
     stats_message += f"📈 ACTIVITY SUMMARY:\n"
     stats_message += f"🟡 Active Groups: {len(user_active_groups)}\n"
-    stats_message += f"✅ Completed Groups: {len(user_completed_groups)}\n"
-    stats_message += f"❌ Failed Groups: {len(user_failed_groups)}\n"
+    stats_message += f"✅ Completed Groups: {user_stats['completed_count']}\n"
+    stats_message += f"❌ Failed Groups: {user_stats['failed_count']}\n"
     stats_message += f"💰 Total Money Saved: RM {total_user_savings:.2f}\n\n"
     
     if user_active_groups:
@@ -683,54 +679,61 @@ def show_user_statistics():
     if user_completed_groups:
         stats_message += f"✅ RECENT COMPLETED GROUPS:\n"
         for group in user_completed_groups[-5:]:  # Show last 5
-            individual_savings = group.price - group.price * (1 - group.discount/100)
-            stats_message += f"  • {group.product} - Saved RM {individual_savings:.2f}\n"
+            stats_message += f"  • {group.product} - Saved RM {group.savings:.2f}\n"
         stats_message += "\n"
     
     if len(current_logged_user.join_history) > 0:
         stats_message += f"📋 RECENT ACTIVITY:\n"
         for activity in current_logged_user.join_history[-5:]:
-            stats_message += f"  • {activity}\n"
+            stats_message += f"  • {activity.description} ({activity.time})\n"
     
     messagebox.showinfo("Your Statistics", stats_message)
 
 def show_seller_revenue_dashboard():
     """Display comprehensive seller revenue dashboard"""
-    update_app_statistics()
-    
-    completed_groups = [g for g in active_groups if not g.active and g.completed_time]
-    active_group_count = len([g for g in active_groups if g.active])
+    dashboard = engine.revenue_dashboard()
     
     revenue_message = f"💰 SELLER REVENUE DASHBOARD 💰\n\n"
     revenue_message += f"📊 FINANCIAL OVERVIEW:\n"
-    revenue_message += f"💵 Total Revenue: RM {total_seller_revenue:.2f}\n"
-    revenue_message += f"✅ Completed Groups: {app_stats['successful_groups']}\n"
-    revenue_message += f"📦 Total Items Sold: {app_stats['total_items_sold']}\n"
-    revenue_message += f"🟡 Currently Active Groups: {active_group_count}\n"
-    revenue_message += f"❌ Failed Groups: {app_stats['failed_groups']}\n\n"
+    revenue_message += f"💵 Total Revenue: RM {dashboard['total_revenue']:.2f}\n"
+    revenue_message += f"🎁 Total Buyer Savings: RM {dashboard['total_savings']:.2f}\n"
+    revenue_message += f"✅ Completed Groups: {dashboard['successful_groups']}\n"
+    revenue_message += f"📦 Total Items Sold: {dashboard['total_items_sold']}\n"
+    revenue_message += f"🟡 Currently Active Groups: {dashboard['active_groups']}\n"
+    revenue_message += f"❌ Failed Groups: {dashboard['failed_groups']}\n\n"
     
-    if app_stats['successful_groups'] > 0:
-        avg_revenue = total_seller_revenue / app_stats['successful_groups']
-        revenue_message += f"📈 Average Revenue per Group: RM {avg_revenue:.2f}\n"
+    if dashboard['successful_groups'] > 0:
+        revenue_message += f"📈 Average Revenue per Group: RM {dashboard['average_revenue']:.2f}\n"
     
-    revenue_message += f"👥 Total Registered Users: {app_stats['total_users_registered']}\n"
-    revenue_message += f"🎯 Success Rate: {(app_stats['successful_groups']/(max(app_stats['total_groups_created'], 1)))*100:.1f}%\n\n"
+    revenue_message += f"👥 Total Registered Users: {dashboard['total_users_registered']}\n"
+    revenue_message += f"🎯 Success Rate: {dashboard['success_rate']:.1f}%\n\n"
     
-    if completed_groups:
+    if dashboard['top_products']:
         revenue_message += f"🏆 TOP SELLING PRODUCTS:\n"
-        product_sales = {}
-        for group in completed_groups:
-            if group.product in product_sales:
-                product_sales[group.product] += len(group.buyers)
-            else:
-                product_sales[group.product] = len(group.buyers)
-        
-        sorted_products = sorted(product_sales.items(), key=lambda x: x[1], reverse=True)
-        for i, (product, sales) in enumerate(sorted_products[:5], 1):
+        for i, (product, sales) in enumerate(dashboard['top_products'], 1):
             revenue_message += f"  {i}. {product}: {sales} units sold\n"
     
     messagebox.showinfo("Seller Revenue Dashboard", revenue_message)
 
+# Width in characters of the longest bar in the revenue trend
+TREND_BAR_WIDTH = 20
+
+def show_revenue_over_time():
+    """Display revenue for the last 24 hours and the last 14 days"""
+    trend_message = f"📈 REVENUE OVER TIME 📈\n\n"
+    for title, period, count, time_slice in (("LAST 24 HOURS", "hour", 24, slice(11, 16)),
+                                             ("LAST 14 DAYS", "day", 14, slice(0, 10))):
+        buckets = engine.revenue_over_time(period, count)
+        peak_revenue = max(bucket["revenue"] for bucket in buckets)
+        trend_message += f"🕒 {title}:\n"
+        for bucket in buckets:
+            bar = "█" * round(TREND_BAR_WIDTH * bucket["revenue"] / peak_revenue) if peak_revenue else ""
+            trend_message += (f"  {bucket['start_time'][time_slice]}  {bar} RM {bucket['revenue']:.2f} "
+                              f"({bucket['units']} units)\n")
+        trend_message += "\n"
+
+    messagebox.showinfo("Revenue Over Time", trend_message)
+
 def show_application_help():
     """Show help and instructions for using the application"""
     help_message = f"📱 SHOPEE GROUP BUY - USER GUIDE 📱\n\n"
@@ -738,6 +741,7 @@ def show_application_help():
     help_message += f"1. Choose a product you want to buy\n"
     help_message += f"2. Start a group OR join an existing group\n"
     help_message += f"3. When enough people join, everyone gets the discount!\n"
+    help_message += f"   Some products unlock bigger discounts for bigger groups\n"
     help_message += f"4. If not enough people join, the group buy fails\n\n"
     
     help_message += f"🚀 GETTING STARTED:\n"
@@ -748,7 +752,7 @@ def show_application_help():
     
     help_message += f"💡 TIPS FOR SUCCESS:\n"
     help_message += f"• Share group buys with friends to complete them faster\n"
-    help_message += f"• Join groups that are close to completion\n"
+    help_message += f"• Join groups that are close to completion ('Quick Join' picks one for you)\n"
     help_message += f"• Check 'My Stats' to track your savings\n"
     help_message += f"• You can only join one group per product\n\n"
     
@@ -763,6 +767,10 @@ def show_application_help():
     messagebox.showinfo("User Guide", help_message)
 
 # ==================== MAIN CATALOG WINDOW ====================
+# Fixed product card height so the catalog can recycle a handful of cards
+CATALOG_ROW_HEIGHT = 420
+ALL_CATEGORIES = "All Categories"
+
 def open_main_shopping_catalog():
     """Open the main shopping catalog window"""
     catalog_window = tk.Toplevel(main_login_window)
@@ -863,6 +871,12 @@ def open_main_shopping_catalog():
         command=show_seller_revenue_dashboard, width=22, height=1
     )
     revenue_button.pack(side="right")
+
+    trend_button = create_styled_button(
+        right_actions, "📈 Revenue Trend", "#673AB7",
+        command=show_revenue_over_time, width=18, height=1
+    )
+    trend_button.pack(side="right", padx=(0, 15))
     
     # ===== PRODUCTS SECTION HEADER =====
     products_header_frame = tk.Frame(main_content_frame, bg="#f8f9fa")
@@ -876,146 +890,127 @@ def open_main_shopping_catalog():
         fg="#333"
     ).pack(side="left")
     
-    # Product count
-    tk.Label(
+    # Product count (of the current search results)
+    product_count_label = tk.Label(
         products_header_frame, 
         text=f"({len(products_catalog)} items available)", 
         font=("Arial", 12), 
         bg="#f8f9fa", 
         fg="#666"
-    ).pack(side="left", padx=(10, 0))
+    )
+    product_count_label.pack(side="left", padx=(10, 0))
     
-    # ===== PRODUCTS CATALOG =====
-    # Create scrollable area for products
-    products_canvas = tk.Canvas(main_content_frame, bg="#f8f9fa")
-    products_scrollbar = ttk.Scrollbar(main_content_frame, orient="vertical", command=products_canvas.yview)
-    products_scrollable_frame = tk.Frame(products_canvas, bg="#f8f9fa")
+    # ===== SEARCH AND CATEGORY FILTER =====
+    category_choice = ttk.Combobox(
+        products_header_frame, 
+        values=[ALL_CATEGORIES] + engine.product_categories(), 
+        state="readonly", 
+        width=18, 
+        font=("Arial", 11)
+    )
+    category_choice.set(ALL_CATEGORIES)
+    category_choice.pack(side="right")
     
-    products_scrollable_frame.bind(
-        "<Configure>",
-        lambda e: products_canvas.configure(scrollregion=products_canvas.bbox("all"))
+    search_entry = tk.Entry(
+        products_header_frame, 
+        width=30, 
+        font=("Arial", 12), 
+        relief="solid", 
+        bd=2
     )
+    search_entry.pack(side="right", padx=(0, 10), ipady=4)
     
-    products_canvas.create_window((0, 0), window=products_scrollable_frame, anchor="nw")
-    products_canvas.configure(yscrollcommand=products_scrollbar.set)
+    tk.Label(
+        products_header_frame, 
+        text="🔍", 
+        font=("Arial", 12), 
+        bg="#f8f9fa"
+    ).pack(side="right", padx=(0, 4))
+    
+    # ===== PRODUCTS CATALOG =====
+    # Virtualized list: only the cards in view exist and are recycled while scrolling
+    products_canvas = tk.Canvas(main_content_frame, bg="#f8f9fa", highlightthickness=0)
+    products_scrollbar = ttk.Scrollbar(main_content_frame, orient="vertical", command=products_canvas.yview)
     
-    # Display each product
-    for product in products_catalog:
-        # Product card container
-        product_card = tk.Frame(products_scrollable_frame, bg="white", relief="raised", bd=3)
-        product_card.pack(fill="x", pady=12, padx=8)
+    product_card_pool = []
+    catalog_state = {"matches": products_catalog, "rows": None}
+    
+    def create_product_card():
+        """Build one reusable product card and place it on the canvas"""
+        product_card = tk.Frame(products_canvas, bg="white", relief="raised", bd=3, height=CATALOG_ROW_HEIGHT - 24)
+        product_card.pack_propagate(False)
         
         product_content = tk.Frame(product_card, bg="white")
         product_content.pack(fill="x", padx=25, pady=20)
         
+        card = {"product": None}
+        
         # ===== PRODUCT HEADER =====
         product_header = tk.Frame(product_content, bg="white")
         product_header.pack(fill="x", pady=(0, 8))
         
         # Product name
-        product_name_label = tk.Label(
-            product_header, 
-            text=product["name"], 
-            font=("Arial", 16, "bold"), 
-            bg="white", 
-            fg="#333"
-        )
-        product_name_label.pack(side="left")
+        card["name_label"] = tk.Label(product_header, font=("Arial", 16, "bold"), bg="white", fg="#333")
+        card["name_label"].pack(side="left")
         
         # Category badge
-        category_badge = tk.Label(
+        card["category_label"] = tk.Label(
             product_header, 
-            text=f"📂 {product['category']}", 
             font=("Arial", 10, "bold"), 
             bg="#E3F2FD", 
             fg="#1976D2",
             padx=8, 
             pady=2
         )
-        category_badge.pack(side="right")
+        card["category_label"].pack(side="right")
         
         # ===== PRODUCT DESCRIPTION =====
-        description_label = tk.Label(
+        card["description_label"] = tk.Label(
             product_content, 
-            text=product["description"], 
             font=("Arial", 11), 
             bg="white", 
             fg="#666",
             wraplength=700,
             justify="left"
         )
-        description_label.pack(anchor="w", pady=(0, 12))
+        card["description_label"].pack(anchor="w", pady=(0, 12))
         
         # ===== PRICING SECTION =====
         pricing_frame = tk.Frame(product_content, bg="white")
         pricing_frame.pack(fill="x", pady=(0, 12))
         
         # Original price
-        original_price_label = tk.Label(
-            pricing_frame, 
-            text=f"RM {product['price']:.2f}", 
-            font=("Arial", 18, "bold"), 
-            bg="white", 
-            fg="#FF5722"
-        )
-        original_price_label.pack(side="left")
+        card["price_label"] = tk.Label(pricing_frame, font=("Arial", 18, "bold"), bg="white", fg="#FF5722")
+        card["price_label"].pack(side="left")
         
         # Arrow
-        arrow_label = tk.Label(
-            pricing_frame, 
-            text="→", 
-            font=("Arial", 16, "bold"), 
-            bg="white", 
-            fg="#999"
-        )
-        arrow_label.pack(side="left", padx=(15, 15))
+        tk.Label(pricing_frame, text="→", font=("Arial", 16, "bold"), bg="white", fg="#999").pack(side="left", padx=(15, 15))
         
         # Discounted price
-        discounted_price = product['price'] * (1 - product['discount']/100)
-        discounted_price_label = tk.Label(
-            pricing_frame, 
-            text=f"RM {discounted_price:.2f}", 
-            font=("Arial", 18, "bold"), 
-            bg="white", 
-            fg="#4CAF50"
-        )
-        discounted_price_label.pack(side="left")
+        card["discounted_price_label"] = tk.Label(pricing_frame, font=("Arial", 18, "bold"), bg="white", fg="#4CAF50")
+        card["discounted_price_label"].pack(side="left")
         
         # Discount percentage badge
-        discount_badge = tk.Label(
+        card["discount_label"] = tk.Label(
             pricing_frame, 
-            text=f"-{product['discount']}% OFF", 
             font=("Arial", 12, "bold"), 
             bg="#4CAF50", 
             fg="white",
             padx=10, 
             pady=4
         )
-        discount_badge.pack(side="left", padx=(15, 0))
+        card["discount_label"].pack(side="left", padx=(15, 0))
         
         # Savings amount
-        savings_amount = product['price'] - discounted_price
-        savings_label = tk.Label(
-            pricing_frame, 
-            text=f"Save RM {savings_amount:.2f}!", 
-            font=("Arial", 12, "bold"), 
-            bg="white", 
-            fg="#4CAF50"
-        )
-        savings_label.pack(side="right")
+        card["savings_label"] = tk.Label(pricing_frame, font=("Arial", 12, "bold"), bg="white", fg="#4CAF50")
+        card["savings_label"].pack(side="right")
         
         # ===== GROUP REQUIREMENTS =====
         requirements_frame = tk.Frame(product_content, bg="white")
         requirements_frame.pack(fill="x", pady=(0, 15))
         
-        requirements_label = tk.Label(
-            requirements_frame, 
-            text=f"👥 Minimum {product['min_required']} people needed to unlock discount", 
-            font=("Arial", 12, "bold"), 
-            bg="white", 
-            fg="#666"
-        )
-        requirements_label.pack(side="left")
+        card["requirements_label"] = tk.Label(requirements_frame, font=("Arial", 12, "bold"), bg="white", fg="#666")
+        card["requirements_label"].pack(side="left")
         
         # ===== ACTION SECTION =====
         action_section = tk.Frame(product_content, bg="white")
@@ -1026,25 +1021,116 @@ def open_main_shopping_catalog():
             action_section, 
             "🚀 Start Group Buy", 
             "#FF5722", 
-            command=lambda p=product: start_new_group_buy(p),
+            command=lambda: start_new_group_buy(card["product"]),
             width=20,
             height=1
         )
         start_group_button.pack(side="right")
         
+        # Quick join button: the open group closest to completion
+        quick_join_button = create_styled_button(
+            action_section, 
+            "⚡ Quick Join", 
+            "#4CAF50", 
+            command=lambda: quick_join_group_buy(card["product"]),
+            width=14,
+            height=1
+        )
+        quick_join_button.pack(side="right", padx=(0, 10))
+        
         # ===== STATUS DISPLAY AREA =====
-        status_display_frame = tk.Frame(product_content, bg="white")
-        status_display_frame.pack(fill="x", pady=(15, 0))
+        card["status_frame"] = tk.Frame(product_content, bg="white")
+        card["status_frame"].pack(fill="x", pady=(15, 0))
+        
+        card["window_id"] = products_canvas.create_window((8, 0), window=product_card, anchor="nw")
+        return card
+    
+    def fill_product_card(card, product, row_index):
+        """Point a pooled card at a product and move it to that product's row"""
+        if card["product"] is not product:
+            if card["product"] is not None:
+                detach_product_status(card["product"]["name"])
+            card["product"] = product
+            
+            # Current discount from the product's compiled tiers and promotions
+            discount_schedule = engine.discount_schedule(product)
+            now = current_timestamp()
+            discount_bp = discount_schedule.discount_bp(product['min_required'], now)
+            discount_steps = discount_schedule.steps(now)
+            discounted_price = to_ringgit(price_per_person_sen(product['price_sen'], discount_bp))
+            savings_amount = to_ringgit(discount_sen(product['price_sen'], discount_bp))
+            card["name_label"].configure(text=product["name"])
+            card["category_label"].configure(text=f"📂 {product['category']}")
+            card["description_label"].configure(text=product["description"])
+            card["price_label"].configure(text=f"RM {product['price']:.2f}")
+            card["discounted_price_label"].configure(text=f"RM {discounted_price:.2f}")
+            card["discount_label"].configure(text=f"-{to_percent(discount_bp)}% OFF")
+            card["savings_label"].configure(text=f"Save RM {savings_amount:.2f}!")
+            requirements_text = f"👥 Minimum {product['min_required']} people needed to unlock discount"
+            if len(discount_steps) > 1:
+                requirements_text += f" · 🔓 {format_discount_tiers(discount_steps[1:])}"
+            card["requirements_label"].configure(text=requirements_text)
+            
+            # Store reference for status updates while this card shows the product
+            detach_product_status(product["name"])
+            product_status_widgets[product["name"]] = card["status_frame"]
+            update_product_status_display(product["name"])
+        
+        products_canvas.coords(card["window_id"], 8, row_index * CATALOG_ROW_HEIGHT + 12)
+        products_canvas.itemconfigure(card["window_id"], state="normal",
+                                      width=max(products_canvas.winfo_width() - 16, 300))
+    
+    def render_visible_products(event=None):
+        """Draw the search results inside the viewport with pooled cards"""
+        if not products_canvas.winfo_exists():
+            return
+        matches = catalog_state["matches"]
+        
+        # Only touch the scroll region when the result count changed,
+        # otherwise every redraw would trigger another scroll callback
+        if len(matches) != catalog_state["rows"]:
+            catalog_state["rows"] = len(matches)
+            products_canvas.configure(scrollregion=(0, 0, 1, max(len(matches), 1) * CATALOG_ROW_HEIGHT))
         
-        # Store reference for status updates
-        product_status_widgets[product["name"]] = status_display_frame
+        first_row = max(int(products_canvas.canvasy(0) // CATALOG_ROW_HEIGHT), 0)
+        visible_rows = max(products_canvas.winfo_height() // CATALOG_ROW_HEIGHT, 1) + 2
+        visible_products = matches[first_row:first_row + visible_rows]
         
-        # Initialize status display
-        update_product_status_display(product["name"])
+        while len(product_card_pool) < len(visible_products):
+            product_card_pool.append(create_product_card())
         
-        # Add separator line
-        separator_line = tk.Frame(product_content, height=1, bg="#E0E0E0")
-        separator_line.pack(fill="x", pady=(15, 0))
+        # Keep cards on the products they already show so their status rows survive scrolling
+        visible_names = {product["name"] for product in visible_products}
+        pooled_by_name = {card["product"]["name"]: card for card in product_card_pool if card["product"] is not None}
+        free_cards = [card for card in product_card_pool
+                      if card["product"] is None or card["product"]["name"] not in visible_names]
+        for offset, product in enumerate(visible_products):
+            card = pooled_by_name.get(product["name"])
+            if card is None:
+                card = free_cards.pop()
+            fill_product_card(card, product, first_row + offset)
+        for card in free_cards:
+            products_canvas.itemconfigure(card["window_id"], state="hidden")
+    
+    def apply_catalog_filter(event=None):
+        """Re-run the search and show the results from the top"""
+        category = category_choice.get()
+        catalog_state["matches"] = engine.search_products(
+            search_entry.get(), None if category == ALL_CATEGORIES else category)
+        product_count_label.configure(
+            text=f"({len(catalog_state['matches'])} of {len(products_catalog)} items shown)")
+        products_canvas.yview_moveto(0)
+        render_visible_products()
+    
+    search_entry.bind("<KeyRelease>", apply_catalog_filter)
+    category_choice.bind("<<ComboboxSelected>>", apply_catalog_filter)
+    
+    def on_products_scrolled(first, last):
+        products_scrollbar.set(first, last)
+        render_visible_products()
+    
+    products_canvas.configure(yscrollcommand=on_products_scrolled, yscrollincrement=20)
+    products_canvas.bind("<Configure>", render_visible_products)
     
     # Pack canvas and scrollbar
     products_canvas.pack(side="left", fill="both", expand=True)
@@ -1055,6 +1141,8 @@ def open_main_shopping_catalog():
         products_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
     products_canvas.bind_all("<MouseWheel>", on_products_mousewheel)
     
+    render_visible_products()
+    
     print(f"🏪 Catalog opened for user: {current_logged_user.username}")
 
 # ==================== MAIN LOGIN WINDOW SETUP ====================
@@ -1224,6 +1312,32 @@ def handle_keyboard_shortcuts(event):
 
 main_login_window.bind('<Return>', handle_keyboard_shortcuts)
 
+# ===== PERIODIC SAVE =====
+def flush_saved_state():
+    """Write queued changes to the database once a second"""
+    engine.flush()
+    main_login_window.after(1000, flush_saved_state)
+
+# Check out groups whose deadline has passed
+EXPIRY_CHECK_MS = 1000
+
+def check_expired_groups():
+    """Expire due groups once a second and tell members who are logged in"""
+    try:
+        for status, checkout_result in engine.expire_due_groups():
+            update_product_status_display(checkout_result.product)
+            print(f"⏰ Group for {checkout_result.product} expired with "
+                  f"{checkout_result.member_count}/{checkout_result.min_required} members")
+            if current_logged_user and any(buyer.user is current_logged_user for buyer in checkout_result.buyers):
+                messagebox.showinfo("⏰ Group Buy Expired", checkout_result.receipt)
+    finally:
+        # A failing display update must not stop automatic expiry for the session
+        main_login_window.after(EXPIRY_CHECK_MS, check_expired_groups)
+
+main_login_window.after(EXPIRY_CHECK_MS, check_expired_groups)
+
+main_login_window.after(1000, flush_saved_state)
+
 # ===== SET INITIAL FOCUS =====
 username_login_entry.focus()
 
@@ -1247,3 +1361,4 @@ print("✅ Application ready to use!")
 # ===== START THE APPLICATION =====
 if __name__ == "__main__":
     main_login_window.mainloop()
+    engine.close()
@@ -0,0 +1,148 @@
+"""Streaming seller revenue analytics.
+
+Every completed group is rolled into running totals once, at checkout:
+overall, per product, and per hour and per day of completion. The top
+products by units and by revenue are kept in small heaps as the totals
+grow, so the dashboard and the revenue-over-time view only read
+precomputed numbers, however many groups have closed.
+"""
+import heapq
+import time
+
+# Products kept in each top-K heap; larger requests fall back to a full scan
+TOP_K = 10
+# Hour buckets kept in memory (day buckets are all kept)
+HOURLY_BUCKETS_KEPT = 24 * 90
+
+SECONDS_PER_HOUR = 60 * 60
+
+class RevenueTotals:
+    """Revenue and savings (integer sen), units and completed groups for one product or time bucket"""
+    __slots__ = ("revenue_sen", "units", "savings_sen", "groups")
+
+    def __init__(self):
+        self.revenue_sen = 0
+        self.units = 0
+        self.savings_sen = 0
+        self.groups = 0
+
+    def add(self, revenue_sen, units, savings_sen, groups):
+        self.revenue_sen += revenue_sen
+        self.units += units
+        self.savings_sen += savings_sen
+        self.groups += groups
+
+class TopK:
+    """The k keys with the largest values, for values that only ever grow
+
+    A key outside the top k can only enter by passing the smallest member,
+    and a member only leaves when another key passes it, so each update is
+    O(log k) (O(k) when a member's own value changes).
+    """
+
+    def __init__(self, k=TOP_K):
+        self.k = k
+        self.heap = []  # (value, key) for the members, smallest first
+        self.members = {}  # key -> value as stored in the heap
+
+    def update(self, key, value):
+        """Record key's new (larger or equal) total"""
+        if key in self.members:
+            self.members[key] = value
+            self.heap = [(member_value, member) for member, member_value in self.members.items()]
+            heapq.heapify(self.heap)
+        elif len(self.heap) < self.k:
+            self.members[key] = value
+            heapq.heappush(self.heap, (value, key))
+        elif value > self.heap[0][0]:
+            _, evicted = heapq.heapreplace(self.heap, (value, key))
+            del self.members[evicted]
+            self.members[key] = value
+
+    def top(self, n=None):
+        """[(key, value)] for the largest values, largest first"""
+        ranked = sorted(self.members.items(), key=lambda item: (-item[1], item[0]))
+        return ranked if n is None else ranked[:n]
+
+def day_start(timestamp):
+    """Epoch seconds of local midnight on the day of timestamp"""
+    local = time.localtime(timestamp)
+    return timestamp - (local.tm_hour * 3600 + local.tm_min * 60 + local.tm_sec)
+
+class RevenueRollup:
+    """Incremental revenue aggregates: overall, per product, per hour and per day"""
+
+    def __init__(self, top_k=TOP_K, hourly_buckets_kept=HOURLY_BUCKETS_KEPT):
+        self.totals = RevenueTotals()
+        self.products = {}  # product name -> RevenueTotals
+        self.hourly = {}  # hour start (epoch seconds) -> RevenueTotals, oldest first
+        self.daily = {}  # local midnight (epoch seconds) -> RevenueTotals, oldest first
+        self.hourly_buckets_kept = hourly_buckets_kept
+        self.top_by_units = TopK(top_k)
+        self.top_by_revenue = TopK(top_k)
+        # Day of the most recent hour, so day_start runs once per hour, not per group
+        self.last_hour = None
+        self.last_day = None
+
+    def record(self, product, completed_at, revenue_sen, units, savings_sen, groups=1):
+        """Add a completed group (or a pre-summed bucket of groups) to every aggregate"""
+        self.totals.add(revenue_sen, units, savings_sen, groups)
+
+        product_totals = self.products.get(product)
+        if product_totals is None:
+            product_totals = self.products[product] = RevenueTotals()
+        product_totals.add(revenue_sen, units, savings_sen, groups)
+        self.top_by_units.update(product, product_totals.units)
+        self.top_by_revenue.update(product, product_totals.revenue_sen)
+
+        hour = completed_at - completed_at % SECONDS_PER_HOUR
+        hour_totals = self.hourly.get(hour)
+        if hour_totals is None:
+            hour_totals = self.hourly[hour] = RevenueTotals()
+            while len(self.hourly) > self.hourly_buckets_kept:
+                del self.hourly[min(self.hourly)]
+        hour_totals.add(revenue_sen, units, savings_sen, groups)
+
+        if hour != self.last_hour:
+            self.last_hour = hour
+            self.last_day = day_start(hour)
+        day_totals = self.daily.get(self.last_day)
+        if day_totals is None:
+            day_totals = self.daily[self.last_day] = RevenueTotals()
+        day_totals.add(revenue_sen, units, savings_sen, groups)
+
+    # ----- queries -----
+    def top_products(self, n=5, metric="units"):
+        """[(product, value)] for the n best products by "units" or "revenue_sen", best first"""
+        top_k = self.top_by_units if metric == "units" else self.top_by_revenue
+        if n <= top_k.k:
+            return top_k.top(n)
+        ranked = heapq.nsmallest(n, self.products.items(),
+                                 key=lambda item: (-getattr(item[1], metric), item[0]))
+        return [(product, getattr(totals, metric)) for product, totals in ranked]
+
+    def product_totals(self, product):
+        """RevenueTotals for one product (zeros if it never sold)"""
+        return self.products.get(product) or RevenueTotals()
+
+    def buckets(self, period="hour", count=24, now=None):
+        """The last count hour or day buckets up to now as [(start, RevenueTotals)], oldest first
+
+        Buckets without sales are included with zero totals, so the result
+        is a continuous time axis.
+        """
+        now = int(time.time()) if now is None else now
+        if period == "hour":
+            start = now - now % SECONDS_PER_HOUR
+            starts = [start - SECONDS_PER_HOUR * i for i in range(count)]
+            source = self.hourly
+        else:
+            start = day_start(now)
+            starts = []
+            for _ in range(count):
+                starts.append(start)
+                # Step back through the previous day's midday so DST changes are handled
+                start = day_start(start - 12 * SECONDS_PER_HOUR)
+            source = self.daily
+        starts.reverse()
+        return [(bucket_start, source.get(bucket_start) or RevenueTotals()) for bucket_start in starts]
@@ -0,0 +1,147 @@
+"""Compact store for closed (completed or failed) group buys.
+
+Closed groups are flattened into ArchivedGroup tuples so the engine's live
+set only holds open groups. Only the newest records stay in memory; older
+ones are appended to a JSON-lines file when a spill path is given, or
+dropped otherwise, so history never grows memory without bound.
+"""
+import collections
+import json
+
+ArchivedGroup = collections.namedtuple("ArchivedGroup", [
+    "product",
+    "price",
+    "discount",
+    "min_required",
+    "member_usernames",
+    "final_price",
+    "savings",
+    "created_at",
+    "completed_at",
+    "succeeded"
+])
+
+def archive_record_from_group(group):
+    """Flatten a closed GroupBuy into an ArchivedGroup"""
+    succeeded = bool(group.completed_at)
+    first_buyer = group.buyers[0]
+    return ArchivedGroup(
+        group.product,
+        group.price,
+        group.discount,
+        group.min_required,
+        tuple(buyer.user.username for buyer in group.buyers),
+        first_buyer.final_price if succeeded else 0,
+        first_buyer.savings if succeeded else 0,
+        group.created_at,
+        group.completed_at,
+        succeeded
+    )
+
+class GroupArchive:
+    """Closed groups with per-user and per-product lookups over the in-memory window"""
+
+    def __init__(self, max_in_memory=100000, spill_path=None):
+        self.max_in_memory = max_in_memory
+        self.spill_path = spill_path
+        self.records = collections.deque()
+        self.records_by_user = {}  # username -> deque of records, oldest first
+        self.records_by_product = {}  # product name -> deque of records, oldest first
+        self.spill_file = None
+
+        # Running totals cover every archived group, including spilled or dropped ones
+        self.total_archived = 0
+        self.successful_count = 0
+        self.failed_count = 0
+        self.items_sold = 0
+
+    def add(self, record):
+        """Archive one closed group record"""
+        self.records.append(record)
+        for username in record.member_usernames:
+            self.records_by_user.setdefault(username, collections.deque()).append(record)
+        self.records_by_product.setdefault(record.product, collections.deque()).append(record)
+
+        self.total_archived += 1
+        if record.succeeded:
+            self.successful_count += 1
+            self.items_sold += len(record.member_usernames)
+        else:
+            self.failed_count += 1
+
+        while len(self.records) > self.max_in_memory:
+            self._evict_oldest()
+
+    def add_group(self, group):
+        """Archive a closed GroupBuy and return its record"""
+        record = archive_record_from_group(group)
+        self.add(record)
+        return record
+
+    def _evict_oldest(self):
+        """Move the oldest in-memory record to the spill file (or drop it)"""
+        record = self.records.popleft()
+        # Records are appended in the same order everywhere, so the evicted
+        # record is always at the front of each of its index deques
+        for username in record.member_usernames:
+            user_records = self.records_by_user[username]
+            user_records.popleft()
+            if not user_records:
+                del self.records_by_user[username]
+        product_records = self.records_by_product[record.product]
+        product_records.popleft()
+        if not product_records:
+            del self.records_by_product[record.product]
+
+        if self.spill_path is not None:
+            if self.spill_file is None:
+                self.spill_file = open(self.spill_path, "a", encoding="utf-8")
+            self.spill_file.write(json.dumps(list(record)) + "\n")
+
+    # ----- queries -----
+    def groups_for_user(self, username):
+        """In-memory archived groups the user was a member of, oldest first"""
+        return list(self.records_by_user.get(username, ()))
+
+    def groups_for_product(self, product_name):
+        """In-memory archived groups for a product, oldest first"""
+        return list(self.records_by_product.get(product_name, ()))
+
+    def recent(self, count=10):
+        """The newest archived groups, newest first"""
+        newest = []
+        for record in reversed(self.records):
+            if len(newest) >= count:
+                break
+            newest.append(record)
+        return newest
+
+    def iter_records(self, include_spilled=True):
+        """Yield every available record, spilled ones first, oldest first"""
+        if include_spilled and self.spill_path is not None:
+            self.flush()
+            try:
+                spill_file = open(self.spill_path, encoding="utf-8")
+            except FileNotFoundError:
+                spill_file = None
+            if spill_file is not None:
+                with spill_file:
+                    for line in spill_file:
+                        values = json.loads(line)
+                        values[4] = tuple(values[4])
+                        yield ArchivedGroup(*values)
+        yield from self.records
+
+    def __len__(self):
+        return len(self.records)
+
+    def flush(self):
+        """Flush spilled records to disk"""
+        if self.spill_file is not None:
+            self.spill_file.flush()
+
+    def close(self):
+        """Close the spill file"""
+        if self.spill_file is not None:
+            self.spill_file.close()
+            self.spill_file = None
@@ -0,0 +1,256 @@
+"""Benchmark suite for the group-buy engine hot paths.
+
+Each scale N runs, on a fresh engine:
+    register         N user registrations (passwords hashed at the minimum cost, so this
+                     measures the engine rather than key derivation; see groupbuy_login_bench.py)
+    start            N start_group_buy calls (user i starts a group for product i % products)
+    join             N join_group_buy calls (user i+1 joins user i's group); joins that
+                     fill a group include its checkout and are reported as join+checkout
+    checkout         checkout_group on every group still open
+    expire           expire_due_groups on a second round of N groups once their deadlines pass
+    update_stats     update_app_statistics (incremental) and one consistency-check recount
+    dashboard        revenue_dashboard aggregation
+    search           catalog searches (prefix queries and category filters) over an
+                     N-product synthetic catalog
+
+and reports throughput, p50/p99 latency and peak memory. Results can be
+written as JSON and compared against an earlier run to spot regressions:
+
+    python groupbuy_bench.py --scales 1000,10000,100000,1000000 --output bench.json
+    python groupbuy_bench.py --compare bench.json
+"""
+import argparse
+import datetime
+import gc
+import json
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from groupbuy_catalog import CatalogSearchIndex
+from groupbuy_engine import GroupBuyEngine, COMPLETED, FAILED, JOINED, current_timestamp
+from groupbuy_passwords import PasswordHasher
+
+STATS_CALLS = 10000
+MIN_PASSWORD_COST = 1
+DASHBOARD_CALLS = 1000
+SEARCH_QUERIES = ["", "b", "blue", "blue spe", "pro max", "model1", "model12", "zzz"]
+SEARCH_CATEGORIES = [None, "Gaming"]
+SEARCH_WORDS = ("wireless bluetooth speaker earbuds premium case smart watch fitness power bank gaming "
+                "mouse keyboard charger cable usb portable mini pro max ultra sound battery noise "
+                "waterproof display rgb lighting sensor").split()
+SEARCH_CATEGORY_NAMES = ["Electronics", "Accessories", "Wearables", "Gaming", "Audio", "Home"]
+
+def summarise(operation, scale, latencies_ns):
+    """Throughput and latency percentiles for one operation"""
+    count = len(latencies_ns)
+    if count == 0:
+        return None
+    ordered = sorted(latencies_ns)
+    total_seconds = sum(ordered) / 1e9
+    return {
+        "operation": operation,
+        "scale": scale,
+        "count": count,
+        "total_seconds": total_seconds,
+        "ops_per_second": count / total_seconds if total_seconds else float("inf"),
+        "p50_us": ordered[count // 2] / 1000,
+        "p99_us": ordered[min(count - 1, int(count * 0.99))] / 1000,
+        "max_us": ordered[-1] / 1000
+    }
+
+def synthetic_catalog(size, seed=1):
+    """A reproducible catalog of size products with shop-like names and descriptions"""
+    rng = random.Random(seed)
+    return [{
+        "name": f"{' '.join(rng.sample(SEARCH_WORDS, 3)).title()} {i}",
+        "price": round(rng.uniform(5, 500), 2),
+        "discount": rng.randrange(5, 50),
+        "min_required": rng.randrange(2, 6),
+        "description": f"{' '.join(rng.sample(SEARCH_WORDS, 10))} model{rng.randrange(5000)}",
+        "category": rng.choice(SEARCH_CATEGORY_NAMES)
+    } for i in range(size)]
+
+def run_scale(scale, track_memory=False):
+    """Run every hot path once at the given scale; returns a list of result dicts"""
+    gc.collect()
+    if track_memory:
+        tracemalloc.start()
+    clock = time.perf_counter_ns
+    engine = GroupBuyEngine(password_hasher=PasswordHasher(cost=MIN_PASSWORD_COST))
+    catalog = engine.products_catalog
+    timings = {}
+
+    # Registration
+    latencies = []
+    users = []
+    for i in range(scale):
+        started = clock()
+        _, user = engine.register_user(f"user{i:07d}", "pass1234")
+        latencies.append(clock() - started)
+        users.append(user)
+    timings["register"] = latencies
+
+    # Start one group per user
+    latencies = []
+    groups = []
+    for i, user in enumerate(users):
+        product_info = catalog[i % len(catalog)]
+        started = clock()
+        _, group = engine.start_group_buy(user, product_info)
+        latencies.append(clock() - started)
+        groups.append(group)
+    timings["start"] = latencies
+
+    # Each group gets one more member; small groups complete on this join
+    join_latencies = []
+    join_checkout_latencies = []
+    for i, group in enumerate(groups):
+        joiner = users[(i + 1) % scale]
+        started = clock()
+        status, _ = engine.join_group_buy(joiner, group)
+        elapsed = clock() - started
+        if status == JOINED:
+            join_latencies.append(elapsed)
+        elif status in (COMPLETED, FAILED):
+            join_checkout_latencies.append(elapsed)
+    timings["join"] = join_latencies
+    timings["join+checkout"] = join_checkout_latencies
+
+    # Check out (mostly fail) everything still open
+    latencies = []
+    for group in engine.open_groups():
+        started = clock()
+        engine.checkout_group(group)
+        latencies.append(clock() - started)
+    timings["checkout"] = latencies
+
+    # A second round of groups, all expired by the deadline scheduler
+    for i, user in enumerate(users):
+        engine.start_group_buy(user, catalog[i % len(catalog)])
+    after_deadlines = current_timestamp() + engine.group_duration
+    latencies = []
+    while True:
+        started = clock()
+        expired = engine.expire_due_groups(after_deadlines, limit=1)
+        elapsed = clock() - started
+        if not expired:
+            break
+        latencies.append(elapsed)
+    timings["expire"] = latencies
+
+    latencies = []
+    for _ in range(STATS_CALLS):
+        started = clock()
+        engine.update_app_statistics()
+        latencies.append(clock() - started)
+    timings["update_stats"] = latencies
+
+    started = clock()
+    mismatches = engine.update_app_statistics(consistency_check=True)
+    timings["update_stats(recount)"] = [clock() - started]
+    if mismatches:
+        raise AssertionError(f"statistics drifted at scale {scale}: {mismatches}")
+
+    latencies = []
+    for _ in range(DASHBOARD_CALLS):
+        started = clock()
+        engine.revenue_dashboard()
+        latencies.append(clock() - started)
+    timings["dashboard"] = latencies
+
+    # Searches run on a fresh index, so the first query of each prefix is uncached
+    search_index = CatalogSearchIndex(synthetic_catalog(scale))
+    latencies = []
+    for query in SEARCH_QUERIES:
+        for category in SEARCH_CATEGORIES:
+            started = clock()
+            search_index.search(query, category)
+            latencies.append(clock() - started)
+    timings["search"] = latencies
+
+    if track_memory:
+        peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+    else:
+        # Scales run in ascending order, so the process high-water mark is this scale's peak
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    results = []
+    for operation, latencies in timings.items():
+        summary = summarise(operation, scale, latencies)
+        if summary is not None:
+            summary["peak_memory_kb"] = peak_kb
+            results.append(summary)
+    return results
+
+def current_commit():
+    """The git commit being benchmarked, if available"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results, baseline=None):
+    """Print a results table, with the ops/s ratio against a baseline run when given"""
+    previous = {}
+    if baseline is not None:
+        for row in baseline["results"]:
+            previous[(row["operation"], row["scale"])] = row
+
+    header = f"  {'scale':>9}  {'operation':<22}{'ops/s':>12}{'p50 µs':>10}{'p99 µs':>10}{'peak MB':>9}"
+    if previous:
+        header += f"{'vs base':>9}"
+    print(header)
+    for row in results:
+        line = (f"  {row['scale']:>9}  {row['operation']:<22}{row['ops_per_second']:>12,.0f}"
+                f"{row['p50_us']:>10.2f}{row['p99_us']:>10.2f}{row['peak_memory_kb']/1024:>9.1f}")
+        old = previous.get((row["operation"], row["scale"]))
+        if old is not None:
+            line += f"{row['ops_per_second'] / old['ops_per_second']:>8.2f}x"
+        print(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the group-buy engine hot paths")
+    parser.add_argument("--scales", default="1000,10000,100000",
+                        help="comma-separated user/group counts (e.g. 1000,10000,100000,1000000)")
+    parser.add_argument("--output", help="write machine-readable JSON results here")
+    parser.add_argument("--compare", help="JSON results from an earlier run to compare against")
+    parser.add_argument("--track-memory", action="store_true",
+                        help="measure peak Python allocations with tracemalloc (slower)")
+    args = parser.parse_args(argv)
+
+    scales = sorted(int(scale) for scale in args.scales.split(","))
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+
+    results = []
+    for scale in scales:
+        print(f"⏱️  Running scale {scale:,} ...", file=sys.stderr)
+        results.extend(run_scale(scale, args.track_memory))
+
+    print("📊 GROUP-BUY ENGINE BENCHMARK")
+    print_results(results, baseline)
+
+    if args.output:
+        report = {
+            "commit": current_commit(),
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "memory_metric": "tracemalloc_peak" if args.track_memory else "max_rss",
+            "results": results
+        }
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
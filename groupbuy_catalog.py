@@ -0,0 +1,298 @@
+"""Product catalog: a typed product store, bulk loaders and a search index.
+
+ProductStore keeps products in catalog order, keyed by a stable product ID,
+with lookups by name, category and price range. The loaders stream CSV,
+JSON-array or JSON-lines files one product at a time, so a catalog of any
+size is read incrementally.
+
+CatalogSearchIndex splits every product's name, description and category
+into lowercase word tokens. A query matches a product when each of its
+words is a prefix of one of the product's tokens, so typing "blue spe"
+finds the "Bluetooth Speaker Mini". Prefix lookups are a binary search over
+the sorted token list, so a search never scans the whole catalog.
+"""
+import bisect
+import csv
+import decimal
+import hashlib
+import itertools
+import json
+import re
+
+from groupbuy_discounts import parse_promotions, parse_tiers
+from groupbuy_pricing import BASIS_POINTS, to_basis_points, to_percent, to_ringgit, to_sen
+
+TOKEN_PATTERN = re.compile(r"[0-9a-z]+")
+# Sorts after every real token that starts with the same prefix
+PREFIX_END = "\U0010ffff"
+PREFIX_CACHE_SIZE = 256
+
+# ==================== PRODUCT STORE ====================
+# Field name -> type every stored product is converted to
+PRODUCT_FIELDS = {
+    "product_id": str,
+    "name": str,
+    "price": float,  # ringgit, for display; always price_sen / 100
+    "price_sen": int,  # what checkout charges from
+    "discount": float,  # percentage, for display; int when whole
+    "discount_bp": int,  # basis points (0.01%)
+    "min_required": int,
+    "tiers": tuple,  # (members, discount_bp) pairs raising the discount for bigger groups
+    "promotions": tuple,  # groupbuy_discounts.Promotion windows
+    "description": str,
+    "category": str
+}
+PRODUCT_ID_ALIASES = ("product_id", "id", "sku")
+
+def stable_product_id(name):
+    """Product ID derived from the product name, for catalogs that don't carry one"""
+    return "P" + hashlib.sha1(name.encode("utf-8")).hexdigest()[:12]
+
+def normalize_product(raw):
+    """Convert a raw product mapping (CSV row or JSON object) to a typed product dict
+
+    Raises ValueError when a required field is missing or out of range.
+    """
+    name = str(raw.get("name") or "").strip()
+    if not name:
+        raise ValueError("product has no name")
+    product_id = next((str(raw[key]).strip() for key in PRODUCT_ID_ALIASES if raw.get(key) not in (None, "")),
+                      None) or stable_product_id(name)
+    try:
+        price_sen = to_sen(str(raw["price"]).replace("RM", "").replace(",", "").strip())
+        discount_bp = to_basis_points(str(raw["discount"]).strip())
+        min_required = int(raw["min_required"])
+    except KeyError as error:
+        raise ValueError(f"{name!r} is missing {error.args[0]!r}")
+    except (TypeError, ValueError, OverflowError, decimal.InvalidOperation):
+        raise ValueError(f"{name!r} has a non-numeric price, discount or min_required")
+    if price_sen < 0:
+        raise ValueError(f"{name!r} has a negative price")
+    if not 0 <= discount_bp < BASIS_POINTS:
+        raise ValueError(f"{name!r} discount must be between 0 and 100")
+    if min_required < 1:
+        raise ValueError(f"{name!r} needs min_required of at least 1")
+    try:
+        tiers = parse_tiers(raw.get("tiers"))
+        promotions = parse_promotions(raw.get("promotions"))
+    except ValueError as error:
+        raise ValueError(f"{name!r} has {error}")
+    return {
+        "product_id": product_id,
+        "name": name,
+        "price": to_ringgit(price_sen),
+        "price_sen": price_sen,
+        "discount": to_percent(discount_bp),
+        "discount_bp": discount_bp,
+        "min_required": min_required,
+        "tiers": tiers,
+        "promotions": promotions,
+        "description": str(raw.get("description") or "").strip(),
+        "category": str(raw.get("category") or "").strip()
+    }
+
+class ProductStore:
+    """Typed products in catalog order, indexed by product ID, name, category and price"""
+
+    def __init__(self, products=()):
+        self.products = []  # catalog order; positions are what the search index returns
+        self.products_by_id = {}
+        self.products_by_name = {}
+        self.product_ids_by_category = {}  # category -> list of product IDs, catalog order
+        self.price_index = []  # sorted (price, product ID) pairs, rebuilt lazily after additions
+        self.price_index_stale = False
+        for product in products:
+            self.add(product)
+
+    def add(self, raw_product):
+        """Validate and append a product; returns the stored product dict
+
+        Raises ValueError for invalid products and for IDs or names already in the store.
+        """
+        product = normalize_product(raw_product)
+        if product["product_id"] in self.products_by_id:
+            raise ValueError(f"duplicate product ID {product['product_id']!r}")
+        if product["name"] in self.products_by_name:
+            raise ValueError(f"duplicate product name {product['name']!r}")
+        self.products.append(product)
+        self.products_by_id[product["product_id"]] = product
+        self.products_by_name[product["name"]] = product
+        self.product_ids_by_category.setdefault(product["category"], []).append(product["product_id"])
+        self.price_index_stale = True
+        return product
+
+    def __len__(self):
+        return len(self.products)
+
+    def get(self, product_id):
+        """The product with this ID, or None"""
+        return self.products_by_id.get(product_id)
+
+    def find_by_name(self, name):
+        """The product with this name, or None"""
+        return self.products_by_name.get(name)
+
+    def in_category(self, category):
+        """Products in a category, in catalog order"""
+        return [self.products_by_id[product_id] for product_id in self.product_ids_by_category.get(category, ())]
+
+    def in_price_range(self, low=0, high=float("inf")):
+        """Products priced from low to high inclusive, cheapest first"""
+        if self.price_index_stale:
+            self.price_index = sorted((product["price"], product["product_id"]) for product in self.products)
+            self.price_index_stale = False
+        start = bisect.bisect_left(self.price_index, (low, ""))
+        matches = []
+        for price, product_id in itertools.islice(self.price_index, start, None):
+            if price > high:
+                break
+            matches.append(self.products_by_id[product_id])
+        return matches
+
+# ==================== BULK LOADERS ====================
+def iter_csv_products(path):
+    """Yield (line number, row dict) for each row of a CSV catalog with a header line"""
+    with open(path, newline="", encoding="utf-8-sig") as catalog_file:
+        reader = csv.DictReader(catalog_file)
+        for row in reader:
+            yield reader.line_num, row
+
+def iter_json_products(path, chunk_size=64 * 1024):
+    """Yield (item number, object) from a JSON array or JSON-lines catalog
+
+    Arrays are decoded one element at a time from fixed-size chunks, so the
+    whole file is never held in memory.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8-sig") as catalog_file:
+        buffer = catalog_file.read(chunk_size)
+        if not buffer.lstrip().startswith("["):
+            catalog_file.seek(0)
+            for line_number, line in enumerate(catalog_file, 1):
+                if line.strip():
+                    yield line_number, json.loads(line)
+            return
+
+        position = buffer.index("[") + 1
+        item_number = 0
+        while True:
+            # Skip separators, reading more of the file when the buffer runs out
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position == len(buffer):
+                buffer = catalog_file.read(chunk_size)
+                position = 0
+                if not buffer:
+                    raise ValueError(f"{path}: JSON array is not closed")
+                continue
+            if buffer[position] == "]":
+                return
+            try:
+                value, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                more = catalog_file.read(chunk_size)
+                if not more:
+                    raise
+                buffer = buffer[position:] + more
+                position = 0
+                continue
+            item_number += 1
+            yield item_number, value
+
+def iter_catalog_file(path):
+    """Yield (line or item number, raw product) from a .csv, .json or .jsonl catalog"""
+    if path.lower().endswith(".csv"):
+        return iter_csv_products(path)
+    return iter_json_products(path)
+
+def load_products(store, raw_products, batch_size=5000):
+    """Add raw products to a store in batches; yields (added products, skipped rows) per batch
+
+    Skipped rows are (line or item number, reason) pairs, so one bad row
+    doesn't stop a large import.
+    """
+    added = []
+    skipped = []
+    for number, raw_product in raw_products:
+        try:
+            added.append(store.add(raw_product))
+        except ValueError as error:
+            skipped.append((number, str(error)))
+        if len(added) + len(skipped) >= batch_size:
+            yield added, skipped
+            added = []
+            skipped = []
+    if added or skipped:
+        yield added, skipped
+
+# ==================== SEARCH INDEX ====================
+def tokenize(text):
+    """Lowercase word tokens of a piece of text"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+class CatalogSearchIndex:
+    """Prefix/token index over a list of product dicts; results are catalog positions"""
+
+    def __init__(self, products=()):
+        self.product_count = 0
+        self.postings = {}  # token -> list of catalog positions, ascending
+        self.category_positions = {}  # category -> list of catalog positions, ascending
+        self.sorted_tokens = []
+        self.prefix_cache = {}  # prefix -> frozenset of positions
+        self.add_products(products)
+
+    def add_products(self, products):
+        """Index products appended to the catalog after the ones already indexed"""
+        for product in products:
+            position = self.product_count
+            self.product_count += 1
+            text = f"{product['name']} {product.get('description', '')} {product.get('category', '')}"
+            for token in set(tokenize(text)):
+                self.postings.setdefault(token, []).append(position)
+            self.category_positions.setdefault(product.get("category", ""), []).append(position)
+        self.sorted_tokens = sorted(self.postings)
+        self.prefix_cache = {}
+
+    def categories(self):
+        """All categories, sorted by name"""
+        return sorted(category for category in self.category_positions if category)
+
+    def _positions_for_prefix(self, prefix):
+        """Catalog positions having a token that starts with prefix"""
+        positions = self.prefix_cache.get(prefix)
+        if positions is not None:
+            return positions
+        start = bisect.bisect_left(self.sorted_tokens, prefix)
+        end = bisect.bisect_left(self.sorted_tokens, prefix + PREFIX_END, start)
+        if end - start == 1:
+            positions = frozenset(self.postings[self.sorted_tokens[start]])
+        else:
+            matched = set()
+            for token in self.sorted_tokens[start:end]:
+                matched.update(self.postings[token])
+            positions = frozenset(matched)
+        if len(self.prefix_cache) >= PREFIX_CACHE_SIZE:
+            self.prefix_cache.clear()
+        self.prefix_cache[prefix] = positions
+        return positions
+
+    def search(self, query="", category=None):
+        """Catalog positions matching every word of query (and the category, if given), in catalog order"""
+        words = sorted(set(tokenize(query)), key=len, reverse=True)
+        if category:
+            category_matches = self.category_positions.get(category, [])
+            if not words:
+                return list(category_matches)
+        elif not words:
+            return list(range(self.product_count))
+
+        # Longer prefixes match fewer products, so start from them
+        matches = None
+        for word in words:
+            positions = self._positions_for_prefix(word)
+            matches = positions if matches is None else matches & positions
+            if not matches:
+                return []
+        if category:
+            matches = matches.intersection(category_matches)
+        return sorted(matches)
@@ -0,0 +1,186 @@
+"""Tiered and time-boxed discounts, compiled into per-product lookup tables.
+
+A product's base discount applies once a group reaches min_required members.
+Optional tiers raise it for bigger groups (e.g. 3 buyers 20%, 5 buyers 30%,
+10 buyers 40%), and promotions change the discount for a time window, either
+to a flat discount or to their own tiers. Where several rules apply, buyers
+get the best discount.
+
+compile_discounts turns a product's rules into a DiscountSchedule once. The
+time axis is cut at every promotion start and end; each window gets a table
+holding the discount for every member count up to the size where the best
+discount is reached. A lookup is then one binary search over the window
+starts (skipped for products without promotions) and one list index, so
+checkout and the live progress displays never re-evaluate the rules.
+
+Catalog fields (discounts are percentages, like "discount"):
+
+    "tiers": [[5, 30], [10, 40]]               or "5:30;10:40" in a CSV column
+    "promotions": [{"start": "2026-11-11 00:00", "end": "2026-11-12 00:00",
+                    "discount": 50}]           or "tiers": [...] instead of "discount";
+                                               a JSON string in a CSV column
+"""
+import bisect
+import collections
+import datetime
+import decimal
+import json
+import time
+
+from groupbuy_pricing import BASIS_POINTS, to_basis_points
+
+# Largest member count a tier may ask for (tables hold one entry per member count)
+MAX_TIER_MEMBERS = 10000
+
+# A promotion's tiers as (members, discount_bp) pairs; a flat promotion is one tier from 1 member
+Promotion = collections.namedtuple("Promotion", ["start", "end", "tiers"])
+
+# ==================== CATALOG FIELDS ====================
+def parse_tiers(raw):
+    """Tiers as a tuple of (members, discount_bp) sorted by members
+
+    Accepts [[members, discount], ...], [{"members": ..., "discount": ...}, ...]
+    or "members:discount;..." with discounts in percent. Raises ValueError.
+    """
+    if raw is None or raw == "":
+        return ()
+    if isinstance(raw, str):
+        raw = [pair.split(":") for pair in raw.split(";") if pair.strip()]
+    tiers = {}
+    try:
+        for tier in raw:
+            members, discount = (tier["members"], tier["discount"]) if isinstance(tier, dict) else tier
+            members = int(members)
+            discount_bp = to_basis_points(str(discount).strip())
+            if not 1 <= members <= MAX_TIER_MEMBERS or not 0 <= discount_bp < BASIS_POINTS:
+                raise ValueError(f"tier {members}:{discount} is out of range")
+            tiers[members] = discount_bp
+    except decimal.InvalidOperation:
+        raise ValueError("invalid tiers (non-numeric discount)")
+    except (KeyError, TypeError, ValueError) as error:
+        raise ValueError(f"invalid tiers ({error})")
+    return tuple(sorted(tiers.items()))
+
+def parse_time(value):
+    """Epoch seconds from a number or an ISO date/time string ("2026-11-11 09:00", local time if no zone)"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip()
+    if text.isdigit():
+        return int(text)
+    return int(datetime.datetime.fromisoformat(text).timestamp())
+
+def parse_promotions(raw):
+    """Promotions as a tuple of Promotion sorted by start; raises ValueError"""
+    if raw is None or raw == "":
+        return ()
+    try:
+        if isinstance(raw, str):
+            raw = json.loads(raw)
+        promotions = []
+        for promotion in raw:
+            start = parse_time(promotion["start"])
+            end = parse_time(promotion["end"])
+            if end <= start:
+                raise ValueError("promotion ends before it starts")
+            tiers = parse_tiers(promotion.get("tiers"))
+            if promotion.get("discount") not in (None, ""):
+                tiers = parse_tiers([[1, promotion["discount"]]]) + tiers
+            if not tiers:
+                raise ValueError("promotion has no discount or tiers")
+            promotions.append(Promotion(start, end, tiers))
+    except (KeyError, TypeError, ValueError, AttributeError) as error:
+        raise ValueError(f"invalid promotions ({error})")
+    promotions.sort()
+    return tuple(promotions)
+
+# ==================== COMPILED TABLES ====================
+class DiscountTable:
+    """Discount and next better tier for every member count, for one set of rules"""
+    __slots__ = ("discounts", "next_tiers", "full_size", "steps")
+
+    def __init__(self, min_required, tier_lists):
+        # Best discount starting at each size; sizes below min_required count from min_required
+        best_from = {min_required: 0}
+        for tiers in tier_lists:
+            for members, discount_bp in tiers:
+                members = max(members, min_required)
+                if discount_bp > best_from.get(members, -1):
+                    best_from[members] = discount_bp
+
+        discounts = []
+        best = 0
+        for members in range(max(best_from) + 1):
+            best = max(best, best_from.get(members, 0))
+            discounts.append(best)
+        # Stop at the smallest group that gets the best discount: the group checks out there
+        full_size = len(discounts) - 1
+        while full_size > min_required and discounts[full_size - 1] == discounts[full_size]:
+            full_size -= 1
+        del discounts[full_size + 1:]
+        discounts[:min_required] = [discounts[min_required]] * min_required
+
+        next_tiers = [None] * (full_size + 1)
+        for members in range(full_size - 1, -1, -1):
+            if discounts[members + 1] > discounts[members]:
+                next_tiers[members] = (members + 1, discounts[members + 1])
+            else:
+                next_tiers[members] = next_tiers[members + 1]
+
+        self.discounts = tuple(discounts)
+        self.next_tiers = tuple(next_tiers)
+        self.full_size = full_size
+        # (members, discount_bp) where the discount goes up, for listing the tiers
+        self.steps = tuple((members, discounts[members]) for members in range(min_required, full_size + 1)
+                           if members == min_required or discounts[members] > discounts[members - 1])
+
+class DiscountSchedule:
+    """A product's compiled discount rules: a DiscountTable per promotion window"""
+    __slots__ = ("min_required", "window_starts", "tables")
+
+    def __init__(self, min_required, window_starts, tables):
+        self.min_required = min_required
+        self.window_starts = window_starts  # tables[i] applies from window_starts[i - 1] to window_starts[i]
+        self.tables = tables
+
+    def table_at(self, timestamp=None):
+        """The DiscountTable in force at timestamp (epoch seconds, default now)"""
+        if not self.window_starts:
+            return self.tables[0]
+        if timestamp is None:
+            timestamp = int(time.time())
+        return self.tables[bisect.bisect_right(self.window_starts, timestamp)]
+
+    def discount_bp(self, members, timestamp=None):
+        """Discount in basis points for a group of this size (counted as min_required if smaller)"""
+        table = self.table_at(timestamp)
+        return table.discounts[min(members, table.full_size)]
+
+    def full_size(self, timestamp=None):
+        """Members at which a group gets the best discount available and checks out"""
+        return self.table_at(timestamp).full_size
+
+    def next_tier(self, members, timestamp=None):
+        """(members, discount_bp) of the next better tier above this size, or None"""
+        table = self.table_at(timestamp)
+        return table.next_tiers[min(members, table.full_size)]
+
+    def steps(self, timestamp=None):
+        """[(members, discount_bp)] where the discount goes up, smallest group first"""
+        return self.table_at(timestamp).steps
+
+def compile_discounts(product):
+    """Compile a catalog product's discount, tiers and promotions into a DiscountSchedule"""
+    min_required = product["min_required"]
+    base_tiers = ((min_required, product["discount_bp"]),) + tuple(product.get("tiers", ()))
+    base_table = DiscountTable(min_required, [base_tiers])
+    promotions = product.get("promotions", ())
+    if not promotions:
+        return DiscountSchedule(min_required, (), (base_table,))
+
+    window_starts = sorted({promotion.start for promotion in promotions} | {promotion.end for promotion in promotions})
+    tables = [base_table]
+    for window_start in window_starts:
+        active = [promotion.tiers for promotion in promotions if promotion.start <= window_start < promotion.end]
+        tables.append(DiscountTable(min_required, [base_tiers] + active) if active else base_table)
+    return DiscountSchedule(min_required, tuple(window_starts), tuple(tables))
@@ -0,0 +1,946 @@
+"""Headless group-buy engine shared by the Tkinter GUI and any batch or service frontend.
+
+Nothing in this module imports tkinter, so it can be used on machines without a display.
+"""
+import collections
+import datetime
+import functools
+import itertools
+import threading
+import time
+
+from groupbuy_analytics import RevenueRollup
+from groupbuy_archive import GroupArchive
+from groupbuy_catalog import CatalogSearchIndex, ProductStore, iter_catalog_file, load_products
+from groupbuy_discounts import compile_discounts
+from groupbuy_expiry import ExpiryScheduler
+from groupbuy_matchmaking import GroupMatcher
+from groupbuy_passwords import PasswordHasher
+from groupbuy_pricing import discount_sen, price_per_person_sen, to_percent, to_ringgit
+from groupbuy_storage import MemoryStorage
+
+# ==================== TIMESTAMPS ====================
+# Timestamps are stored as integer epoch seconds and only formatted for display
+def current_timestamp():
+    """Current time as integer epoch seconds"""
+    return int(time.time())
+
+def format_timestamp(timestamp):
+    """Format epoch seconds the way the app displays times ("%Y-%m-%d %H:%M")"""
+    if timestamp is None:
+        return None
+    return _format_minute(timestamp // 60)
+
+@functools.lru_cache(maxsize=4096)
+def _format_minute(minute):
+    return datetime.datetime.fromtimestamp(minute * 60).strftime("%Y-%m-%d %H:%M")
+
+# ==================== USER & GROUP CLASSES ====================
+# Entries kept in each user's join_history (oldest are dropped)
+JOIN_HISTORY_LIMIT = 20
+
+# Groups share a fixed pool of re-entrant locks, picked by group id; a lock
+# per group cost more memory than the rest of the group put together
+GROUP_LOCK_STRIPES = 1024
+GROUP_LOCKS = tuple(threading.RLock() for _ in range(GROUP_LOCK_STRIPES))
+
+# Groups up to this size answer has_member by scanning their buyers; bigger
+# ones build a username set on first use
+MEMBER_SCAN_LIMIT = 16
+
+ACTIVITY_DESCRIPTIONS = {
+    "started": "Started group for {}",
+    "joined": "Joined group for {}",
+    "completed": "Group for {} completed",
+    "failed": "Group for {} failed"
+}
+
+class ActivityRecord(collections.namedtuple("ActivityRecord", ["action", "group_id", "product", "timestamp"])):
+    """One entry of a user's join_history ("started", "joined", "completed" or "failed")"""
+    __slots__ = ()
+
+    @property
+    def description(self):
+        return ACTIVITY_DESCRIPTIONS[self.action].format(self.product)
+
+    @property
+    def time(self):
+        return format_timestamp(self.timestamp)
+
+class User:
+    __slots__ = ("username", "password_hash", "join_history", "created_at",
+                 "active_groups", "completed_count", "failed_count", "total_savings_sen")
+
+    def __init__(self, username, password_hash):
+        self.username = username
+        self.password_hash = password_hash
+        self.join_history = []  # newest JOIN_HISTORY_LIMIT ActivityRecords, oldest first
+        self.created_at = current_timestamp()
+        # Activity index kept up to date by the engine on start, join and checkout
+        self.active_groups = None  # open group -> None, in join order; created on first join
+        self.completed_count = 0
+        self.failed_count = 0
+        self.total_savings_sen = 0
+
+    def track_open_group(self, group):
+        if self.active_groups is None:
+            self.active_groups = {}
+        self.active_groups[group] = None
+
+    def untrack_open_group(self, group):
+        if self.active_groups is not None:
+            self.active_groups.pop(group, None)
+
+    def record_activity(self, action, group):
+        """Append to join_history, dropping the oldest entry once it is full"""
+        self.join_history.append(ActivityRecord(action, group.group_id, group.product, current_timestamp()))
+        if len(self.join_history) > JOIN_HISTORY_LIMIT:
+            del self.join_history[0]
+
+    @property
+    def created_date(self):
+        return format_timestamp(self.created_at)
+
+class Buyer:
+    __slots__ = ("user", "final_price_sen", "savings_sen", "joined_at")
+
+    def __init__(self, user):
+        self.user = user
+        self.final_price_sen = 0
+        self.savings_sen = 0
+        self.joined_at = current_timestamp()
+
+    @property
+    def final_price(self):
+        return to_ringgit(self.final_price_sen)
+
+    @property
+    def savings(self):
+        return to_ringgit(self.savings_sen)
+
+    @property
+    def join_time(self):
+        return format_timestamp(self.joined_at)
+
+class GroupBuy:
+    __slots__ = ("group_id", "product", "price_sen", "discount_bp", "min_required", "pricing", "buyers",
+                 "member_index", "active", "created_at", "completed_at", "deadline", "app_stats")
+
+    def __init__(self, product_name, price_sen, discount_bp, min_required, starter_user, app_stats=None,
+                 pricing=None):
+        self.group_id = None  # assigned by the engine
+        self.product = product_name
+        # Money is fixed-point (see groupbuy_pricing): integer sen and basis points
+        self.price_sen = price_sen
+        # The product's base discount; set to the discount actually applied at checkout
+        self.discount_bp = discount_bp
+        self.min_required = min_required
+        # Compiled tiers and promotions (a DiscountSchedule); None prices flat at discount_bp
+        self.pricing = pricing
+        self.buyers = [Buyer(starter_user)]
+        self.member_index = None  # username set, built by has_member once the group is big
+        self.active = True
+        self.created_at = current_timestamp()
+        self.completed_at = None
+        self.deadline = None  # epoch seconds after which the group is checked out; set by the engine
+        # Shared statistics counters updated when this group closes
+        self.app_stats = app_stats
+
+    def add_buyer(self, user):
+        new_buyer = Buyer(user)
+        self.buyers.append(new_buyer)
+        if self.member_index is not None:
+            self.member_index.add(user.username)
+        return len(self.buyers)
+
+    @property
+    def lock(self):
+        """Held while the membership or state of this group changes (shared with other groups' stripes)"""
+        return GROUP_LOCKS[hash(self.group_id) % GROUP_LOCK_STRIPES]
+
+    @property
+    def member_usernames(self):
+        """Usernames of the buyers, in join order"""
+        return [buyer.user.username for buyer in self.buyers]
+
+    def checkout(self):
+        """Close the group and return a CheckoutResult; the receipt text is only built on demand"""
+        current_members = len(self.buyers)
+
+        if current_members < self.min_required:
+            if self.active and self.app_stats is not None:
+                self.app_stats["failed_groups"] += 1
+            self.active = False
+            return CheckoutResult(self, False)
+
+        # Calculate pricing (integer sen; the discount is rounded once, here). The
+        # tier is looked up for the final size, at the deadline if that has passed
+        completed_at = current_timestamp()
+        if self.pricing is not None:
+            priced_at = completed_at if self.deadline is None else min(completed_at, self.deadline)
+            self.discount_bp = self.pricing.discount_bp(current_members, priced_at)
+        savings_per_person = discount_sen(self.price_sen, self.discount_bp)
+        final_price = self.price_sen - savings_per_person  # price_per_person_sen without a second division
+
+        # Update all buyer information
+        for buyer in self.buyers:
+            buyer.final_price_sen = final_price
+            buyer.savings_sen = savings_per_person
+
+        if self.active and self.app_stats is not None:
+            self.app_stats["successful_groups"] += 1
+            self.app_stats["total_items_sold"] += current_members
+        self.active = False
+        self.completed_at = completed_at
+
+        return CheckoutResult(self, True, final_price, savings_per_person)
+
+    def has_member(self, username):
+        """Check whether a user is already a buyer in this group"""
+        if self.member_index is None:
+            if len(self.buyers) <= MEMBER_SCAN_LIMIT:
+                return any(buyer.user.username == username for buyer in self.buyers)
+            self.member_index = {buyer.user.username for buyer in self.buyers}
+        return username in self.member_index
+
+    # ----- tiers (O(1) lookups in the compiled DiscountSchedule) -----
+    def full_size(self, now=None):
+        """Members at which the group has its best discount and checks out"""
+        if self.pricing is None:
+            return self.min_required
+        return self.pricing.full_size(now)
+
+    def current_discount_bp(self, now=None):
+        """Discount the group gets if it closes now (at least min_required members assumed)"""
+        if self.pricing is None or not self.active:
+            return self.discount_bp
+        return self.pricing.discount_bp(len(self.buyers), now)
+
+    def next_tier(self, now=None):
+        """(members, discount_bp) of the next better tier, or None when the group is at its best"""
+        if self.pricing is None or not self.active:
+            return None
+        return self.pricing.next_tier(len(self.buyers), now)
+
+    @property
+    def price(self):
+        return to_ringgit(self.price_sen)
+
+    @property
+    def discount(self):
+        return to_percent(self.discount_bp)
+
+    @property
+    def current_discount(self):
+        return to_percent(self.current_discount_bp())
+
+    @property
+    def price_per_person_sen(self):
+        """What each member pays (in sen) if the group completes at its current size"""
+        return price_per_person_sen(self.price_sen, self.current_discount_bp())
+
+    @property
+    def created_time(self):
+        return format_timestamp(self.created_at)
+
+    @property
+    def completed_time(self):
+        return format_timestamp(self.completed_at)
+
+    @property
+    def deadline_time(self):
+        return format_timestamp(self.deadline)
+
+class CheckoutResult:
+    """Outcome of GroupBuy.checkout; the receipt text is rendered lazily and cached
+
+    Amounts are integer sen (the *_sen fields); the ringgit properties are for display.
+    """
+
+    __slots__ = ("success", "group_id", "product", "price_sen", "discount_bp", "min_required", "member_count",
+                 "price_per_person_sen", "discount_amount_sen", "total_revenue_sen", "total_group_savings_sen",
+                 "completed_at", "buyers", "_receipt")
+
+    def __init__(self, group, success, price_per_person_sen=0, discount_amount_sen=0):
+        self.success = success
+        self.group_id = group.group_id
+        self.product = group.product
+        self.price_sen = group.price_sen
+        self.discount_bp = group.discount_bp
+        self.min_required = group.min_required
+        self.member_count = len(group.buyers)
+        self.price_per_person_sen = price_per_person_sen
+        self.discount_amount_sen = discount_amount_sen
+        self.total_revenue_sen = price_per_person_sen * self.member_count
+        self.total_group_savings_sen = discount_amount_sen * self.member_count
+        self.completed_at = group.completed_at
+        self.buyers = group.buyers  # not modified once the group is closed
+        self._receipt = None
+
+    @property
+    def price(self):
+        return to_ringgit(self.price_sen)
+
+    @property
+    def discount(self):
+        return to_percent(self.discount_bp)
+
+    @property
+    def price_per_person(self):
+        return to_ringgit(self.price_per_person_sen)
+
+    @property
+    def discount_amount(self):
+        return to_ringgit(self.discount_amount_sen)
+
+    @property
+    def total_revenue(self):
+        return to_ringgit(self.total_revenue_sen)
+
+    @property
+    def total_group_savings(self):
+        return to_ringgit(self.total_group_savings_sen)
+
+    @property
+    def receipt(self):
+        """Human-readable checkout message, built on first access"""
+        if self._receipt is None:
+            self._receipt = self._render_receipt()
+        return self._receipt
+
+    @property
+    def completed_time(self):
+        return format_timestamp(self.completed_at)
+
+    def _render_receipt(self):
+        if not self.success:
+            return (f"❌ GROUP BUY FAILED ❌\n\n"
+                    f"Product: {self.product}\n"
+                    f"Only {self.member_count} out of {self.min_required} required members joined.\n\n"
+                    "The group buy has been cancelled.\nBetter luck next time!")
+
+        lines = [
+            "🎉 GROUP BUY SUCCESS! 🎉\n",
+            f"📱 Product: {self.product}",
+            f"💰 Original Price: RM {self.price:.2f} per item",
+            f"🎯 Discount Applied: {self.discount}%",
+            f"💵 Final Price per Person: RM {self.price_per_person:.2f}",
+            f"💸 Individual Savings: RM {self.discount_amount:.2f}",
+            f"📊 Total Revenue for Seller: RM {self.total_revenue:.2f}",
+            f"👥 Total Participants: {self.member_count}",
+            f"🏆 Total Group Savings: RM {self.total_group_savings:.2f}\n",
+            "🛒 Group Members:"
+        ]
+        for i, buyer in enumerate(self.buyers, 1):
+            lines.append(f"  {i}. {buyer.user.username} - Paid RM {buyer.final_price:.2f} (Saved RM {buyer.savings:.2f})")
+        lines.append(f"\nCompleted at: {self.completed_time}")
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.receipt
+
+# ==================== PRODUCT CATALOG ====================
+products_catalog = [
+    {
+        "product_id": "SGB-0001",
+        "name": "Xiaomi Redmi Earbuds Pro",
+        "price": 159.90,
+        "discount": 30,
+        "min_required": 3,
+        "description": "Wireless Bluetooth earbuds with active noise cancellation and 28-hour battery life",
+        "category": "Electronics"
+    },
+    {
+        "product_id": "SGB-0002",
+        "name": "Premium iPhone 15 Case",
+        "price": 49.90,
+        "discount": 25,
+        "min_required": 2,
+        "description": "Military-grade drop protection with MagSafe compatibility and crystal clear design",
+        "category": "Accessories"
+    },
+    {
+        "product_id": "SGB-0003",
+        "name": "Smart Fitness Watch Pro",
+        "price": 299.90,
+        "discount": 40,
+        "min_required": 4,
+        "description": "Advanced health monitoring with GPS, heart rate sensor, and 7-day battery life",
+        "category": "Wearables"
+    },
+    {
+        "product_id": "SGB-0004",
+        "name": "Portable Power Bank 20000mAh",
+        "price": 89.90,
+        "discount": 20,
+        "min_required": 3,
+        "description": "Fast charging power bank with dual USB-C ports and digital display",
+        "category": "Electronics"
+    },
+    {
+        "product_id": "SGB-0005",
+        "name": "Wireless Gaming Mouse",
+        "price": 129.90,
+        "discount": 35,
+        "min_required": 5,
+        "description": "Professional gaming mouse with RGB lighting and 25000 DPI sensor",
+        "category": "Gaming"
+    },
+    {
+        "product_id": "SGB-0006",
+        "name": "Bluetooth Speaker Mini",
+        "price": 79.90,
+        "discount": 22,
+        "min_required": 2,
+        "description": "Portable waterproof speaker with 360-degree sound and 12-hour playtime",
+        "category": "Audio"
+    }
+]
+
+# ==================== OPERATION RESULTS ====================
+# Status codes returned by the engine operations; frontends turn them into
+# message boxes, JSON responses or log lines.
+STARTED = "started"
+JOINED = "joined"
+COMPLETED = "completed"
+FAILED = "failed"
+ALREADY_MEMBER = "already_member"
+ALREADY_PARTICIPATING = "already_participating"
+GROUP_CLOSED = "group_closed"
+GROUP_EXPIRED = "group_expired"  # a join found the group past its deadline and checked it out without the user
+NO_OPEN_GROUP = "no_open_group"
+
+# Orders auto_join_group_buy can pick a product's open group in
+CLOSEST_TO_COMPLETION = "closest"
+OLDEST = "oldest"
+
+# How long a new group stays open before it is checked out (and fails if not full)
+DEFAULT_GROUP_DURATION = 24 * 60 * 60
+
+# ==================== ENGINE ====================
+class GroupBuyEngine:
+    """All group-buy state (registry, groups, stats) plus the operations on it"""
+
+    def __init__(self, catalog=None, archive=None, storage=None, password_hasher=None,
+                 group_duration=DEFAULT_GROUP_DURATION):
+        if isinstance(catalog, ProductStore):
+            self.product_store = catalog
+        else:
+            self.product_store = ProductStore(products_catalog if catalog is None else catalog)
+        # Catalog order; the same list object the store appends to
+        self.products_catalog = self.product_store.products
+        self.catalog_index = CatalogSearchIndex(self.products_catalog)
+        # Only open groups live here (group -> None, in start order); closed
+        # groups are moved into the archive at checkout
+        self.active_groups = {}
+        self.archive = GroupArchive() if archive is None else archive
+        self.registered_users = {}
+        self.next_group_id = 1
+        # Gap between consecutive group ids (a shard of a ShardedEngine uses the shard count)
+        self.group_id_step = 1
+        # Indexes over open groups only; dicts keep groups in start order
+        self.open_groups_by_id = {}  # group_id -> open group
+        self.open_groups_by_product = {}  # product name -> {group: None}
+        self.user_product_groups = {}  # (username, product name) -> open group
+        # Per-product heaps of open groups, closest to completion on top (for auto-join)
+        self.matcher = GroupMatcher()
+        # Compiled discount tiers and promotions per product name, built on first use
+        self.discount_schedules = {}
+        # Revenue, units and savings of completed groups, rolled up by product, hour and day
+        self.revenue = RevenueRollup()
+        self.app_stats = {
+            "total_groups_created": 0,
+            "successful_groups": 0,
+            "failed_groups": 0,
+            "total_users_registered": 0,
+            "total_items_sold": 0
+        }
+
+        # Locking: each GroupBuy has a (striped) lock for joins and checkout; each
+        # product has a lock for its indexes and (user, product) reservations;
+        # stats_lock covers counters, revenue and the archive. Locks are always
+        # taken in that order (group -> product -> stats -> registry).
+        self.product_locks = {}
+        self.stats_lock = threading.RLock()
+        self.registry_lock = threading.Lock()
+
+        # Deadlines of open groups; expire_due_groups checks out the ones that have passed
+        self.group_duration = group_duration
+        self.expiry = ExpiryScheduler()
+
+        # Password hashing (and its worker pool for the submit_* methods)
+        self.password_hasher = PasswordHasher() if password_hasher is None else password_hasher
+
+        # Persistence backend; restores any saved state before first use
+        self.storage = MemoryStorage() if storage is None else storage
+        self.storage.load_into(self)
+
+    def flush(self):
+        """Write any changes the storage backend has queued"""
+        self.storage.flush()
+
+    def close(self):
+        """Flush and close the storage backend, the archive and the password workers"""
+        self.password_hasher.close()
+        self.storage.close()
+        self.archive.close()
+
+    # ----- users -----
+    def validate_user_input(self, username, password, is_registration=False):
+        """Validate user input for login/registration"""
+        if not username or not username.strip():
+            return False, "Username cannot be empty!"
+
+        if not password or not password.strip():
+            return False, "Password cannot be empty!"
+
+        if is_registration:
+            if len(username.strip()) < 3:
+                return False, "Username must be at least 3 characters long!"
+
+            if len(password.strip()) < 4:
+                return False, "Password must be at least 4 characters long!"
+
+            if username.strip() in self.registered_users:
+                return False, "Username already exists! Please choose a different one."
+
+        return True, "Valid input"
+
+    def register_user(self, username, password):
+        """Register a new user, returning (True, user) or (False, error message)
+
+        Hashes the password in the calling thread; frontends with an event
+        loop should use submit_register_user instead.
+        """
+        is_valid, error_message = self.validate_user_input(username, password, is_registration=True)
+        if not is_valid:
+            return False, error_message
+
+        new_user = User(username, self.password_hasher.hash(password))
+        with self.registry_lock:
+            if username in self.registered_users:
+                return False, "Username already exists! Please choose a different one."
+            self.registered_users[username] = new_user
+            self.app_stats["total_users_registered"] = len(self.registered_users)
+            self.storage.user_registered(new_user)
+        return True, new_user
+
+    def authenticate_user(self, username, password):
+        """Check login credentials, returning (True, user) or (False, error message)
+
+        Hashes from an older cost setting (or legacy plaintext passwords) are
+        upgraded on a successful login.
+        """
+        is_valid, error_message = self.validate_user_input(username, password, is_registration=False)
+        if not is_valid:
+            return False, error_message
+
+        user = self.registered_users.get(username)
+        if user is None:
+            return False, f"Username '{username}' not found!\n\nPlease register first or check your spelling."
+
+        password_hash = user.password_hash
+        if not self.password_hasher.verify(password, password_hash):
+            return False, "Incorrect password!\n\nPlease try again or reset your password."
+
+        if self.password_hasher.needs_rehash(password_hash):
+            new_hash = self.password_hasher.hash(password)
+            with self.registry_lock:
+                if user.password_hash == password_hash:
+                    user.password_hash = new_hash
+                    self.storage.user_updated(user)
+
+        return True, user
+
+    def submit_register_user(self, username, password):
+        """register_user on the password worker pool; returns a Future of its result"""
+        return self.password_hasher.submit(self.register_user, username, password)
+
+    def submit_authenticate_user(self, username, password):
+        """authenticate_user on the password worker pool; returns a Future of its result"""
+        return self.password_hasher.submit(self.authenticate_user, username, password)
+
+    # ----- groups -----
+    def find_product(self, product_name):
+        """Look up a catalog entry by product name"""
+        return self.product_store.find_by_name(product_name)
+
+    def find_product_by_id(self, product_id):
+        """Look up a catalog entry by its stable product ID"""
+        return self.product_store.get(product_id)
+
+    def load_catalog(self, path, batch_size=5000):
+        """Stream a CSV/JSON catalog file into the store and search index
+
+        Returns (number of products added, list of (line or item number, reason) for skipped rows).
+        """
+        added_count = 0
+        skipped = []
+        for added, batch_skipped in load_products(self.product_store, iter_catalog_file(path), batch_size):
+            self.catalog_index.add_products(added)
+            added_count += len(added)
+            skipped.extend(batch_skipped)
+        # Open groups restored before their product was loaded get its tiers from now on
+        for group in list(self.active_groups):
+            if group.pricing is None:
+                product_info = self.find_product(group.product)
+                if product_info is not None:
+                    group.pricing = self.discount_schedule(product_info)
+        return added_count, skipped
+
+    def search_products(self, query="", category=None):
+        """Products whose name, description or category match every word of query, in catalog order"""
+        return [self.products_catalog[position] for position in self.catalog_index.search(query, category)]
+
+    def product_categories(self):
+        """Sorted list of catalog categories"""
+        return self.catalog_index.categories()
+
+    def open_groups(self, product_name=None):
+        """List open groups, optionally only those for one product"""
+        if product_name is None:
+            return list(self.active_groups)
+        return list(self.open_groups_by_product.get(product_name, ()))
+
+    def open_groups_page(self, offset=0, limit=50, product_name=None):
+        """One page of open groups in start order; returns (groups, total open groups)
+
+        Only offset + limit entries are walked and only limit are copied, so
+        a view can fetch just the rows it shows.
+        """
+        if product_name is None:
+            source = self.active_groups
+        else:
+            source = self.open_groups_by_product.get(product_name, {})
+        total = len(source)
+        if offset >= total or limit <= 0:
+            return [], total
+        return list(itertools.islice(source, offset, offset + limit)), total
+
+    def discount_schedule(self, product_info):
+        """The product's compiled DiscountSchedule (tiers and promotions), compiled once"""
+        schedule = self.discount_schedules.get(product_info["name"])
+        if schedule is None:
+            schedule = self.discount_schedules.setdefault(product_info["name"], compile_discounts(product_info))
+        return schedule
+
+    def find_open_group(self, group_id):
+        """Look up an open group by its group_id, or None if it is closed or unknown"""
+        return self.open_groups_by_id.get(group_id)
+
+    def product_lock(self, product_name):
+        """The lock guarding one product's open-group indexes"""
+        lock = self.product_locks.get(product_name)
+        if lock is None:
+            lock = self.product_locks.setdefault(product_name, threading.RLock())
+        return lock
+
+    def find_user_group(self, username, product_name):
+        """Return the open group a user is in for a product, or None"""
+        group = self.user_product_groups.get((username, product_name))
+        if group is not None and not group.active:
+            # Group was checked out outside the engine; retire it now
+            self._retire_group(group)
+            return None
+        return group
+
+    def _index_group(self, group):
+        """Add a newly started group and its starter to the open-group indexes"""
+        self.active_groups[group] = None
+        self.open_groups_by_id[group.group_id] = group
+        self.open_groups_by_product.setdefault(group.product, {})[group] = None
+        for username in group.member_usernames:
+            self.user_product_groups[(username, group.product)] = group
+        for buyer in group.buyers:
+            buyer.user.track_open_group(group)
+        self.matcher.add(group)
+        if group.deadline is not None:
+            self.expiry.schedule(group)
+
+    def _unindex_group(self, group):
+        """Remove a closed group and its members from the open-group indexes"""
+        self.active_groups.pop(group, None)
+        self.open_groups_by_id.pop(group.group_id, None)
+        product_groups = self.open_groups_by_product.get(group.product)
+        if product_groups is not None:
+            product_groups.pop(group, None)
+            if not product_groups:
+                del self.open_groups_by_product[group.product]
+        self.matcher.discard(group)
+        for username in group.member_usernames:
+            key = (username, group.product)
+            if self.user_product_groups.get(key) is group:
+                del self.user_product_groups[key]
+
+    def restore_open_group(self, group):
+        """Add an already-built open group (e.g. loaded from storage) to the live set"""
+        product_info = self.find_product(group.product)
+        if group.pricing is None and product_info is not None:
+            group.pricing = self.discount_schedule(product_info)
+        self._index_group(group)
+
+    def _retire_group(self, group):
+        """Move a closed group out of the live set and into the archive"""
+        with self.product_lock(group.product):
+            if group not in self.active_groups:
+                return
+            self._unindex_group(group)
+        self.expiry.discard(group)
+        succeeded = bool(group.completed_at)
+        with self.stats_lock:
+            self.archive.add_group(group)
+            for buyer in group.buyers:
+                user = buyer.user
+                user.untrack_open_group(group)
+                if succeeded:
+                    user.completed_count += 1
+                    user.total_savings_sen += buyer.savings_sen
+                else:
+                    user.failed_count += 1
+                user.record_activity("completed" if succeeded else "failed", group)
+        self.storage.group_closed(group)
+
+    def start_group_buy(self, user, product_info):
+        """Start a new group buy; returns (STARTED, group) or (ALREADY_PARTICIPATING, existing group)"""
+        with self.product_lock(product_info["name"]):
+            existing_group = self.find_user_group(user.username, product_info["name"])
+            if existing_group is not None:
+                return ALREADY_PARTICIPATING, existing_group
+
+            new_group = GroupBuy(
+                product_info["name"],
+                product_info["price_sen"],
+                product_info["discount_bp"],
+                product_info["min_required"],
+                user,
+                app_stats=self.app_stats,
+                pricing=self.discount_schedule(product_info)
+            )
+            new_group.deadline = new_group.created_at + self.group_duration
+            with self.stats_lock:
+                new_group.group_id = self.next_group_id
+                self.next_group_id += self.group_id_step
+                self.app_stats["total_groups_created"] += 1
+            # Queue the save before the group becomes visible to other threads,
+            # so its start is always written before any join or checkout
+            self.storage.group_started(new_group)
+            self._index_group(new_group)
+        user.record_activity("started", new_group)
+        return STARTED, new_group
+
+    def join_group_buy(self, user, target_group):
+        """Join an existing group and check it out once it is full (reaches its top discount tier)
+
+        Returns (status, detail): JOINED with the new member count, COMPLETED or
+        FAILED with the CheckoutResult, or one of ALREADY_MEMBER,
+        ALREADY_PARTICIPATING and GROUP_CLOSED with the group concerned. A
+        group found past its deadline is checked out here without the user and
+        comes back as GROUP_EXPIRED with that CheckoutResult.
+        Safe to call from many threads: the group's lock makes the membership
+        check, the join and the checkout one atomic step.
+        """
+        with target_group.lock:
+            if not target_group.active:
+                return GROUP_CLOSED, target_group
+
+            if target_group.deadline is not None and current_timestamp() >= target_group.deadline:
+                # Past its deadline but not yet swept by expire_due_groups
+                _, checkout_result = self.checkout_group(target_group)
+                return GROUP_EXPIRED, checkout_result
+
+            if target_group.has_member(user.username):
+                return ALREADY_MEMBER, target_group
+
+            # Reserve the (user, product) slot so the user cannot join two
+            # groups for the same product at once
+            with self.product_lock(target_group.product):
+                other_group = self.find_user_group(user.username, target_group.product)
+                if other_group is not None:
+                    return ALREADY_PARTICIPATING, other_group
+                self.user_product_groups[(user.username, target_group.product)] = target_group
+
+            current_member_count = target_group.add_buyer(user)
+            user.track_open_group(target_group)
+            user.record_activity("joined", target_group)
+            self.storage.buyer_joined(target_group, target_group.buyers[-1])
+            if current_member_count < target_group.full_size():
+                with self.product_lock(target_group.product):
+                    self.matcher.update(target_group)
+                return JOINED, current_member_count
+
+            return self.checkout_group(target_group)
+
+    def auto_join_group_buy(self, user, product_info, order=CLOSEST_TO_COMPLETION, start_if_none=True):
+        """Join the best open group for a product instead of a hand-picked one
+
+        order is CLOSEST_TO_COMPLETION (fewest members missing, from the
+        matcher's heap in O(log n)) or OLDEST (first in start order, O(1)).
+        Returns what join_group_buy returns, except that JOINED comes with
+        the group joined; when no group is open, starts one and returns
+        (STARTED, group), or (NO_OPEN_GROUP, None) if start_if_none is False.
+        """
+        product_name = product_info["name"]
+        existing_group = self.find_user_group(user.username, product_name)
+        if existing_group is not None:
+            return ALREADY_PARTICIPATING, existing_group
+
+        while True:
+            with self.product_lock(product_name):
+                if order == OLDEST:
+                    target_group = next(iter(self.open_groups_by_product.get(product_name, ())), None)
+                else:
+                    target_group = self.matcher.best(product_name)
+            if target_group is None:
+                break
+            status, detail = self.join_group_buy(user, target_group)
+            if status == JOINED:
+                return JOINED, target_group
+            if status not in (GROUP_CLOSED, GROUP_EXPIRED):
+                return status, detail
+            # The group closed (filled up or passed its deadline) since it was
+            # picked; make sure it has left the indexes, then pick again
+            self._retire_group(target_group)
+
+        if not start_if_none:
+            return NO_OPEN_GROUP, None
+        return self.start_group_buy(user, product_info)
+
+    def checkout_group(self, group):
+        """Check out a group and record revenue exactly once
+
+        Returns (COMPLETED or FAILED, CheckoutResult), or (GROUP_CLOSED, group)
+        if another caller already checked the group out.
+        """
+        with group.lock:
+            if not group.active:
+                return GROUP_CLOSED, group
+
+            with self.stats_lock:
+                checkout_result = group.checkout()
+                if checkout_result.success:
+                    self.revenue.record(group.product, group.completed_at, checkout_result.total_revenue_sen,
+                                        checkout_result.member_count, checkout_result.total_group_savings_sen)
+            self._retire_group(group)
+
+        if not checkout_result.success:
+            return FAILED, checkout_result
+        return COMPLETED, checkout_result
+
+    def expire_due_groups(self, now=None, limit=None):
+        """Check out open groups whose deadline has passed; returns their (status, CheckoutResult) pairs
+
+        Due groups come off the deadline heap in O(log n) each. Groups that
+        reached their top tier were already checked out on their last join;
+        the rest complete here at the tier they reached, or fail if they are
+        short of min_required. limit caps the work done per call.
+        """
+        due_groups = self.expiry.pop_due(current_timestamp() if now is None else now, limit)
+        results = []
+        for group in due_groups:
+            status, detail = self.checkout_group(group)
+            if status != GROUP_CLOSED:
+                results.append((status, detail))
+        return results
+
+    # ----- statistics -----
+    def recount_app_statistics(self):
+        """Recompute application statistics from the live groups and the archive totals"""
+        return {
+            "total_groups_created": len(self.active_groups) + self.archive.total_archived,
+            "successful_groups": len([g for g in self.active_groups if not g.active and g.completed_at]) + self.archive.successful_count,
+            "failed_groups": len([g for g in self.active_groups if not g.active and not g.completed_at]) + self.archive.failed_count,
+            "total_users_registered": len(self.registered_users),
+            "total_items_sold": sum(len(g.buyers) for g in self.active_groups if not g.active and g.completed_at) + self.archive.items_sold
+        }
+
+    def update_app_statistics(self, consistency_check=False):
+        """Update global application statistics
+
+        The counters are maintained as groups start and close, so this is O(1).
+        With consistency_check=True the counters are compared against a full
+        recount, corrected, and any mismatches returned as {key: (counter, recount)}.
+        """
+        self.app_stats["total_users_registered"] = len(self.registered_users)
+        if not consistency_check:
+            return {}
+
+        mismatches = {}
+        for key, recounted in self.recount_app_statistics().items():
+            if self.app_stats[key] != recounted:
+                mismatches[key] = (self.app_stats[key], recounted)
+                self.app_stats[key] = recounted
+        return mismatches
+
+    def user_statistics(self, user):
+        """Collect a user's active, completed and failed groups plus total savings
+
+        Read from the user's activity index, so the cost depends on the user's
+        own groups only. Active groups are live GroupBuy objects; completed and
+        failed groups are ArchivedGroup records from the archive's in-memory
+        window, while the counts and savings cover the user's whole history.
+        """
+        user_completed_groups = []
+        user_failed_groups = []
+        for record in self.archive.groups_for_user(user.username):
+            if record.succeeded:
+                user_completed_groups.append(record)
+            else:
+                user_failed_groups.append(record)
+
+        return {
+            "active": list(user.active_groups or ()),
+            "completed": user_completed_groups,
+            "failed": user_failed_groups,
+            "completed_count": user.completed_count,
+            "failed_count": user.failed_count,
+            "total_savings": to_ringgit(user.total_savings_sen)
+        }
+
+    @property
+    def total_seller_revenue(self):
+        return to_ringgit(self.revenue.totals.revenue_sen)
+
+    def revenue_dashboard(self, top_n=5):
+        """Summarise seller revenue, group counts and the top selling products
+
+        Everything is read from running counters and the revenue rollup's
+        top-K heap, so the cost does not grow with the number of groups.
+        """
+        self.update_app_statistics()
+
+        active_group_count = len(self.active_groups)
+        successful = self.app_stats["successful_groups"]
+        with self.stats_lock:
+            total_revenue_sen = self.revenue.totals.revenue_sen
+            total_savings_sen = self.revenue.totals.savings_sen
+            top_products = self.revenue.top_products(top_n)
+        return {
+            "total_revenue": to_ringgit(total_revenue_sen),
+            "total_revenue_sen": total_revenue_sen,
+            "total_savings": to_ringgit(total_savings_sen),
+            "successful_groups": successful,
+            "failed_groups": self.app_stats["failed_groups"],
+            "active_groups": active_group_count,
+            "total_items_sold": self.app_stats["total_items_sold"],
+            "total_users_registered": self.app_stats["total_users_registered"],
+            "average_revenue": to_ringgit(total_revenue_sen / successful) if successful else 0,
+            "success_rate": (successful / max(self.app_stats["total_groups_created"], 1)) * 100,
+            "top_products": top_products
+        }
+
+    def revenue_over_time(self, period="hour", count=24, now=None):
+        """Completed-group revenue for the last count hours or days ("hour" or "day"), oldest first
+
+        Returns a list of dicts with the bucket start (epoch seconds and
+        formatted), revenue, units, savings and completed groups.
+        """
+        with self.stats_lock:
+            buckets = self.revenue.buckets(period, count, now)
+            return [{
+                "start": start,
+                "start_time": format_timestamp(start),
+                "revenue": to_ringgit(totals.revenue_sen),
+                "units": totals.units,
+                "savings": to_ringgit(totals.savings_sen),
+                "groups": totals.groups
+            } for start, totals in buckets]
@@ -0,0 +1,418 @@
+"""Append-only event log storage with snapshots for fast recovery.
+
+Every state change the engine reports is appended to a segment file as one
+compact JSON array per line:
+
+    ["u", username, password_hash, created_at]                      user registered
+    ["p", username, password_hash]                                  password rehashed
+    ["s", group_id, product, price_sen, discount_bp, min_required,
+          created_at, deadline, starter, joined_at]                 group started
+    ["j", group_id, username, joined_at]                            buyer joined
+    ["c", group_id, succeeded, final_price_sen, savings_sen,
+          completed_at, revenue_sen, discount_bp]                   group checked out at its tier
+
+Money is integer sen and discounts integer basis points, as in the engine.
+
+Segments are named after the sequence number of their first event
+(events-000000100000.log) and a new one is started every segment_events
+events. When a segment is closed, a background thread compacts the newest
+snapshot plus the closed segments into a new snapshot
+(snapshot-000000100000.json). Snapshots are built from the log, not from the
+live engine, so they are consistent without pausing it. Recovery loads the
+newest snapshot and replays only the segments written after it.
+
+Old segments are kept as the audit trail: every checkout records its
+revenue, so the seller's total revenue can be re-derived at any point in time.
+
+    python groupbuy_eventlog.py audit eventlog/
+    python groupbuy_eventlog.py compact eventlog/     (folds every segment but the newest)
+"""
+import argparse
+import collections
+import json
+import os
+import re
+import threading
+import time
+
+from groupbuy_archive import ArchivedGroup
+from groupbuy_pricing import to_percent, to_ringgit
+from groupbuy_storage import MemoryStorage
+
+SEGMENT_PATTERN = re.compile(r"events-(\d+)\.log$")
+SNAPSHOT_PATTERN = re.compile(r"snapshot-(\d+)\.json$")
+SNAPSHOTS_KEPT = 2
+
+# ==================== REPLAY ====================
+def empty_state(archive_window):
+    """Engine state as plain data, before any event"""
+    return {
+        "next_seq": 0,
+        "users": {},  # username -> [password_hash, created_at, completed, failed, savings_sen]
+        "open_groups": {},  # group_id -> [product, price_sen, discount_bp, min_required, created_at, deadline, members]
+        "recent_closed": collections.deque(maxlen=archive_window),  # ArchivedGroup field lists, in sen
+        "app_stats": {
+            "total_groups_created": 0,
+            "successful_groups": 0,
+            "failed_groups": 0,
+            "total_users_registered": 0,
+            "total_items_sold": 0
+        },
+        "total_revenue_sen": 0,
+        "revenue_buckets": {},  # (product, hour start) -> [revenue_sen, units, savings_sen, groups]
+        "next_group_id": 1
+    }
+
+def apply_record(state, record):
+    """Apply one logged event to a plain-data state"""
+    kind = record[0]
+    if kind == "u":
+        _, username, password_hash, created_at = record
+        state["users"][username] = [password_hash, created_at, 0, 0, 0]
+        state["app_stats"]["total_users_registered"] = len(state["users"])
+    elif kind == "p":
+        state["users"][record[1]][0] = record[2]
+    elif kind == "s":
+        _, group_id, product, price_sen, discount_bp, min_required, created_at, deadline, starter, joined_at = record
+        state["open_groups"][group_id] = [product, price_sen, discount_bp, min_required, created_at, deadline,
+                                          [[starter, joined_at]]]
+        state["app_stats"]["total_groups_created"] += 1
+        state["next_group_id"] = max(state["next_group_id"], group_id + 1)
+    elif kind == "j":
+        state["open_groups"][record[1]][6].append([record[2], record[3]])
+    elif kind == "c":
+        _, group_id, succeeded, final_price_sen, savings_sen, completed_at, revenue_sen = record[:7]
+        product, price_sen, discount_bp, min_required, created_at, _, members = state["open_groups"].pop(group_id)
+        if len(record) > 7:
+            discount_bp = record[7]  # the tier applied (older logs only have the base discount)
+        app_stats = state["app_stats"]
+        users = state["users"]
+        for username, _ in members:
+            if succeeded:
+                users[username][2] += 1
+                users[username][4] += savings_sen
+            else:
+                users[username][3] += 1
+        if succeeded:
+            app_stats["successful_groups"] += 1
+            app_stats["total_items_sold"] += len(members)
+            state["total_revenue_sen"] += revenue_sen
+            bucket_key = (product, completed_at - completed_at % 3600)
+            bucket = state["revenue_buckets"].get(bucket_key)
+            if bucket is None:
+                bucket = state["revenue_buckets"][bucket_key] = [0, 0, 0, 0]
+            bucket[0] += revenue_sen
+            bucket[1] += len(members)
+            bucket[2] += savings_sen * len(members)
+            bucket[3] += 1
+        else:
+            app_stats["failed_groups"] += 1
+        state["recent_closed"].append([product, price_sen, discount_bp, min_required,
+                                       [username for username, _ in members], final_price_sen, savings_sen,
+                                       created_at, completed_at, bool(succeeded)])
+    else:
+        raise ValueError(f"Unknown event log record {record!r}")
+
+def iter_segment(path):
+    """Yield the records of one segment; a torn last line (from a crash mid-write) is ignored"""
+    with open(path, encoding="utf-8") as segment_file:
+        for line in segment_file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                if line.endswith("\n"):
+                    raise
+                return
+            yield record
+
+def list_files(directory, pattern):
+    """(sequence number, path) for files matching pattern, oldest first"""
+    found = []
+    for name in os.listdir(directory):
+        match = pattern.match(name)
+        if match:
+            found.append((int(match.group(1)), os.path.join(directory, name)))
+    found.sort()
+    return found
+
+def load_snapshot(path, archive_window):
+    """Read a snapshot file back into a plain-data state"""
+    with open(path, encoding="utf-8") as snapshot_file:
+        saved = json.load(snapshot_file)
+    state = empty_state(archive_window)
+    state["next_seq"] = saved["next_seq"]
+    state["users"] = saved["users"]
+    state["open_groups"] = {group[0]: group[1:] for group in saved["open_groups"]}
+    state["recent_closed"].extend(saved["recent_closed"])
+    state["app_stats"].update(saved["app_stats"])
+    state["total_revenue_sen"] = saved["total_revenue_sen"]
+    state["revenue_buckets"] = {(bucket[0], bucket[1]): bucket[2:] for bucket in saved["revenue_buckets"]}
+    state["next_group_id"] = saved["next_group_id"]
+    return state
+
+def write_snapshot(directory, state):
+    """Atomically write a snapshot of state (written to a temporary file, then renamed)"""
+    path = os.path.join(directory, f"snapshot-{state['next_seq']:012d}.json")
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as snapshot_file:
+        json.dump({
+            "next_seq": state["next_seq"],
+            "users": state["users"],
+            "open_groups": [[group_id] + group for group_id, group in state["open_groups"].items()],
+            "recent_closed": list(state["recent_closed"]),
+            "app_stats": state["app_stats"],
+            "total_revenue_sen": state["total_revenue_sen"],
+            "revenue_buckets": [list(key) + totals for key, totals in state["revenue_buckets"].items()],
+            "next_group_id": state["next_group_id"]
+        }, snapshot_file, separators=(",", ":"))
+        snapshot_file.flush()
+        os.fsync(snapshot_file.fileno())
+    os.replace(temporary_path, path)
+    return path
+
+def recover_state(directory, archive_window, up_to_seq=None):
+    """Newest snapshot plus every later record (only from segments starting before up_to_seq, if given)
+
+    A segment the snapshot only partly covers is replayed from the
+    snapshot's next_seq, so records appended after the snapshot are kept.
+    """
+    snapshots = list_files(directory, SNAPSHOT_PATTERN)
+    if snapshots:
+        state = load_snapshot(snapshots[-1][1], archive_window)
+    else:
+        state = empty_state(archive_window)
+    segments = list_files(directory, SEGMENT_PATTERN)
+    for position, (first_seq, path) in enumerate(segments):
+        if up_to_seq is not None and first_seq >= up_to_seq:
+            break
+        if position + 1 < len(segments) and segments[position + 1][0] <= state["next_seq"]:
+            continue  # entirely inside the snapshot
+        seq = first_seq
+        for record in iter_segment(path):
+            if seq >= state["next_seq"]:
+                apply_record(state, record)
+            seq += 1
+        state["next_seq"] = max(state["next_seq"], seq)
+    return state
+
+def compact(directory, up_to_seq=None, archive_window=10000):
+    """Fold closed segments into a new snapshot; returns its path (None if nothing to fold)
+
+    Without up_to_seq everything before the newest segment is folded; the
+    newest one may still be written to by a running engine.
+    """
+    if up_to_seq is None:
+        segments = list_files(directory, SEGMENT_PATTERN)
+        up_to_seq = segments[-1][0] if segments else 0
+    state = recover_state(directory, archive_window, up_to_seq)
+    snapshots = list_files(directory, SNAPSHOT_PATTERN)
+    if state["next_seq"] <= (snapshots[-1][0] if snapshots else 0):
+        return None
+    path = write_snapshot(directory, state)
+    for _, old_path in list_files(directory, SNAPSHOT_PATTERN)[:-SNAPSHOTS_KEPT]:
+        os.remove(old_path)
+    return path
+
+# ==================== STORAGE BACKEND ====================
+class EventLogStorage(MemoryStorage):
+    """Storage backend writing an append-only event log with background snapshots
+
+    Records are buffered by the file object; flush() hands them to the OS
+    (and fsyncs when fsync=True). A new segment starts every segment_events
+    records, and closing a segment triggers a snapshot in a background thread.
+    """
+
+    def __init__(self, directory, segment_events=100000, fsync=False, archive_window=10000):
+        self.directory = directory
+        self.segment_events = segment_events
+        self.fsync = fsync
+        self.archive_window = archive_window
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.RLock()
+        self.engine = None
+        self.segment_file = None
+        self.segment_first_seq = 0
+        self.next_seq = 0
+        self.compaction_thread = None
+        self.last_recovery_seconds = 0
+
+    # ----- loading -----
+    def load_into(self, engine):
+        """Rebuild engine state from the newest snapshot and the log tail"""
+        from groupbuy_engine import Buyer, GroupBuy, User
+
+        started = time.perf_counter()
+        self.engine = engine
+        state = recover_state(self.directory, self.archive_window)
+
+        for username, (password_hash, created_at, completed_count, failed_count, total_savings_sen) in (
+                state["users"].items()):
+            user = User(username, password_hash)
+            user.created_at = created_at
+            user.completed_count = completed_count
+            user.failed_count = failed_count
+            user.total_savings_sen = total_savings_sen
+            engine.registered_users[username] = user
+        engine.app_stats.update(state["app_stats"])
+        for (product, hour), (revenue_sen, units, savings_sen, groups) in sorted(
+                state["revenue_buckets"].items(), key=lambda item: item[0][1]):
+            engine.revenue.record(product, hour, revenue_sen, units, savings_sen, groups)
+        engine.next_group_id = state["next_group_id"]
+
+        for group_id, (product, price_sen, discount_bp, min_required, created_at, deadline, members) in sorted(
+                state["open_groups"].items()):
+            (starter_name, starter_joined_at), later_members = members[0], members[1:]
+            group = GroupBuy(product, price_sen, discount_bp, min_required,
+                             engine.registered_users[starter_name], app_stats=engine.app_stats)
+            group.group_id = group_id
+            group.created_at = created_at
+            group.deadline = deadline if deadline is not None else created_at + engine.group_duration
+            group.buyers[0].joined_at = starter_joined_at
+            for username, joined_at in later_members:
+                buyer = Buyer(engine.registered_users[username])
+                buyer.joined_at = joined_at
+                group.buyers.append(buyer)
+            engine.restore_open_group(group)
+
+        archive = engine.archive
+        for (product, price_sen, discount_bp, min_required, members, final_price_sen, savings_sen,
+             created_at, completed_at, succeeded) in state["recent_closed"]:
+            archive.add(ArchivedGroup(product, to_ringgit(price_sen), to_percent(discount_bp), min_required,
+                                      tuple(members), to_ringgit(final_price_sen), to_ringgit(savings_sen),
+                                      created_at, completed_at, succeeded))
+        # Archive totals cover every closed group, not just the recovered window
+        archive.successful_count = engine.app_stats["successful_groups"]
+        archive.failed_count = engine.app_stats["failed_groups"]
+        archive.total_archived = archive.successful_count + archive.failed_count
+        archive.items_sold = engine.app_stats["total_items_sold"]
+
+        # Never append after a possibly torn line: continue in a fresh segment
+        self.next_seq = state["next_seq"]
+        self._open_segment()
+        self.last_recovery_seconds = time.perf_counter() - started
+
+    # ----- change hooks -----
+    def user_registered(self, user):
+        self._append(["u", user.username, user.password_hash, user.created_at])
+
+    def user_updated(self, user):
+        self._append(["p", user.username, user.password_hash])
+
+    def group_started(self, group):
+        starter = group.buyers[0]
+        self._append(["s", group.group_id, group.product, group.price_sen, group.discount_bp, group.min_required,
+                      group.created_at, group.deadline, starter.user.username, starter.joined_at])
+
+    def buyer_joined(self, group, buyer):
+        self._append(["j", group.group_id, buyer.user.username, buyer.joined_at])
+
+    def group_closed(self, group):
+        first_buyer = group.buyers[0]
+        succeeded = bool(group.completed_at)
+        revenue_sen = first_buyer.final_price_sen * len(group.buyers) if succeeded else 0
+        self._append(["c", group.group_id, int(succeeded), first_buyer.final_price_sen, first_buyer.savings_sen,
+                      group.completed_at, revenue_sen, group.discount_bp])
+
+    # ----- writing -----
+    def _append(self, record):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self.lock:
+            if self.segment_file is None:
+                self._open_segment()
+            self.segment_file.write(line)
+            self.next_seq += 1
+            if self.next_seq - self.segment_first_seq >= self.segment_events:
+                self._rotate()
+
+    def _open_segment(self):
+        self.segment_first_seq = self.next_seq
+        path = os.path.join(self.directory, f"events-{self.next_seq:012d}.log")
+        # A file with this name can only hold a torn first line from a crash, so it is overwritten
+        self.segment_file = open(path, "w", encoding="utf-8")
+
+    def _rotate(self):
+        """Close the current segment, start the next one and snapshot in the background"""
+        self._close_segment()
+        self._open_segment()
+        self.start_compaction()
+
+    def _close_segment(self):
+        if self.segment_file is not None:
+            self.segment_file.flush()
+            os.fsync(self.segment_file.fileno())
+            self.segment_file.close()
+            self.segment_file = None
+
+    def start_compaction(self):
+        """Snapshot all closed segments on a background thread (one at a time)"""
+        if self.compaction_thread is not None and self.compaction_thread.is_alive():
+            return
+        self.compaction_thread = threading.Thread(
+            target=compact, args=(self.directory, self.segment_first_seq, self.archive_window),
+            name="eventlog-compaction", daemon=True)
+        self.compaction_thread.start()
+
+    def flush(self):
+        """Hand buffered records to the OS (and to disk when fsync is on)"""
+        with self.lock:
+            if self.segment_file is not None:
+                self.segment_file.flush()
+                if self.fsync:
+                    os.fsync(self.segment_file.fileno())
+
+    def close(self):
+        """Close the current segment and wait for any running snapshot"""
+        with self.lock:
+            self._close_segment()
+        if self.compaction_thread is not None:
+            self.compaction_thread.join()
+
+# ==================== AUDIT ====================
+def audit_revenue(directory):
+    """Yield (seq, group_id, product, revenue_sen, running total in sen) for every successful checkout in the log
+
+    Replays all retained segments from the beginning, so it needs the full
+    segment history (segments are never deleted by this module).
+    """
+    open_products = {}
+    running_total = 0
+    for first_seq, path in list_files(directory, SEGMENT_PATTERN):
+        for offset, record in enumerate(iter_segment(path)):
+            if record[0] == "s":
+                open_products[record[1]] = record[2]
+            elif record[0] == "c":
+                product = open_products.pop(record[1], "?")
+                if record[2]:
+                    running_total += record[6]
+                    yield first_seq + offset, record[1], product, record[6], running_total
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or compact a group-buy event log")
+    parser.add_argument("command", choices=["audit", "compact"])
+    parser.add_argument("directory")
+    parser.add_argument("--tail", type=int, default=20, help="checkouts to print for audit")
+    args = parser.parse_args(argv)
+
+    if args.command == "compact":
+        started = time.perf_counter()
+        path = compact(args.directory)
+        print(f"📸 Snapshot written: {path} ({time.perf_counter() - started:.2f}s)" if path
+              else "📸 Snapshot already up to date")
+        return
+
+    recent = collections.deque(maxlen=args.tail)
+    checkouts = 0
+    total = 0
+    for entry in audit_revenue(args.directory):
+        recent.append(entry)
+        checkouts += 1
+        total = entry[4]
+    print(f"🧾 REVENUE AUDIT: {checkouts:,} successful checkouts, total RM {to_ringgit(total):,.2f}")
+    for seq, group_id, product, revenue_sen, running_total in recent:
+        print(f"  #{seq:<10} group {group_id:<8} {product:<32} +RM {to_ringgit(revenue_sen):>10,.2f}  "
+              f"= RM {to_ringgit(running_total):,.2f}")
+    state = recover_state(args.directory, 0)
+    print(f"✅ Recovered state total: RM {to_ringgit(state['total_revenue_sen']):,.2f}")
+
+if __name__ == "__main__":
+    main()
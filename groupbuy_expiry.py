@@ -0,0 +1,64 @@
+"""Deadline scheduler for open group buys.
+
+Every open group with a deadline sits in a binary heap ordered by deadline,
+so finding and removing the next due group is O(log n) however many groups
+are pending. Groups that close early (they filled up) are not searched for
+in the heap; their entries are skipped when they reach the top and swept
+out in one pass once they make up half the heap.
+
+The scheduler never checks anything out itself. GroupBuyEngine.expire_due_groups
+pops the due groups and checks them out; frontends call it from a Tk after()
+timer or an asyncio task.
+"""
+import heapq
+import threading
+
+# Sweep closed entries out once there are at least this many (and they are half the heap)
+MIN_STALE_TO_COMPACT = 1024
+
+class ExpiryScheduler:
+    """Min-heap of (deadline, group_id, group) for the open groups"""
+
+    def __init__(self):
+        self.heap = []
+        self.closed_entries = 0  # upper bound on heap entries whose group has closed
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def schedule(self, group):
+        """Add an open group with a deadline"""
+        with self.lock:
+            heapq.heappush(self.heap, (group.deadline, group.group_id, group))
+
+    def discard(self, group):
+        """Note that a group has closed; its entry is dropped lazily"""
+        with self.lock:
+            self.closed_entries += 1
+            if self.closed_entries >= MIN_STALE_TO_COMPACT and self.closed_entries * 2 >= len(self.heap):
+                self.heap = [entry for entry in self.heap if entry[2].active]
+                heapq.heapify(self.heap)
+                self.closed_entries = 0
+
+    def next_deadline(self):
+        """Deadline of the next open group to expire, or None"""
+        with self.lock:
+            self._drop_closed_top()
+            return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now, limit=None):
+        """Remove and return open groups whose deadline is at or before now, earliest first"""
+        due = []
+        with self.lock:
+            while self.heap and (limit is None or len(due) < limit):
+                self._drop_closed_top()
+                if not self.heap or self.heap[0][0] > now:
+                    break
+                due.append(heapq.heappop(self.heap)[2])
+        return due
+
+    def _drop_closed_top(self):
+        while self.heap and not self.heap[0][2].active:
+            heapq.heappop(self.heap)
+            self.closed_entries = max(self.closed_entries - 1, 0)
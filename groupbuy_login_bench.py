@@ -0,0 +1,91 @@
+"""Login throughput benchmark for the password hashing cost settings.
+
+For each cost, registers a set of users and then logs them all in at once
+through the engine's password worker pool from an asyncio loop, the way the
+HTTP service does. Reports logins per second, login latency and the longest
+stall of the event loop (which stays near zero because verification runs on
+the workers):
+
+    python groupbuy_login_bench.py --costs 10,12,14,15 --logins 200
+    python groupbuy_login_bench.py --algorithm pbkdf2_sha256 --costs 16,18,19
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from groupbuy_engine import GroupBuyEngine
+from groupbuy_passwords import DEFAULT_COSTS, PBKDF2, SCRYPT, PasswordHasher
+
+TICK_SECONDS = 0.005
+
+async def measure_logins(engine, usernames, password):
+    """Log every user in concurrently; returns (elapsed seconds, sorted latencies, max loop stall)"""
+    stall = {"max": 0.0, "running": True}
+
+    async def ticker():
+        # Measures how late the loop wakes up a task sleeping TICK_SECONDS
+        while stall["running"]:
+            started = time.perf_counter()
+            await asyncio.sleep(TICK_SECONDS)
+            stall["max"] = max(stall["max"], time.perf_counter() - started - TICK_SECONDS)
+
+    async def login(username):
+        started = time.perf_counter()
+        is_authenticated, _ = await asyncio.wrap_future(engine.submit_authenticate_user(username, password))
+        if not is_authenticated:
+            raise AssertionError(f"login failed for {username}")
+        return time.perf_counter() - started
+
+    ticker_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(login(username) for username in usernames))
+    elapsed = time.perf_counter() - started
+    stall["running"] = False
+    await ticker_task
+    return elapsed, sorted(latencies), stall["max"]
+
+def run_cost(algorithm, cost, logins, workers):
+    """Register logins users at one cost and time logging them all in"""
+    engine = GroupBuyEngine(password_hasher=PasswordHasher(algorithm, cost, workers))
+    password = "pass1234"
+    usernames = [f"login{i:06d}" for i in range(logins)]
+    for future in [engine.submit_register_user(username, password) for username in usernames]:
+        future.result()
+
+    elapsed, latencies, max_stall = asyncio.run(measure_logins(engine, usernames, password))
+    engine.close()
+    return {
+        "algorithm": algorithm,
+        "cost": cost,
+        "logins": logins,
+        "logins_per_second": logins / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "max_loop_stall_ms": max_stall * 1000
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark login throughput at different hashing costs")
+    parser.add_argument("--algorithm", choices=[SCRYPT, PBKDF2], default=SCRYPT)
+    parser.add_argument("--costs", help="comma-separated log2 cost values (default: a sweep up to the default cost)")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    default_cost = DEFAULT_COSTS[args.algorithm]
+    if args.costs:
+        costs = [int(cost) for cost in args.costs.split(",")]
+    else:
+        costs = [default_cost - 4, default_cost - 2, default_cost, default_cost + 1]
+
+    print(f"🔐 LOGIN THROUGHPUT ({args.algorithm}, {args.workers} workers, {args.logins} logins per cost)")
+    print(f"  {'cost':>4}  {'logins/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'loop stall ms':>15}")
+    for cost in costs:
+        row = run_cost(args.algorithm, cost, args.logins, args.workers)
+        marker = "  ← default" if cost == default_cost else ""
+        print(f"  {cost:>4}  {row['logins_per_second']:>10,.1f}{row['p50_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+              f"{row['max_loop_stall_ms']:>15.1f}{marker}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Matchmaking: route a joiner to the best open group for a product.
+
+Each product's open groups sit in a binary heap ordered by how close they
+are to completing. Groups still short of min_required come first, fewest
+missing members first; after them come groups that have reached
+min_required and are waiting for a bigger tier, closest to their top tier
+first. Ties go to the oldest group. Filling nearly complete groups first
+leaves fewer half-filled groups to fail at their deadline, which matters
+most in a flash sale, when many groups for one product are open at once.
+
+A group's heap entry is replaced rather than updated when someone joins:
+the re-ranked entry is pushed in O(log n), and the old one is skipped when
+it reaches the top, like the entries of closed groups. Stale entries are
+swept out in one pass once they make up half of a product's heap.
+
+The matcher has no lock of its own; the engine calls it under the
+product's lock.
+"""
+import heapq
+
+# Sweep stale entries out of a product's heap once there are at least this many (and they are half of it)
+MIN_STALE_TO_COMPACT = 64
+
+def completion_rank(group, members):
+    """(stage, members still missing) for a group of this size; smaller is closer to completing"""
+    missing = group.min_required - members
+    if missing > 0:
+        return 0, missing
+    return 1, group.full_size() - members
+
+class GroupMatcher:
+    """Per-product min-heaps of (stage, missing, group_id, members, group) for the open groups"""
+
+    def __init__(self):
+        self.heaps = {}  # product name -> heap
+        self.stale_entries = {}  # product name -> upper bound on entries that are out of date
+
+    def add(self, group):
+        """Add a newly opened group"""
+        members = len(group.buyers)
+        stage, missing = completion_rank(group, members)
+        heap = self.heaps.get(group.product)
+        if heap is None:
+            heap = self.heaps[group.product] = []
+        heapq.heappush(heap, (stage, missing, group.group_id, members, group))
+
+    def update(self, group):
+        """Re-rank a group after someone joined it"""
+        self.add(group)
+        self._count_stale(group.product)
+
+    def discard(self, group):
+        """Note that a group has closed; its entry is dropped lazily"""
+        self._count_stale(group.product)
+
+    def best(self, product_name):
+        """The open group for a product that is closest to completing, or None"""
+        heap = self.heaps.get(product_name)
+        while heap:
+            _, _, _, members, group = heap[0]
+            if group.active and len(group.buyers) == members:
+                return group
+            heapq.heappop(heap)
+            self.stale_entries[product_name] = max(self.stale_entries.get(product_name, 0) - 1, 0)
+        if heap is not None:
+            del self.heaps[product_name]
+            self.stale_entries.pop(product_name, None)
+        return None
+
+    def _count_stale(self, product_name):
+        stale = self.stale_entries.get(product_name, 0) + 1
+        heap = self.heaps.get(product_name, ())
+        if stale >= MIN_STALE_TO_COMPACT and stale * 2 >= len(heap):
+            heap = [entry for entry in heap if entry[4].active and len(entry[4].buyers) == entry[3]]
+            heapq.heapify(heap)
+            if heap:
+                self.heaps[product_name] = heap
+            else:
+                self.heaps.pop(product_name, None)
+            stale = 0
+        self.stale_entries[product_name] = stale
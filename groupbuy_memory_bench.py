@@ -0,0 +1,97 @@
+"""Memory benchmark: bytes per buyer, user and group for the engine's data classes.
+
+Compares the slot-based classes (integer timestamps) with the original
+dict-backed layout that stored a formatted strftime string per object.
+
+    python groupbuy_memory_bench.py --buyers 200000
+"""
+import argparse
+import datetime
+import gc
+import tracemalloc
+
+from groupbuy_engine import Buyer, GroupBuy, User
+
+# ==================== ORIGINAL LAYOUT (baseline) ====================
+class DictUser:
+    def __init__(self, username, password):
+        self.username = username
+        self.password = password
+        self.join_history = []
+        self.created_date = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+
+class DictBuyer:
+    def __init__(self, user):
+        self.user = user
+        self.final_price = 0
+        self.savings = 0
+        self.join_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+
+class DictGroupBuy:
+    def __init__(self, product_name, original_price, discount_percent, min_required, starter_user):
+        self.product = product_name
+        self.price = original_price
+        self.discount = discount_percent
+        self.min_required = min_required
+        self.buyers = [DictBuyer(starter_user)]
+        self.active = True
+        self.created_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+        self.completed_time = None
+
+# ==================== MEASUREMENT ====================
+def measure_bytes(build, count):
+    """Bytes allocated per item by build(count), measured with tracemalloc"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build(count)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / count
+
+def build_users(user_class):
+    def build(count):
+        return [user_class(f"user{i:07d}", "pass") for i in range(count)]
+    return build
+
+def build_buyers(user_class, buyer_class):
+    # Users are shared by all buyers, so only the Buyer objects are counted
+    users = [user_class(f"user{i:04d}", "pass") for i in range(1000)]
+    def build(count):
+        return [buyer_class(users[i % 1000]) for i in range(count)]
+    return build
+
+def build_groups(user_class, group_class, group_args):
+    starter = user_class("starter", "pass")
+    def build(count):
+        return [group_class("Xiaomi Redmi Earbuds Pro", *group_args, 3, starter) for _ in range(count)]
+    return build
+
+def run_memory_benchmark(buyers=200000, groups=50000, users=200000):
+    """Return {object kind: (original bytes, slotted bytes)}"""
+    return {
+        "buyer": (measure_bytes(build_buyers(DictUser, DictBuyer), buyers),
+                  measure_bytes(build_buyers(User, Buyer), buyers)),
+        "user": (measure_bytes(build_users(DictUser), users),
+                 measure_bytes(build_users(User), users)),
+        # The original layout held a float ringgit price and a percentage; GroupBuy holds sen and basis points
+        "group (with starter buyer)": (measure_bytes(build_groups(DictUser, DictGroupBuy, (159.90, 30)), groups),
+                                       measure_bytes(build_groups(User, GroupBuy, (15990, 3000)), groups))
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure bytes per buyer, user and group")
+    parser.add_argument("--buyers", type=int, default=200000)
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--groups", type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    results = run_memory_benchmark(args.buyers, args.groups, args.users)
+    print("📦 MEMORY PER OBJECT (bytes)")
+    print(f"  {'object':<28}{'original':>10}{'slotted':>10}{'saved':>8}")
+    for kind, (original, slotted) in results.items():
+        print(f"  {kind:<28}{original:>10.1f}{slotted:>10.1f}{(1 - slotted/original)*100:>7.0f}%")
+
+if __name__ == "__main__":
+    main()
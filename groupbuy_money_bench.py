@@ -0,0 +1,179 @@
+"""Fixed-point money check and benchmark.
+
+First checks the integer-sen pricing path against decimal.Decimal on random
+prices, discounts and group sizes: every per-person price, saving and
+revenue must match Decimal rounded half up to the sen, and a long running
+revenue total must match to the sen. Then times the checkout arithmetic and
+a revenue total over many orders three ways: the old float formulas,
+Decimal, and integer sen, and shows how far the float total drifts:
+
+    python groupbuy_money_bench.py --cases 200000 --orders 2000000
+"""
+import argparse
+import decimal
+import random
+import sys
+import time
+
+from groupbuy_pricing import (
+    BASIS_POINTS, ROUNDING, SEN_PER_RINGGIT, discount_sen, price_per_person_sen, to_basis_points, to_ringgit, to_sen
+)
+
+CENT = decimal.Decimal("0.01")
+
+# ==================== REFERENCE ====================
+def decimal_discount(price_sen, discount_bp):
+    """Per-person discount in ringgit, computed with Decimal and rounded half up to the sen"""
+    price = decimal.Decimal(price_sen) / SEN_PER_RINGGIT
+    discount = decimal.Decimal(discount_bp) / BASIS_POINTS
+    return (price * discount).quantize(CENT, ROUNDING)
+
+def decimal_to_sen(amount):
+    return int(amount * SEN_PER_RINGGIT)
+
+def random_order(rng):
+    """(price_sen, discount_bp, members) with the edge cases over-represented"""
+    price_sen = rng.choice((rng.randrange(1, 100), rng.randrange(100, 100000), rng.randrange(10 ** 7),
+                            rng.randrange(10 ** 11)))
+    discount_bp = rng.choice((rng.randrange(BASIS_POINTS), rng.randrange(100) * 100, 50, 5000, BASIS_POINTS - 1))
+    return price_sen, discount_bp, rng.randint(1, 50)
+
+# ==================== PROPERTY CHECKS ====================
+def check_against_decimal(cases, seed):
+    """Compare the sen path with Decimal; returns a list of mismatch descriptions"""
+    rng = random.Random(seed)
+    problems = []
+    running_sen = 0
+    running_decimal = decimal.Decimal(0)
+    for _ in range(cases):
+        price_sen, discount_bp, members = random_order(rng)
+        expected_discount = decimal_discount(price_sen, discount_bp)
+        expected_price = decimal.Decimal(price_sen) / SEN_PER_RINGGIT - expected_discount
+
+        savings = discount_sen(price_sen, discount_bp)
+        final_price = price_per_person_sen(price_sen, discount_bp)
+        if savings != decimal_to_sen(expected_discount) or final_price != decimal_to_sen(expected_price):
+            problems.append(f"{price_sen} sen at {discount_bp} bp: {final_price}/{savings} sen, "
+                            f"Decimal says {expected_price}/{expected_discount}")
+        if not 0 <= savings <= price_sen:
+            problems.append(f"{price_sen} sen at {discount_bp} bp: savings {savings} outside the price")
+
+        running_sen += final_price * members
+        running_decimal += expected_price * members
+
+    if running_sen != decimal_to_sen(running_decimal):
+        problems.append(f"running total {running_sen} sen != Decimal {running_decimal}")
+
+    # Conversions at the edges round half up too and round-trip exactly
+    for _ in range(min(cases, 100000)):
+        sen = rng.randrange(10 ** 9)
+        if to_sen(to_ringgit(sen)) != sen or to_sen(f"{sen // 100}.{sen % 100:02d}") != sen:
+            problems.append(f"{sen} sen does not round-trip through ringgit")
+    for text, expected in (("0.005", 1), ("0.015", 2), ("1.125", 113), ("-0.005", -1), ("159.9", 15990)):
+        if to_sen(text) != expected:
+            problems.append(f"to_sen({text!r}) = {to_sen(text)}, expected {expected}")
+    for text, expected in (("12.345", 1235), ("30", 3000), ("0.005", 1)):
+        if to_basis_points(text) != expected:
+            problems.append(f"to_basis_points({text!r}) = {to_basis_points(text)}, expected {expected}")
+    return problems
+
+# ==================== BENCHMARK ====================
+# The float formulas checkout used before money became fixed-point
+def float_discount_amount(price, discount):
+    return price * (discount / 100)
+
+def float_price_per_person(price, discount):
+    return price - float_discount_amount(price, discount)
+
+# Each timed loop does what checkout does per group: savings, final price, revenue total
+def time_float(orders):
+    """The old checkout: discount_amount and price_per_person in float"""
+    started = time.perf_counter()
+    total = 0.0
+    for price, discount, members in orders:
+        savings = float_discount_amount(price, discount)
+        final_price = float_price_per_person(price, discount)
+        total += final_price * members
+    return time.perf_counter() - started, total
+
+def time_decimal(orders):
+    """Decimal throughout, rounded half up to the sen"""
+    started = time.perf_counter()
+    total = decimal.Decimal(0)
+    for price, discount, members in orders:
+        savings = (price * discount / 100).quantize(CENT, ROUNDING)
+        final_price = price - savings
+        total += final_price * members
+    return time.perf_counter() - started, total
+
+def time_sen(orders):
+    """GroupBuy.checkout now: one rounded division, then exact integer arithmetic"""
+    started = time.perf_counter()
+    total = 0
+    for price_sen, discount_bp, members in orders:
+        savings = discount_sen(price_sen, discount_bp)
+        final_price = price_sen - savings
+        total += final_price * members
+    return time.perf_counter() - started, total
+
+def benchmark(order_count, seed):
+    """Time one checkout-and-total pass per representation over the same orders"""
+    rng = random.Random(seed)
+    prices = [49.9, 79.9, 89.9, 129.9, 159.9, 299.9, 12.35, 0.99]
+    discounts = [5, 12.5, 15, 20, 25, 30, 33.33, 40]
+    catalog = [(price, discount, to_sen(price), to_basis_points(discount)) for price in prices for discount in discounts]
+    picks = [(rng.randrange(len(catalog)), rng.randint(1, 10)) for _ in range(order_count)]
+
+    float_orders = [(catalog[i][0], catalog[i][1], members) for i, members in picks]
+    decimal_orders = [(decimal.Decimal(str(catalog[i][0])), decimal.Decimal(str(catalog[i][1])), members)
+                      for i, members in picks]
+    sen_orders = [(catalog[i][2], catalog[i][3], members) for i, members in picks]
+
+    float_seconds, float_total = time_float(float_orders)
+    decimal_seconds, decimal_total = time_decimal(decimal_orders)
+    sen_seconds, sen_total = time_sen(sen_orders)
+    # What the float formulas would total with exact arithmetic (they never round)
+    unrounded_total = sum(price * (1 - discount / 100) * members for price, discount, members in decimal_orders)
+    return {
+        "orders": order_count,
+        "float": (float_seconds, float_total),
+        "decimal": (decimal_seconds, decimal_total),
+        "sen": (sen_seconds, sen_total),
+        "float_drift_sen": (decimal.Decimal(float_total) - unrounded_total) * SEN_PER_RINGGIT,
+        "sen_error_sen": sen_total - decimal_to_sen(decimal_total)
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check fixed-point money against Decimal and benchmark it")
+    parser.add_argument("--cases", type=int, default=200000, help="random orders for the property checks")
+    parser.add_argument("--orders", type=int, default=2000000, help="orders for the benchmark")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    problems = check_against_decimal(args.cases, args.seed)
+    print(f"🔍 {args.cases:,} random orders checked against Decimal in {time.perf_counter() - started:.1f}s")
+    if problems:
+        for problem in problems[:20]:
+            print(f"  ❌ {problem}")
+        print(f"❌ {len(problems)} mismatches")
+        sys.exit(1)
+    print("✅ Every price, saving and running total matches Decimal (rounded half up to the sen)")
+    print()
+
+    result = benchmark(args.orders, args.seed)
+    print(f"⏱️  CHECKOUT ARITHMETIC ({result['orders']:,} orders):")
+    print(f"  {'path':<10}{'ns/order':>10}{'revenue total (RM)':>24}")
+    for name in ("float", "decimal", "sen"):
+        seconds, total = result[name]
+        print(f"  {name:<10}{seconds / result['orders'] * 1e9:>10.0f}"
+              f"{to_ringgit(total) if name == 'sen' else float(total):>24,.2f}")
+    print()
+    print(f"📉 Float total drift from its own exact value: {float(result['float_drift_sen']):,.4f} sen "
+          f"(and it is never rounded to what buyers are charged)")
+    print(f"🎯 Integer sen total vs Decimal: {result['sen_error_sen']} sen")
+    if result["sen_error_sen"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
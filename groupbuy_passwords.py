@@ -0,0 +1,117 @@
+"""Salted password hashing for user accounts.
+
+Passwords are stored as self-describing strings,
+
+    scrypt$<log2 N>$<r>$<p>$<salt>$<hash>
+    pbkdf2_sha256$<log2 iterations>$<salt>$<hash>
+
+so the cost can be raised later: a successful login with an older cost is
+rehashed with the current one. Values without a known prefix are treated as
+legacy plaintext passwords from databases written before hashing existed.
+
+Key derivation is deliberately slow, so PasswordHasher runs it in a thread
+pool (hashlib releases the GIL while deriving). Frontends submit work and
+wait on the returned future instead of blocking their event loop.
+"""
+import base64
+import concurrent.futures
+import hashlib
+import hmac
+import os
+
+SCRYPT = "scrypt"
+PBKDF2 = "pbkdf2_sha256"
+# Default cost (log2 of scrypt N, or of PBKDF2 iterations) per algorithm
+DEFAULT_COSTS = {SCRYPT: 14, PBKDF2: 19}
+SCRYPT_BLOCK_SIZE = 8
+SCRYPT_PARALLELISM = 1
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+def _b64encode(raw):
+    return base64.b64encode(raw).decode("ascii").rstrip("=")
+
+def _b64decode(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+def _scrypt(password, salt, cost, block_size, parallelism):
+    n = 2 ** cost
+    # hashlib refuses to use more than 32 MiB unless told otherwise
+    maxmem = 2 * 128 * block_size * (n + parallelism) + 1024 * 1024
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=block_size, p=parallelism,
+                          maxmem=maxmem, dklen=HASH_BYTES)
+
+def _pbkdf2(password, salt, cost):
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 2 ** cost, dklen=HASH_BYTES)
+
+def hash_password(password, algorithm=SCRYPT, cost=None):
+    """Hash a password with a fresh random salt; returns the encoded hash string"""
+    cost = DEFAULT_COSTS[algorithm] if cost is None else cost
+    salt = os.urandom(SALT_BYTES)
+    if algorithm == SCRYPT:
+        derived = _scrypt(password, salt, cost, SCRYPT_BLOCK_SIZE, SCRYPT_PARALLELISM)
+        return f"{SCRYPT}${cost}${SCRYPT_BLOCK_SIZE}${SCRYPT_PARALLELISM}${_b64encode(salt)}${_b64encode(derived)}"
+    if algorithm == PBKDF2:
+        derived = _pbkdf2(password, salt, cost)
+        return f"{PBKDF2}${cost}${_b64encode(salt)}${_b64encode(derived)}"
+    raise ValueError(f"Unknown password hashing algorithm {algorithm!r}")
+
+def verify_password(password, encoded):
+    """Check a password against an encoded hash (or a legacy plaintext value)
+
+    A value with a known hash prefix that does not parse never matches; only
+    values without a prefix are compared as plaintext.
+    """
+    parts = encoded.split("$")
+    if len(parts) == 1 or parts[0] not in (SCRYPT, PBKDF2):
+        return hmac.compare_digest(password.encode("utf-8"), encoded.encode("utf-8"))
+    try:
+        if parts[0] == SCRYPT and len(parts) == 6:
+            cost, block_size, parallelism = int(parts[1]), int(parts[2]), int(parts[3])
+            derived = _scrypt(password, _b64decode(parts[4]), cost, block_size, parallelism)
+            return hmac.compare_digest(derived, _b64decode(parts[5]))
+        if parts[0] == PBKDF2 and len(parts) == 4:
+            derived = _pbkdf2(password, _b64decode(parts[2]), int(parts[1]))
+            return hmac.compare_digest(derived, _b64decode(parts[3]))
+    except (ValueError, OverflowError, MemoryError):
+        # Bad numbers, bad base64 (binascii.Error is a ValueError) or parameters hashlib rejects
+        pass
+    return False
+
+def needs_rehash(encoded, algorithm=SCRYPT, cost=None):
+    """True when an encoded hash uses another algorithm or cost (or is legacy plaintext)"""
+    cost = DEFAULT_COSTS[algorithm] if cost is None else cost
+    parts = encoded.split("$")
+    return parts[0] != algorithm or len(parts) < 2 or parts[1] != str(cost)
+
+class PasswordHasher:
+    """Hashes and verifies passwords at one algorithm/cost, with a worker pool for frontends"""
+
+    def __init__(self, algorithm=None, cost=None, workers=None):
+        if algorithm is None:
+            # scrypt needs OpenSSL 1.1+; fall back to PBKDF2 where it is missing
+            algorithm = SCRYPT if hasattr(hashlib, "scrypt") else PBKDF2
+        self.algorithm = algorithm
+        self.cost = DEFAULT_COSTS[algorithm] if cost is None else cost
+        # Threads are only started when work is first submitted
+        self.executor = concurrent.futures.ThreadPoolExecutor(workers or min(8, os.cpu_count() or 1),
+                                                              thread_name_prefix="password")
+
+    def hash(self, password):
+        """Hash a password in the calling thread"""
+        return hash_password(password, self.algorithm, self.cost)
+
+    def verify(self, password, encoded):
+        """Verify a password in the calling thread"""
+        return verify_password(password, encoded)
+
+    def needs_rehash(self, encoded):
+        return needs_rehash(encoded, self.algorithm, self.cost)
+
+    def submit(self, function, *args):
+        """Run function(*args) on the worker pool; returns a concurrent.futures.Future"""
+        return self.executor.submit(function, *args)
+
+    def close(self):
+        """Stop the worker pool once queued work has finished"""
+        self.executor.shutdown(wait=True)
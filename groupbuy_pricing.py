@@ -0,0 +1,213 @@
+"""Group-buy pricing: one set of formulas for single groups and what-if grids.
+
+Money is fixed-point: prices, savings and revenue are integer sen and
+discounts are integer basis points (0.01%). There is one rounding policy:
+amounts are rounded half up to the sen, once, when the per-person discount
+is taken off the price; everything after that (revenue, savings, totals)
+is exact integer arithmetic, so sums over millions of orders never drift.
+Ringgit amounts are only converted at the edges (catalog loading and
+display).
+
+The formulas only use integer arithmetic and comparisons, so the same
+functions price one group (plain ints, as the engine and GUI call them) or
+a whole NumPy grid of scenarios at once. NumPy is optional: without it
+pricing_grid falls back to a pure-Python loop over the same functions.
+
+    python groupbuy_pricing.py --prices 49.9,159.9,299.9 --discounts 5:60:1 --sizes 1:20 --min-required 2:10
+    python -m doctest groupbuy_pricing.py     (checks the examples below)
+"""
+import argparse
+import array
+import decimal
+import heapq
+import itertools
+import math
+import time
+
+try:
+    import numpy
+except ImportError:  # optional dependency; pricing_grid falls back to pure Python
+    numpy = None
+
+# ==================== FIXED-POINT MONEY ====================
+SEN_PER_RINGGIT = 100
+BASIS_POINTS_PER_PERCENT = 100
+BASIS_POINTS = 100 * BASIS_POINTS_PER_PERCENT  # a whole price
+HALF_BASIS_POINTS = BASIS_POINTS // 2
+ROUNDING = decimal.ROUND_HALF_UP
+
+def to_sen(amount):
+    """A ringgit amount (number or numeric string) as integer sen, rounded half up"""
+    return int((decimal.Decimal(str(amount)) * SEN_PER_RINGGIT).to_integral_value(ROUNDING))
+
+def to_ringgit(sen):
+    """Integer sen as ringgit, for display and JSON"""
+    return sen / SEN_PER_RINGGIT
+
+def to_basis_points(discount):
+    """A discount percentage (number or numeric string) as integer basis points, rounded half up"""
+    return int((decimal.Decimal(str(discount)) * BASIS_POINTS_PER_PERCENT).to_integral_value(ROUNDING))
+
+def to_percent(discount_bp):
+    """Basis points as a percentage (whole percentages stay ints, so they display as 30% rather than 30.0%)"""
+    whole, fraction = divmod(discount_bp, BASIS_POINTS_PER_PERCENT)
+    return whole if fraction == 0 else discount_bp / BASIS_POINTS_PER_PERCENT
+
+# ==================== FORMULAS ====================
+# Each works on plain ints or element-wise on NumPy integer arrays
+def discount_sen(price_sen, discount_bp):
+    """Savings per person in sen, rounded half up (the only rounding step)"""
+    return (price_sen * discount_bp + HALF_BASIS_POINTS) // BASIS_POINTS
+
+def price_per_person_sen(price_sen, discount_bp):
+    """What each member pays in sen once the group completes"""
+    return price_sen - discount_sen(price_sen, discount_bp)
+
+def group_completes(members, min_required):
+    """Whether a group with this many members reaches its target"""
+    return members >= min_required
+
+def group_revenue_sen(price_sen, discount_bp, members, min_required):
+    """Seller revenue in sen for a group that closes with members buyers (0 if it fails)"""
+    return price_per_person_sen(price_sen, discount_bp) * members * group_completes(members, min_required)
+
+def group_savings_sen(price_sen, discount_bp, members, min_required):
+    """Total savings in sen for all members of a group (0 if it fails)"""
+    return discount_sen(price_sen, discount_bp) * members * group_completes(members, min_required)
+
+# ==================== WHAT-IF GRIDS ====================
+GRID_AXES = ("price", "discount", "members", "min_required")
+
+def pricing_grid(prices, discounts, group_sizes, min_required_values, use_numpy=None):
+    """Evaluate every price × discount × group size × min_required combination
+
+    prices are ringgit and discounts percentages; both are converted to
+    fixed point first, so the grid prices exactly like checkout. Returns a
+    dict with "axes" (the four value lists), "shape" and the
+    "price_per_person", "revenue" and "savings" results in integer sen. With
+    NumPy these are int64 arrays of that shape; without it they are flat
+    array('q') in the same (row-major) order.
+    """
+    axes = tuple(list(values) for values in (prices, discounts, group_sizes, min_required_values))
+    shape = tuple(len(values) for values in axes)
+    fixed_axes = ([to_sen(price) for price in axes[0]], [to_basis_points(discount) for discount in axes[1]],
+                  axes[2], axes[3])
+    if use_numpy is None:
+        use_numpy = numpy is not None
+
+    if use_numpy:
+        price_sen, discount_bp, members, min_required = (
+            numpy.asarray(values, dtype=numpy.int64).reshape([-1 if axis == i else 1 for axis in range(4)])
+            for i, values in enumerate(fixed_axes))
+        per_person = numpy.broadcast_to(price_per_person_sen(price_sen, discount_bp), shape)
+        return {
+            "axes": axes,
+            "shape": shape,
+            "price_per_person": per_person,
+            "revenue": group_revenue_sen(price_sen, discount_bp, members, min_required),
+            "savings": group_savings_sen(price_sen, discount_bp, members, min_required)
+        }
+
+    per_person = array.array("q")
+    revenue = array.array("q")
+    savings = array.array("q")
+    for price_sen, discount_bp, members, min_required in itertools.product(*fixed_axes):
+        per_person.append(price_per_person_sen(price_sen, discount_bp))
+        revenue.append(group_revenue_sen(price_sen, discount_bp, members, min_required))
+        savings.append(group_savings_sen(price_sen, discount_bp, members, min_required))
+    return {"axes": axes, "shape": shape, "price_per_person": per_person, "revenue": revenue, "savings": savings}
+
+def _scenario_at(grid, flat_index):
+    """The scenario dict at a row-major index of the grid"""
+    positions = []
+    for size in reversed(grid["shape"]):
+        flat_index, position = divmod(flat_index, size)
+        positions.append(position)
+    positions.reverse()
+    return {name: values[position] for name, values, position in zip(GRID_AXES, grid["axes"], positions)}
+
+def best_scenarios(grid, metric="revenue", top=5):
+    """The top scenarios of a grid by a result metric, best first (ties in grid order)
+
+    Result amounts in the returned scenarios are converted to ringgit.
+    """
+    if top <= 0:
+        return []
+    results = grid[metric]
+    use_numpy = numpy is not None and isinstance(results, numpy.ndarray)
+    if use_numpy:
+        flat = results.reshape(-1)
+        top = min(top, flat.size)
+        # Everything above the top-th value, then the earliest ties with it
+        threshold = flat[numpy.argpartition(flat, -top)[-top]]
+        above = numpy.flatnonzero(flat > threshold)
+        ties = numpy.flatnonzero(flat == threshold)[:top - above.size]
+        ranked = sorted(numpy.concatenate((above, ties)).tolist(), key=lambda index: (-flat[index], index))
+    else:
+        ranked = heapq.nlargest(top, range(len(results)), key=results.__getitem__)
+
+    scenarios = []
+    for flat_index in ranked:
+        scenario = _scenario_at(grid, flat_index)
+        # NumPy grids are indexed by position: reshaping the broadcast price_per_person view would copy the grid
+        index = numpy.unravel_index(flat_index, grid["shape"]) if use_numpy else flat_index
+        for name in ("price_per_person", "revenue", "savings"):
+            scenario[name] = to_ringgit(int(grid[name][index]))
+        scenarios.append(scenario)
+    return scenarios
+
+# ==================== COMMAND LINE ====================
+def parse_values(text, kind=float):
+    """Parse "1,2,3" or an inclusive range "start:stop[:step]" into a list
+
+    The stop value is kept even when float steps don't add up to it exactly:
+
+    >>> parse_values("0.1:0.3:0.1")
+    [0.1, 0.2, 0.3]
+    >>> parse_values("2:10:4", int)
+    [2, 6, 10]
+    """
+    if ":" not in text:
+        return [kind(value) for value in text.split(",")]
+    parts = [kind(value) for value in text.split(":")]
+    start, stop = parts[0], parts[1]
+    step = parts[2] if len(parts) > 2 else 1
+    if step <= 0:
+        raise ValueError(f"range step must be positive, got {step}")
+    if kind is int:
+        return list(range(start, stop + 1, step))
+    # Count the steps with a tolerance, then compute each value from start
+    count = math.floor((stop - start) / step + 1e-9) + 1
+    return [round(start + step * i, 9) for i in range(max(count, 0))]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep group-buy pricing scenarios")
+    parser.add_argument("--prices", default="49.9,79.9,89.9,129.9,159.9,299.9")
+    parser.add_argument("--discounts", default="5:60:0.5", help="percentages, list or start:stop:step")
+    parser.add_argument("--sizes", default="1:30", help="group sizes (members at close)")
+    parser.add_argument("--min-required", default="2:20")
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--pure-python", action="store_true", help="skip NumPy even when installed")
+    args = parser.parse_args(argv)
+
+    prices = parse_values(args.prices)
+    discounts = parse_values(args.discounts)
+    sizes = parse_values(args.sizes, int)
+    min_required_values = parse_values(args.min_required, int)
+
+    use_numpy = numpy is not None and not args.pure_python
+    started = time.perf_counter()
+    grid = pricing_grid(prices, discounts, sizes, min_required_values, use_numpy)
+    elapsed = time.perf_counter() - started
+    scenario_count = len(prices) * len(discounts) * len(sizes) * len(min_required_values)
+
+    print(f"🧮 {scenario_count:,} scenarios in {elapsed * 1000:.1f} ms "
+          f"({scenario_count / elapsed:,.0f}/s, {'NumPy' if use_numpy else 'pure Python'})")
+    print(f"🏆 TOP {args.top} BY REVENUE:")
+    for i, scenario in enumerate(best_scenarios(grid, "revenue", args.top), 1):
+        print(f"  {i}. RM {scenario['price']:.2f} at {scenario['discount']:g}% off, "
+              f"{scenario['members']}/{scenario['min_required']} members → "
+              f"RM {scenario['price_per_person']:.2f} each, revenue RM {scenario['revenue']:,.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+"""asyncio HTTP/JSON frontend for the group-buy engine (standard library only).
+
+Routes:
+    GET  /products                  product catalog
+    POST /users                     register   {"username": ..., "password": ...}
+    POST /login                     log in     {"username": ..., "password": ...} -> {"token": ...}
+    GET  /groups[?product=NAME]     open groups (all, or one product)
+    POST /groups                    start a group   {"product": NAME}      (needs token)
+    POST /groups/<id>/join          join a group; ?receipt=1 adds the text receipt (needs token)
+    POST /groups/auto               join the open group closest to completion, or start one
+                                    {"product": NAME, "order": "closest"|"oldest"}     (needs token)
+    GET  /stats/me                  the logged-in user's statistics        (needs token)
+    GET  /stats/revenue             seller revenue dashboard
+    GET  /stats/revenue/history[?period=hour|day&count=N]   revenue per hour or day, oldest first
+
+Authenticated requests send "Authorization: Bearer <token>". Connections are
+kept alive (HTTP/1.1), so one event loop can serve thousands of clients;
+engine calls run on a small thread pool so a storage flush never blocks it.
+
+    python groupbuy_service.py --port 8080 --db groupbuy.db [--catalog products.csv]
+    python groupbuy_service.py --port 8080 --event-log eventlog/
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import secrets
+import time
+import traceback
+import urllib.parse
+
+from groupbuy_engine import (
+    GroupBuyEngine, format_timestamp, STARTED, JOINED, COMPLETED, FAILED, ALREADY_MEMBER, ALREADY_PARTICIPATING, GROUP_CLOSED,
+    GROUP_EXPIRED, CLOSEST_TO_COMPLETION, OLDEST
+)
+from groupbuy_eventlog import EventLogStorage
+from groupbuy_pricing import to_percent, to_ringgit
+from groupbuy_storage import SQLiteStorage
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+MAX_HISTORY_BUCKETS = 24 * 90
+# Threads running engine calls (and the SQLite flushes they can trigger) off the event loop
+ENGINE_WORKERS = 4
+
+REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    500: "Internal Server Error"
+}
+
+# HTTP status for each engine result
+STATUS_CODES = {
+    STARTED: 201,
+    JOINED: 200,
+    COMPLETED: 200,
+    FAILED: 200,
+    ALREADY_MEMBER: 409,
+    ALREADY_PARTICIPATING: 409,
+    GROUP_CLOSED: 409,
+    GROUP_EXPIRED: 409
+}
+
+class BadRequest(Exception):
+    """Malformed HTTP request or JSON body"""
+
+# ==================== JSON VIEWS ====================
+def group_to_json(group):
+    """JSON view of an open group; discount is the tier its current size has reached"""
+    next_tier = group.next_tier()
+    return {
+        "group_id": group.group_id,
+        "product": group.product,
+        "price": group.price,
+        "discount": group.current_discount,
+        "discounted_price": to_ringgit(group.price_per_person_sen),
+        "min_required": group.min_required,
+        "full_size": group.full_size(),
+        "next_tier": None if next_tier is None else {"members": next_tier[0], "discount": to_percent(next_tier[1])},
+        "members": len(group.buyers),
+        "started_by": group.buyers[0].user.username,
+        "created_time": group.created_time,
+        "deadline_time": group.deadline_time
+    }
+
+def checkout_to_json(checkout_result, include_receipt=False):
+    """JSON view of a CheckoutResult; the receipt text is only rendered when asked for"""
+    payload = {
+        "success": checkout_result.success,
+        "product": checkout_result.product,
+        "members": checkout_result.member_count,
+        "min_required": checkout_result.min_required,
+        "price_per_person": checkout_result.price_per_person,
+        "savings_per_person": checkout_result.discount_amount,
+        "total_revenue": checkout_result.total_revenue,
+        "completed_time": checkout_result.completed_time
+    }
+    if include_receipt:
+        payload["receipt"] = checkout_result.receipt
+    return payload
+
+def archived_to_json(record):
+    """JSON view of an archived (closed) group"""
+    return {
+        "product": record.product,
+        "members": len(record.member_usernames),
+        "final_price": record.final_price,
+        "savings": record.savings,
+        "completed_time": format_timestamp(record.completed_at),
+        "succeeded": record.succeeded
+    }
+
+# ==================== SERVICE ====================
+class GroupBuyService:
+    """Maps HTTP requests onto GroupBuyEngine calls and returns JSON"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.sessions = {}  # token -> username
+        self.engine_executor = concurrent.futures.ThreadPoolExecutor(ENGINE_WORKERS, thread_name_prefix="engine")
+
+    def current_user(self, headers):
+        """The user for the request's bearer token, or None"""
+        authorization = headers.get("authorization", "")
+        if not authorization.startswith("Bearer "):
+            return None
+        username = self.sessions.get(authorization[7:].strip())
+        if username is None:
+            return None
+        return self.engine.registered_users.get(username)
+
+    async def handle(self, method, path, query, headers, body):
+        """Dispatch one request; returns (HTTP status, JSON-able payload)
+
+        Password hashing for /users and /login runs on the engine's password
+        worker pool and every other route on the engine threads, so neither
+        slow key derivation nor a synchronous SQLite flush stalls the event
+        loop. An unexpected error becomes a JSON 500 instead of a dropped
+        connection.
+        """
+        parts = [part for part in path.split("/") if part]
+        try:
+            if parts in (["users"], ["login"]) and method == "POST":
+                return await self.handle_account(parts, body)
+            return await asyncio.get_running_loop().run_in_executor(
+                self.engine_executor, self.dispatch, method, path, parts, query, headers, body)
+        except Exception:
+            traceback.print_exc()
+            return 500, {"error": "Internal server error"}
+
+    async def handle_account(self, parts, body):
+        """Register (/users) or log in (/login), waiting on the password worker pool"""
+        if parts == ["users"]:
+            is_registered, user_or_error = await asyncio.wrap_future(self.engine.submit_register_user(
+                str(body.get("username", "")).strip(), str(body.get("password", "")).strip()))
+            if not is_registered:
+                return 400, {"error": user_or_error}
+            return 201, {"username": user_or_error.username,
+                         "user_number": self.engine.app_stats["total_users_registered"]}
+
+        is_authenticated, user_or_error = await asyncio.wrap_future(self.engine.submit_authenticate_user(
+            str(body.get("username", "")).strip(), str(body.get("password", "")).strip()))
+        if not is_authenticated:
+            return 401, {"error": user_or_error}
+        token = secrets.token_urlsafe(24)
+        self.sessions[token] = user_or_error.username
+        return 200, {"token": token, "username": user_or_error.username}
+
+    def dispatch(self, method, path, parts, query, headers, body):
+        """Serve every route but /users and /login; runs on an engine thread"""
+        if parts == ["products"] and method == "GET":
+            return 200, {"products": self.engine.products_catalog}
+
+        if parts == ["groups"] and method == "GET":
+            product_name = query.get("product")
+            return 200, {"groups": [group_to_json(group) for group in self.engine.open_groups(product_name)]}
+
+        if parts == ["stats", "revenue"] and method == "GET":
+            dashboard = self.engine.revenue_dashboard()
+            dashboard["top_products"] = [{"product": product, "units_sold": units}
+                                         for product, units in dashboard["top_products"]]
+            return 200, dashboard
+
+        if parts == ["stats", "revenue", "history"] and method == "GET":
+            period = query.get("period", "hour")
+            if period not in ("hour", "day"):
+                return 400, {"error": "period must be hour or day"}
+            try:
+                count = min(max(int(query.get("count", 24)), 1), MAX_HISTORY_BUCKETS)
+            except ValueError:
+                return 400, {"error": "count must be a number"}
+            return 200, {"period": period, "buckets": self.engine.revenue_over_time(period, count)}
+
+        # Everything below needs a logged-in user
+        if (parts in (["groups"], ["groups", "auto"], ["stats", "me"])
+                or (len(parts) == 3 and parts[0] == "groups" and parts[2] == "join")):
+            user = self.current_user(headers)
+            if user is None:
+                return 401, {"error": "Please login first!"}
+        else:
+            return 404, {"error": f"No route for {method} {path}"}
+
+        if parts == ["groups"] and method == "POST":
+            product_info = self.engine.find_product(str(body.get("product", "")))
+            if product_info is None:
+                return 404, {"error": f"Unknown product {body.get('product')!r}"}
+            status, group = self.engine.start_group_buy(user, product_info)
+            return STATUS_CODES[status], {"status": status, "group": group_to_json(group)}
+
+        if parts == ["groups", "auto"] and method == "POST":
+            product_info = self.engine.find_product(str(body.get("product", "")))
+            if product_info is None:
+                return 404, {"error": f"Unknown product {body.get('product')!r}"}
+            order = body.get("order", CLOSEST_TO_COMPLETION)
+            if order not in (CLOSEST_TO_COMPLETION, OLDEST):
+                return 400, {"error": f"order must be {CLOSEST_TO_COMPLETION} or {OLDEST}"}
+            status, detail = self.engine.auto_join_group_buy(user, product_info, order)
+            payload = {"status": status}
+            if status in (COMPLETED, FAILED):
+                payload["group_id"] = detail.group_id
+                payload["checkout"] = checkout_to_json(detail, include_receipt=query.get("receipt") == "1")
+            else:
+                payload["group"] = group_to_json(detail)
+            return STATUS_CODES[status], payload
+
+        if parts[0] == "groups" and method == "POST":
+            try:
+                group_id = int(parts[1])
+            except ValueError:
+                return 404, {"error": f"Unknown group {parts[1]!r}"}
+            target_group = self.engine.find_open_group(group_id)
+            if target_group is None:
+                if 0 < group_id < self.engine.next_group_id:
+                    return 409, {"status": GROUP_CLOSED}
+                return 404, {"error": f"Unknown group {group_id}"}
+            status, detail = self.engine.join_group_buy(user, target_group)
+            payload = {"status": status, "group_id": group_id}
+            if status == JOINED:
+                payload["members"] = detail
+                payload["min_required"] = target_group.min_required
+                payload["discount"] = target_group.current_discount
+            elif status in (COMPLETED, FAILED, GROUP_EXPIRED):
+                payload["checkout"] = checkout_to_json(detail, include_receipt=query.get("receipt") == "1")
+            elif status == ALREADY_PARTICIPATING:
+                payload["other_group_id"] = detail.group_id
+            return STATUS_CODES[status], payload
+
+        if parts == ["stats", "me"] and method == "GET":
+            user_stats = self.engine.user_statistics(user)
+            return 200, {
+                "username": user.username,
+                "member_since": user.created_date,
+                "active": [group_to_json(group) for group in user_stats["active"]],
+                "completed": [archived_to_json(record) for record in user_stats["completed"]],
+                "failed": [archived_to_json(record) for record in user_stats["failed"]],
+                "completed_count": user_stats["completed_count"],
+                "failed_count": user_stats["failed_count"],
+                "total_savings": user_stats["total_savings"],
+                "recent_activity": [{"action": activity.action, "group_id": activity.group_id,
+                                     "product": activity.product, "time": activity.time}
+                                    for activity in user.join_history[-5:]]
+            }
+
+        return 405, {"error": f"{method} not allowed on {path}"}
+
+    # ----- HTTP plumbing -----
+    async def handle_connection(self, reader, writer):
+        """Serve keep-alive HTTP/1.1 requests on one connection"""
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except BadRequest as error:
+                    await write_response(writer, 400, {"error": str(error)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, query, headers, body, keep_alive = request
+                status, payload = await self.handle(method, path, query, headers, body)
+                await write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def read_request(reader):
+    """Read one request; returns None when the client closed the connection"""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as error:
+        if error.partial.strip():
+            raise BadRequest("Incomplete request")
+        return None
+    except asyncio.LimitOverrunError:
+        raise BadRequest("Headers too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise BadRequest("Malformed request line")
+
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", "0") or 0)
+    except ValueError:
+        raise BadRequest("Invalid Content-Length")
+    if length < 0 or length > MAX_BODY_BYTES:
+        raise BadRequest("Body too large")
+    body = {}
+    if length:
+        raw_body = await reader.readexactly(length)
+        try:
+            body = json.loads(raw_body)
+        except ValueError:
+            raise BadRequest("Body is not valid JSON")
+        if not isinstance(body, dict):
+            raise BadRequest("Body must be a JSON object")
+
+    url = urllib.parse.urlsplit(target)
+    query = dict(urllib.parse.parse_qsl(url.query))
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    return method.upper(), urllib.parse.unquote(url.path), query, headers, body, keep_alive
+
+async def write_response(writer, status, payload, keep_alive):
+    """Send a JSON response"""
+    body = json.dumps(payload).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+async def flush_periodically(engine, interval, executor):
+    """Write queued storage changes every few seconds, on an engine thread"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await loop.run_in_executor(executor, engine.flush)
+        except Exception:
+            traceback.print_exc()
+
+async def expire_periodically(engine, max_interval, executor):
+    """Check out groups as their deadlines pass, waking at the next deadline (or every max_interval)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        next_deadline = engine.expiry.next_deadline()
+        delay = max_interval if next_deadline is None else min(max(next_deadline - time.time(), 0), max_interval)
+        await asyncio.sleep(delay)
+        try:
+            await loop.run_in_executor(executor, engine.expire_due_groups)
+        except Exception:
+            traceback.print_exc()
+
+async def serve(engine, host="127.0.0.1", port=8080, flush_interval=1.0):
+    """Run the service until cancelled"""
+    service = GroupBuyService(engine)
+    server = await asyncio.start_server(service.handle_connection, host, port,
+                                        limit=MAX_HEADER_BYTES, backlog=4096)
+    flusher = asyncio.create_task(flush_periodically(engine, flush_interval, service.engine_executor))
+    expirer = asyncio.create_task(expire_periodically(engine, flush_interval, service.engine_executor))
+    print(f"🌐 Group-buy service listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        flusher.cancel()
+        expirer.cancel()
+        service.engine_executor.shutdown(wait=True)
+        engine.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the group-buy HTTP/JSON service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db", help="SQLite database path (in-memory only when omitted)")
+    parser.add_argument("--event-log", help="event log directory (alternative to --db)")
+    parser.add_argument("--catalog", help="CSV, JSON or JSON-lines product catalog (built-in products when omitted)")
+    args = parser.parse_args(argv)
+
+    if args.event_log:
+        storage = EventLogStorage(args.event_log)
+    else:
+        storage = SQLiteStorage(args.db) if args.db else None
+    engine = GroupBuyEngine(catalog=[] if args.catalog else None, storage=storage)
+    if args.catalog:
+        loaded, skipped = engine.load_catalog(args.catalog)
+        print(f"📦 Loaded {loaded:,} products from {args.catalog} ({len(skipped)} rows skipped)")
+        for number, reason in skipped[:10]:
+            print(f"  • row {number}: {reason}")
+    try:
+        asyncio.run(serve(engine, args.host, args.port))
+    except KeyboardInterrupt:
+        print("👋 Service stopped")
+
+if __name__ == "__main__":
+    main()
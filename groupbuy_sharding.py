@@ -0,0 +1,541 @@
+"""Multi-process group-buy engine, sharded by product.
+
+One Python process runs one engine operation at a time (the GIL), which caps
+how many joins a flash sale can take. ShardedEngine runs a GroupBuyEngine in
+each of shard_count worker processes and gives each shard the products whose
+name hashes to it, so every open group, per-product index, revenue rollup
+and counter lives in exactly one shard. The router, in the calling process,
+keeps the catalog and the user accounts (registration and login) and sends
+start, join and checkout to the shard that owns the product or group.
+
+Group ids stay unique: shard i hands out i + 1, i + 1 + n, i + 1 + 2n, ...,
+so the owner of a group id is (group_id - 1) % n. Shards never talk to each
+other. A user's group for one product has no effect on their groups for
+another, so requests for different shards may run in any order. The revenue
+dashboard, revenue history and user statistics are merged from per-shard
+numbers (integer sen, so the sums stay exact).
+
+Every call crosses a pipe, so single calls pay a round trip. execute() and
+replay() send a batch of requests, split per shard, to all shards at once,
+so shards on separate cores work in parallel. With fewer cores than shards
+they take turns and the pipes only add overhead; the benchmark reports the
+cores it had and labels runs where no speed-up can show:
+
+    python groupbuy_sharding.py --shards 1,2,4,8 --events 1000000 --products 256
+"""
+import argparse
+import heapq
+import multiprocessing
+import os
+import re
+import threading
+import time
+import zlib
+
+from groupbuy_catalog import ProductStore, iter_catalog_file, load_products
+from groupbuy_engine import (
+    GroupBuyEngine, User, DEFAULT_GROUP_DURATION, JOIN_HISTORY_LIMIT, CLOSEST_TO_COMPLETION, JOINED, COMPLETED,
+    FAILED, GROUP_CLOSED, GROUP_EXPIRED, format_timestamp, products_catalog
+)
+from groupbuy_eventlog import EventLogStorage
+from groupbuy_passwords import PasswordHasher
+from groupbuy_pricing import to_ringgit
+from groupbuy_service import archived_to_json, checkout_to_json, group_to_json
+from groupbuy_simulate import UNKNOWN_PRODUCT, UNKNOWN_USER, apply_event
+
+UNKNOWN_GROUP = "unknown_group"
+
+# Shard-local copies of users only hold groups; they never log in
+SHARD_PASSWORD_HASH = ""
+
+SHARD_DIRECTORY_PATTERN = re.compile(r"shard-(\d+)-of-(\d+)$")
+
+class ShardError(RuntimeError):
+    """A request raised an exception inside a shard process"""
+
+def shard_for_product(product_name, shard_count):
+    """Index of the shard that owns a product (stable across processes and runs)"""
+    return zlib.crc32(product_name.encode("utf-8")) % shard_count
+
+def shard_for_group(group_id, shard_count):
+    """Index of the shard that handed out a group id"""
+    return (group_id - 1) % shard_count
+
+# ==================== SHARD PROCESS ====================
+class ShardWorker:
+    """One shard's engine and the requests it answers (results are plain, picklable data)"""
+
+    def __init__(self, index, shard_count, catalog=None, catalog_path=None, event_log=None,
+                 group_duration=DEFAULT_GROUP_DURATION):
+        # Only this shard's products, loaded before storage restores their open groups
+        if catalog_path:
+            raw_products = iter_catalog_file(catalog_path)
+        else:
+            raw_products = enumerate(products_catalog if catalog is None else catalog, 1)
+        owned_products = ((number, raw_product) for number, raw_product in raw_products
+                          if shard_for_product(str(raw_product.get("name") or "").strip(), shard_count) == index)
+        product_store = ProductStore()
+        for _ in load_products(product_store, owned_products):
+            pass
+
+        storage = EventLogStorage(event_log) if event_log else None
+        self.engine = GroupBuyEngine(catalog=product_store, storage=storage, group_duration=group_duration,
+                                     password_hasher=PasswordHasher(cost=1))
+        # Hand out only this shard's group ids
+        self.engine.group_id_step = shard_count
+        self.engine.next_group_id += (index + 1 - self.engine.next_group_id) % shard_count
+
+    def user(self, username):
+        """The shard's copy of a user, created on the user's first request here"""
+        engine = self.engine
+        user = engine.registered_users.get(username)
+        if user is None:
+            user = engine.registered_users[username] = User(username, SHARD_PASSWORD_HASH)
+            engine.storage.user_registered(user)
+        return user
+
+    def result(self, status, detail):
+        """(status, JSON view of the group or checkout it concerns)"""
+        if status in (COMPLETED, FAILED, GROUP_EXPIRED):
+            return status, checkout_to_json(detail)
+        if hasattr(detail, "group_id"):
+            return status, group_to_json(detail)
+        return status, detail
+
+    # ----- requests -----
+    def op_start(self, username, product_name):
+        product_info = self.engine.find_product(product_name)
+        if product_info is None:
+            return UNKNOWN_PRODUCT, None
+        return self.result(*self.engine.start_group_buy(self.user(username), product_info))
+
+    def op_join(self, username, group_id):
+        group = self.engine.find_open_group(group_id)
+        if group is None:
+            return (GROUP_CLOSED if 0 < group_id < self.engine.next_group_id else UNKNOWN_GROUP), None
+        status, detail = self.engine.join_group_buy(self.user(username), group)
+        return self.result(status, group if status == JOINED else detail)
+
+    def op_auto_join(self, username, product_name, order, start_if_none):
+        product_info = self.engine.find_product(product_name)
+        if product_info is None:
+            return UNKNOWN_PRODUCT, None
+        return self.result(*self.engine.auto_join_group_buy(self.user(username), product_info, order, start_if_none))
+
+    def op_checkout(self, group_id):
+        group = self.engine.find_open_group(group_id)
+        if group is None:
+            return (GROUP_CLOSED if 0 < group_id < self.engine.next_group_id else UNKNOWN_GROUP), None
+        return self.result(*self.engine.checkout_group(group))
+
+    def op_event(self, event):
+        """A groupbuy_simulate event (anything but "register"); returns its outcome status"""
+        if "user" in event:
+            self.user(event["user"])
+        return apply_event(self.engine, event)
+
+    def op_expire(self, now, limit):
+        return [self.result(status, detail) for status, detail in self.engine.expire_due_groups(now, limit)]
+
+    def op_open_groups(self, product_name, limit):
+        groups, total = self.engine.open_groups_page(0, limit, product_name)
+        return [group_to_json(group) for group in groups], total
+
+    def op_dashboard(self, top_n):
+        """Raw counters and sen totals for merge_revenue_dashboards"""
+        engine = self.engine
+        with engine.stats_lock:
+            return {
+                "app_stats": dict(engine.app_stats),
+                "active_groups": len(engine.active_groups),
+                "revenue_sen": engine.revenue.totals.revenue_sen,
+                "savings_sen": engine.revenue.totals.savings_sen,
+                "top_products": engine.revenue.top_products(top_n)
+            }
+
+    def op_revenue_buckets(self, period, count, now):
+        with self.engine.stats_lock:
+            return [(start, totals.revenue_sen, totals.units, totals.savings_sen, totals.groups)
+                    for start, totals in self.engine.revenue.buckets(period, count, now)]
+
+    def op_user_statistics(self, username):
+        user = self.engine.registered_users.get(username)
+        if user is None:
+            return None
+        user_stats = self.engine.user_statistics(user)
+        return {
+            "active": [group_to_json(group) for group in user_stats["active"]],
+            "completed": [archived_to_json(record) for record in user_stats["completed"]],
+            "failed": [archived_to_json(record) for record in user_stats["failed"]],
+            "completed_count": user.completed_count,
+            "failed_count": user.failed_count,
+            "total_savings_sen": user.total_savings_sen,
+            "recent_activity": list(user.join_history)
+        }
+
+    def op_flush(self):
+        self.engine.flush()
+
+def run_shard(connection, index, shard_count, catalog, catalog_path, event_log, group_duration):
+    """Shard process main loop: answer batches of (op, args) until told to stop with None"""
+    worker = ShardWorker(index, shard_count, catalog, catalog_path, event_log, group_duration)
+    connection.send("ready")
+    while True:
+        batch = connection.recv()
+        if batch is None:
+            break
+        results = []
+        for op, args in batch:
+            try:
+                results.append((True, getattr(worker, "op_" + op)(*args)))
+            except Exception as error:
+                results.append((False, f"{op}{args!r} failed in shard {index}: {type(error).__name__}: {error}"))
+        connection.send(results)
+    worker.engine.close()
+    connection.send("closed")
+
+# ==================== MERGING ====================
+def merge_revenue_dashboards(shard_dashboards, total_users_registered, top_n=5):
+    """Combine per-shard dashboard numbers into GroupBuyEngine.revenue_dashboard's shape
+
+    Products live in exactly one shard, so the overall top products are
+    among the shards' own top_n lists.
+    """
+    totals = {"total_groups_created": 0, "successful_groups": 0, "failed_groups": 0, "total_items_sold": 0}
+    revenue_sen = savings_sen = active_groups = 0
+    candidates = []
+    for dashboard in shard_dashboards:
+        for key in totals:
+            totals[key] += dashboard["app_stats"][key]
+        revenue_sen += dashboard["revenue_sen"]
+        savings_sen += dashboard["savings_sen"]
+        active_groups += dashboard["active_groups"]
+        candidates.extend(dashboard["top_products"])
+
+    successful = totals["successful_groups"]
+    return {
+        "total_revenue": to_ringgit(revenue_sen),
+        "total_revenue_sen": revenue_sen,
+        "total_savings": to_ringgit(savings_sen),
+        "successful_groups": successful,
+        "failed_groups": totals["failed_groups"],
+        "active_groups": active_groups,
+        "total_items_sold": totals["total_items_sold"],
+        "total_users_registered": total_users_registered,
+        "average_revenue": to_ringgit(revenue_sen / successful) if successful else 0,
+        "success_rate": (successful / max(totals["total_groups_created"], 1)) * 100,
+        "top_products": heapq.nsmallest(top_n, candidates, key=lambda item: (-item[1], item[0]))
+    }
+
+def merge_revenue_buckets(shard_buckets):
+    """Sum per-shard revenue buckets (same period, count and now) into revenue_over_time's shape"""
+    merged = []
+    for bucket_rows in zip(*shard_buckets):
+        start = bucket_rows[0][0]
+        merged.append({
+            "start": start,
+            "start_time": format_timestamp(start),
+            "revenue": to_ringgit(sum(row[1] for row in bucket_rows)),
+            "units": sum(row[2] for row in bucket_rows),
+            "savings": to_ringgit(sum(row[3] for row in bucket_rows)),
+            "groups": sum(row[4] for row in bucket_rows)
+        })
+    return merged
+
+# ==================== ROUTER ====================
+class ShardedEngine:
+    """Routes group-buy operations to per-product shard processes and merges their statistics
+
+    Results are JSON views (as served by groupbuy_service) instead of live
+    GroupBuy objects, since the groups live in other processes.
+    """
+
+    def __init__(self, shard_count=None, catalog=None, catalog_path=None, event_log=None, password_hasher=None,
+                 group_duration=DEFAULT_GROUP_DURATION):
+        self.shard_count = shard_count or os.cpu_count() or 1
+        if event_log:
+            self._check_event_log_layout(event_log)
+        # Accounts and the full catalog stay in the router; its engine never holds groups
+        self.accounts = GroupBuyEngine(
+            catalog=[] if catalog_path else catalog,
+            storage=EventLogStorage(os.path.join(event_log, "accounts")) if event_log else None,
+            password_hasher=password_hasher, group_duration=group_duration)
+        if catalog_path:
+            self.accounts.load_catalog(catalog_path)
+
+        # spawn, not fork: the router already runs storage and password worker threads
+        context = multiprocessing.get_context("spawn")
+        self.connections = []
+        self.connection_locks = []
+        self.processes = []
+        for index in range(self.shard_count):
+            router_end, shard_end = context.Pipe()
+            shard_log = os.path.join(event_log, f"shard-{index}-of-{self.shard_count}") if event_log else None
+            process = context.Process(target=run_shard, name=f"groupbuy-shard-{index}", daemon=True,
+                                      args=(shard_end, index, self.shard_count, catalog, catalog_path, shard_log,
+                                            group_duration))
+            process.start()
+            shard_end.close()
+            self.connections.append(router_end)
+            self.connection_locks.append(threading.Lock())
+            self.processes.append(process)
+        for connection in self.connections:
+            connection.recv()  # "ready" once the shard has loaded its products and state
+
+    def _check_event_log_layout(self, event_log):
+        """Refuse to reuse shard logs written with a different shard count (products would move shards)"""
+        if not os.path.isdir(event_log):
+            return
+        for entry in os.listdir(event_log):
+            match = SHARD_DIRECTORY_PATTERN.match(entry)
+            if match and int(match.group(2)) != self.shard_count:
+                raise ValueError(f"{event_log} holds {match.group(2)} shards; replay it to reshard "
+                                 f"to {self.shard_count}")
+
+    def close(self):
+        """Stop the shard processes (flushing their storage) and close the account engine"""
+        for index, connection in enumerate(self.connections):
+            with self.connection_locks[index]:
+                connection.send(None)
+                connection.recv()
+                connection.close()
+        for process in self.processes:
+            process.join()
+        self.accounts.close()
+
+    # ----- transport -----
+    def execute(self, requests):
+        """Run a batch of (shard index, op, args) requests; returns their results in order
+
+        Each shard gets its share of the batch in one message and works on it
+        in parallel with the others; requests for the same shard run in order.
+        """
+        per_shard = {}
+        for position, (shard, op, args) in enumerate(requests):
+            per_shard.setdefault(shard, []).append((position, op, args))
+
+        results = [None] * len(requests)
+        shards = sorted(per_shard)
+        for shard in shards:
+            self.connection_locks[shard].acquire()
+        try:
+            for shard in shards:
+                self.connections[shard].send([(op, args) for _, op, args in per_shard[shard]])
+            for shard in shards:
+                for (position, _, _), (succeeded, value) in zip(per_shard[shard], self.connections[shard].recv()):
+                    if not succeeded:
+                        raise ShardError(value)
+                    results[position] = value
+        finally:
+            for shard in shards:
+                self.connection_locks[shard].release()
+        return results
+
+    def call(self, shard, op, *args):
+        """Run one request on one shard"""
+        return self.execute([(shard, op, args)])[0]
+
+    def broadcast(self, op, *args):
+        """Run the same request on every shard; returns the results by shard index"""
+        return self.execute([(shard, op, args) for shard in range(self.shard_count)])
+
+    # ----- accounts and catalog (router only) -----
+    def register_user(self, username, password):
+        return self.accounts.register_user(username, password)
+
+    def authenticate_user(self, username, password):
+        return self.accounts.authenticate_user(username, password)
+
+    def product_name(self, product_key):
+        """Catalog name for a product name or product ID, or None"""
+        product_info = self.accounts.find_product(product_key) or self.accounts.find_product_by_id(product_key)
+        return None if product_info is None else product_info["name"]
+
+    def product_shard(self, product_name):
+        return shard_for_product(product_name, self.shard_count)
+
+    def group_shard(self, group_id):
+        return shard_for_group(group_id, self.shard_count)
+
+    # ----- group operations (routed) -----
+    def start_group_buy(self, username, product_key):
+        """(status, group view); like GroupBuyEngine.start_group_buy"""
+        product_name = self.product_name(product_key)
+        if product_name is None:
+            return UNKNOWN_PRODUCT, None
+        if username not in self.accounts.registered_users:
+            return UNKNOWN_USER, None
+        return self.call(self.product_shard(product_name), "start", username, product_name)
+
+    def join_group_buy(self, username, group_id):
+        """(status, group or checkout view); like GroupBuyEngine.join_group_buy"""
+        if username not in self.accounts.registered_users:
+            return UNKNOWN_USER, None
+        if group_id < 1:
+            return UNKNOWN_GROUP, None
+        return self.call(self.group_shard(group_id), "join", username, group_id)
+
+    def auto_join_group_buy(self, username, product_key, order=CLOSEST_TO_COMPLETION, start_if_none=True):
+        """(status, group or checkout view); like GroupBuyEngine.auto_join_group_buy"""
+        product_name = self.product_name(product_key)
+        if product_name is None:
+            return UNKNOWN_PRODUCT, None
+        if username not in self.accounts.registered_users:
+            return UNKNOWN_USER, None
+        return self.call(self.product_shard(product_name), "auto_join", username, product_name, order,
+                         start_if_none)
+
+    def checkout_group(self, group_id):
+        if group_id < 1:
+            return UNKNOWN_GROUP, None
+        return self.call(self.group_shard(group_id), "checkout", group_id)
+
+    def expire_due_groups(self, now=None, limit=None):
+        """Expire due groups in every shard; returns their (status, checkout view) pairs"""
+        return [result for shard_results in self.broadcast("expire", now, limit) for result in shard_results]
+
+    def open_groups(self, product_key=None, limit=50):
+        """Up to limit open group views (one product's in start order, or the oldest of all shards)"""
+        if product_key is not None:
+            product_name = self.product_name(product_key)
+            if product_name is None:
+                return []
+            return self.call(self.product_shard(product_name), "open_groups", product_name, limit)[0]
+        groups = [group for shard_groups, _ in self.broadcast("open_groups", None, limit) for group in shard_groups]
+        return heapq.nsmallest(limit, groups, key=lambda group: group["group_id"])
+
+    def replay(self, events, batch_size=2000, sharded_group_ids=False):
+        """Run groupbuy_simulate events in batches; returns {(op, status): count}
+
+        Registrations run in the router as they are read; everything else
+        goes to the shard owning the event's product. Events naming a group
+        id raise ValueError: ids from a single-process run do not follow the
+        shards' id stride, so they would reach the wrong shard. Pass
+        sharded_group_ids=True for events whose ids came from a ShardedEngine
+        with the same shard count.
+        """
+        outcomes = {}
+        batch = []
+
+        def run_batch():
+            for (op, _), status in zip(batch, self.execute([request for _, request in batch])):
+                outcomes[(op, status)] = outcomes.get((op, status), 0) + 1
+            batch.clear()
+
+        for event in events:
+            op = event.get("op", "?")
+            if op == "register":
+                is_registered, _ = self.register_user(event.get("user", ""), event.get("password", "pass1234"))
+                status = "registered" if is_registered else "rejected"
+                outcomes[(op, status)] = outcomes.get((op, status), 0) + 1
+                continue
+            if "group" in event:
+                if not sharded_group_ids:
+                    raise ValueError(f"event {event!r} names a group id; ids from a single-process run can't "
+                                     f"be routed to shards, so name the product instead")
+                shard = self.group_shard(event["group"])
+            else:
+                product_name = self.product_name(event.get("product"))
+                if product_name is None:
+                    outcomes[(op, UNKNOWN_PRODUCT)] = outcomes.get((op, UNKNOWN_PRODUCT), 0) + 1
+                    continue
+                shard = self.product_shard(product_name)
+                event = dict(event, product=product_name)
+            if "user" in event and event["user"] not in self.accounts.registered_users:
+                outcomes[(op, UNKNOWN_USER)] = outcomes.get((op, UNKNOWN_USER), 0) + 1
+                continue
+            batch.append((op, (shard, "event", (event,))))
+            if len(batch) >= batch_size:
+                run_batch()
+        if batch:
+            run_batch()
+        return outcomes
+
+    # ----- statistics (merged) -----
+    def revenue_dashboard(self, top_n=5):
+        """The seller dashboard merged from every shard, in GroupBuyEngine.revenue_dashboard's shape"""
+        return merge_revenue_dashboards(self.broadcast("dashboard", top_n),
+                                        len(self.accounts.registered_users), top_n)
+
+    def revenue_over_time(self, period="hour", count=24, now=None):
+        """Revenue per hour or day summed over the shards, oldest first"""
+        now = int(time.time()) if now is None else now
+        return merge_revenue_buckets(self.broadcast("revenue_buckets", period, count, now))
+
+    def user_statistics(self, username):
+        """A user's groups and totals from every shard (JSON views; recent_activity newest last)"""
+        merged = {"active": [], "completed": [], "failed": [], "completed_count": 0, "failed_count": 0,
+                  "total_savings_sen": 0, "recent_activity": []}
+        for shard_stats in self.broadcast("user_statistics", username):
+            if shard_stats is None:
+                continue
+            for key in merged:
+                merged[key] += shard_stats[key]
+        merged["recent_activity"] = sorted(merged["recent_activity"],
+                                           key=lambda activity: activity.timestamp)[-JOIN_HISTORY_LIMIT:]
+        merged["total_savings"] = to_ringgit(merged.pop("total_savings_sen"))
+        return merged
+
+    def flush(self):
+        self.broadcast("flush")
+        self.accounts.flush()
+
+# ==================== BENCHMARK ====================
+def usable_cores():
+    """CPU cores this process may run on (the affinity mask where the platform has one)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def main(argv=None):
+    # Imported here: the benchmark helpers are only needed by this command line
+    from groupbuy_bench import synthetic_catalog
+    from groupbuy_simulate import generate_events, run_simulation
+
+    parser = argparse.ArgumentParser(description="Replay a synthetic campaign through 1..N engine shards")
+    parser.add_argument("--shards", default=f"1,2,{max(usable_cores(), 2)}", help="comma-separated shard counts")
+    parser.add_argument("--events", type=int, default=400000)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--products", type=int, default=256, help="synthetic products (spread over the shards)")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    catalog = synthetic_catalog(args.products, args.seed)
+    product_names = [product["name"] for product in catalog]
+
+    # One process, no pipes: the baseline the shards have to beat
+    engine = GroupBuyEngine(catalog=catalog, password_hasher=PasswordHasher(cost=1))
+    report = run_simulation(engine, generate_events(args.events, args.users, product_names, args.seed))
+    baseline = engine.revenue_dashboard()
+    engine.close()
+    cores = usable_cores()
+    print(f"🖥️  {os.cpu_count()} CPU core(s), {cores} usable by this process")
+    print(f"⏱️  single process: {report['events_per_second']:,.0f} events/s")
+    if cores == 1:
+        print("⚠️  Only one core: the shards take turns on it, so these runs show the routing overhead, "
+              "not a speed-up")
+
+    for shard_count in (int(value) for value in args.shards.split(",")):
+        sharded = ShardedEngine(shard_count, catalog=catalog, password_hasher=PasswordHasher(cost=1))
+        try:
+            started = time.perf_counter()
+            sharded.replay(generate_events(args.events, args.users, product_names, args.seed), args.batch_size)
+            elapsed = time.perf_counter() - started
+            dashboard = sharded.revenue_dashboard()
+        finally:
+            sharded.close()
+        matches = all(dashboard[key] == baseline[key] for key in
+                      ("total_revenue_sen", "successful_groups", "failed_groups", "total_items_sold", "top_products"))
+        if cores == 1:
+            comparison = "no speed-up measurable on one core"
+        elif shard_count > cores:
+            comparison = f"{report['elapsed_seconds'] / elapsed:.2f}× single process, shards share {cores} cores"
+        else:
+            comparison = f"{report['elapsed_seconds'] / elapsed:.2f}× single process"
+        print(f"🧩 {shard_count:>2} shard(s): {args.events / elapsed:>10,.0f} events/s ({comparison}), "
+              f"revenue RM {dashboard['total_revenue']:,.2f} "
+              f"{'✅ matches' if matches else '❌ differs from'} the single-process run")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""Batch simulation: replay a stream of group-buy events through the engine (no GUI).
+
+Events are JSON objects, one per line:
+
+    {"op": "register", "user": "amy"}                       password defaults to "pass1234"
+    {"op": "start", "user": "amy", "product": "Wireless Gaming Mouse"}
+    {"op": "join", "user": "ben", "group": 17}              a specific group id, or
+    {"op": "join", "user": "ben", "product": "..."}         the oldest open group for the product
+    {"op": "autojoin", "user": "ben", "product": "..."}     the open group closest to completion,
+                                                            or a new group if none is open
+    {"op": "expire", "group": 17}                           check out now (fails if not full), or
+    {"op": "expire", "product": "..."}                      the oldest open group for the product
+
+"product" may also be a product ID. Files are read line by line, so event
+streams of any length replay in constant memory. Without --events a
+synthetic campaign is generated on the fly (and can be saved with
+--write-events for replaying later); --auto-join makes its joins autojoins,
+to compare completion rates with hand-picked (oldest) groups:
+
+    python groupbuy_simulate.py --generate 1000000 --users 50000 [--auto-join]
+    python groupbuy_simulate.py --events flash_sale.jsonl
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from groupbuy_engine import GroupBuyEngine, NO_OPEN_GROUP
+from groupbuy_eventlog import EventLogStorage
+from groupbuy_passwords import PasswordHasher
+
+# Result codes for events the engine never saw
+UNKNOWN_USER = "unknown_user"
+UNKNOWN_PRODUCT = "unknown_product"
+REJECTED = "rejected"
+INVALID_EVENT = "invalid_event"
+
+DEFAULT_PASSWORD = "pass1234"
+
+# ==================== EVENT SOURCES ====================
+def iter_event_file(path):
+    """Yield events from a JSON-lines file, one line at a time"""
+    with open(path, encoding="utf-8") as event_file:
+        for line in event_file:
+            if line.strip():
+                yield json.loads(line)
+
+def generate_events(count, users, product_names, seed=1, join_share=0.75, expire_share=0.02, auto_join=False):
+    """Yield a synthetic campaign of count events over a growing pool of users
+
+    Each new user is registered right before their first action; after that
+    events are joins (join_share; autojoins with auto_join), expiries
+    (expire_share) or new groups.
+    """
+    join_op = "autojoin" if auto_join else "join"
+    rng = random.Random(seed)
+    registered = 0
+    emitted = 0
+    while emitted < count:
+        if registered < users and (registered == 0 or rng.random() < users / count * 2):
+            username = f"sim{registered:07d}"
+            registered += 1
+            yield {"op": "register", "user": username}
+        else:
+            username = f"sim{rng.randrange(registered):07d}"
+            product = rng.choice(product_names)
+            roll = rng.random()
+            if roll < join_share:
+                yield {"op": join_op, "user": username, "product": product}
+            elif roll < join_share + expire_share:
+                yield {"op": "expire", "product": product}
+            else:
+                yield {"op": "start", "user": username, "product": product}
+        emitted += 1
+
+# ==================== REPLAY ====================
+class LatencyHistogram:
+    """Per-operation latency counts in microsecond buckets (constant memory)"""
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+
+    def add(self, elapsed_ns):
+        bucket = elapsed_ns // 1000
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+
+    def percentile(self, fraction):
+        """Latency in microseconds at the given fraction (0-1) of events"""
+        target = fraction * self.total
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return bucket
+        return 0
+
+def apply_event(engine, event):
+    """Run one event against the engine; returns the outcome status"""
+    op = event.get("op")
+    if op == "register":
+        is_registered, _ = engine.register_user(event.get("user", ""), event.get("password", DEFAULT_PASSWORD))
+        return "registered" if is_registered else REJECTED
+
+    product_key = event.get("product")
+    product_info = None
+    if product_key is not None:
+        product_info = engine.find_product(product_key) or engine.find_product_by_id(product_key)
+        if product_info is None:
+            return UNKNOWN_PRODUCT
+
+    if op == "expire":
+        if "group" in event:
+            group = engine.find_open_group(event["group"])
+        elif product_info is not None:
+            oldest, _ = engine.open_groups_page(0, 1, product_info["name"])
+            group = oldest[0] if oldest else None
+        else:
+            return INVALID_EVENT
+        if group is None:
+            return NO_OPEN_GROUP
+        status, _ = engine.checkout_group(group)
+        return status
+
+    user = engine.registered_users.get(event.get("user"))
+    if user is None:
+        return UNKNOWN_USER
+
+    if op == "start":
+        if product_info is None:
+            return INVALID_EVENT
+        status, _ = engine.start_group_buy(user, product_info)
+        return status
+
+    if op == "autojoin":
+        if product_info is None:
+            return INVALID_EVENT
+        status, _ = engine.auto_join_group_buy(user, product_info)
+        return status
+
+    if op == "join":
+        if "group" in event:
+            group = engine.find_open_group(event["group"])
+        elif product_info is not None:
+            oldest, _ = engine.open_groups_page(0, 1, product_info["name"])
+            group = oldest[0] if oldest else None
+        else:
+            return INVALID_EVENT
+        if group is None:
+            return NO_OPEN_GROUP
+        status, _ = engine.join_group_buy(user, group)
+        return status
+
+    return INVALID_EVENT
+
+def run_simulation(engine, events, progress_every=0, progress_output=sys.stderr):
+    """Replay events; returns a report dict with outcome counts, latencies and timing
+
+    With progress_every, prints throughput for each window of that many
+    events, which shows where a long campaign starts to slow down.
+    """
+    clock = time.perf_counter_ns
+    outcomes = {}  # (op, status) -> count
+    latencies = {}  # op -> LatencyHistogram
+    windows = []
+    event_count = 0
+    started = clock()
+    window_started = started
+
+    for event in events:
+        op = event.get("op", "?")
+        event_started = clock()
+        status = apply_event(engine, event)
+        finished = clock()
+
+        histogram = latencies.get(op)
+        if histogram is None:
+            histogram = latencies[op] = LatencyHistogram()
+        histogram.add(finished - event_started)
+        outcomes[(op, status)] = outcomes.get((op, status), 0) + 1
+        event_count += 1
+
+        if progress_every and event_count % progress_every == 0:
+            window_seconds = (finished - window_started) / 1e9
+            window = {
+                "events": event_count,
+                "events_per_second": progress_every / window_seconds if window_seconds else float("inf"),
+                "open_groups": len(engine.active_groups)
+            }
+            windows.append(window)
+            print(f"  … {event_count:,} events, {window['events_per_second']:,.0f}/s, "
+                  f"{window['open_groups']:,} open groups", file=progress_output)
+            window_started = finished
+
+    elapsed = (clock() - started) / 1e9
+    dashboard = engine.revenue_dashboard()
+    closed = dashboard["successful_groups"] + dashboard["failed_groups"]
+    return {
+        "events": event_count,
+        "elapsed_seconds": elapsed,
+        "events_per_second": event_count / elapsed if elapsed else float("inf"),
+        "outcomes": outcomes,
+        "latency_us": {op: (histogram.percentile(0.5), histogram.percentile(0.99), histogram.total)
+                       for op, histogram in latencies.items()},
+        "windows": windows,
+        "groups_created": engine.app_stats["total_groups_created"],
+        "groups_completed": dashboard["successful_groups"],
+        "groups_failed": dashboard["failed_groups"],
+        "groups_open": dashboard["active_groups"],
+        "success_rate": dashboard["successful_groups"] / closed * 100 if closed else 0,
+        "total_revenue": dashboard["total_revenue"],
+        "items_sold": dashboard["total_items_sold"],
+        "top_products": dashboard["top_products"]
+    }
+
+def print_report(report):
+    """Print a simulation report"""
+    print("📈 SIMULATION REPORT")
+    print(f"⏱️  {report['events']:,} events in {report['elapsed_seconds']:.2f}s "
+          f"({report['events_per_second']:,.0f} events/s)")
+    print()
+    print("📋 OUTCOMES:")
+    for (op, status), count in sorted(report["outcomes"].items()):
+        print(f"  • {op:<9} {status:<22} {count:>10,}")
+    print()
+    print("⚡ LATENCY (µs):")
+    print(f"  {'op':<9}{'count':>12}{'p50':>8}{'p99':>8}")
+    for op, (p50, p99, count) in sorted(report["latency_us"].items()):
+        print(f"  {op:<9}{count:>12,}{p50:>8}{p99:>8}")
+    print()
+    print("💰 RESULTS:")
+    print(f"  • Groups created: {report['groups_created']:,}")
+    print(f"  • Completed: {report['groups_completed']:,}   Failed: {report['groups_failed']:,}   "
+          f"Still open: {report['groups_open']:,}")
+    print(f"  • Success rate (closed groups): {report['success_rate']:.1f}%")
+    print(f"  • Revenue: RM {report['total_revenue']:,.2f} from {report['items_sold']:,} items")
+    for i, (product, units) in enumerate(report["top_products"], 1):
+        print(f"    {i}. {product}: {units:,} units")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay group-buy events through the engine without the GUI")
+    parser.add_argument("--events", help="JSON-lines event file to replay")
+    parser.add_argument("--generate", type=int, default=100000,
+                        help="number of synthetic events when --events is not given")
+    parser.add_argument("--users", type=int, default=10000, help="users in the synthetic campaign")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--auto-join", action="store_true",
+                        help="synthetic joins go to the open group closest to completion")
+    parser.add_argument("--write-events", help="also save the replayed events as JSON lines")
+    parser.add_argument("--catalog", help="CSV/JSON catalog to use instead of the built-in products")
+    parser.add_argument("--password-cost", type=int, default=1,
+                        help="log2 password hashing cost (minimum by default, so runs measure the engine)")
+    parser.add_argument("--progress-every", type=int, default=100000)
+    parser.add_argument("--event-log", help="record the run in an event log directory (resumes from it if present)")
+    args = parser.parse_args(argv)
+
+    storage = EventLogStorage(args.event_log) if args.event_log else None
+    engine = GroupBuyEngine(catalog=[] if args.catalog else None, storage=storage,
+                            password_hasher=PasswordHasher(cost=args.password_cost))
+    if args.catalog:
+        engine.load_catalog(args.catalog)
+
+    if args.events:
+        events = iter_event_file(args.events)
+    else:
+        product_names = [product["name"] for product in engine.products_catalog]
+        events = generate_events(args.generate, args.users, product_names, args.seed, auto_join=args.auto_join)
+
+    if args.write_events:
+        output = open(args.write_events, "w", encoding="utf-8")
+        def recorded(source):
+            for event in source:
+                output.write(json.dumps(event) + "\n")
+                yield event
+        events = recorded(events)
+
+    try:
+        report = run_simulation(engine, events, args.progress_every)
+    finally:
+        if args.write_events:
+            output.close()
+        engine.close()
+    print_report(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""Pluggable persistence for the group-buy engine.
+
+The engine reports every state change to its storage backend. MemoryStorage
+ignores them (the original in-memory behaviour); SQLiteStorage queues them
+and writes them in batched transactions so a click never waits on a commit.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+from groupbuy_archive import ArchivedGroup
+from groupbuy_pricing import to_basis_points, to_sen
+
+class MemoryStorage:
+    """Storage backend that keeps nothing; every hook is a no-op"""
+
+    def load_into(self, engine):
+        """Restore saved state into a freshly created engine"""
+
+    def user_registered(self, user):
+        """Called after a new user is added to the registry"""
+
+    def user_updated(self, user):
+        """Called after a user's saved fields (such as the password hash) change"""
+
+    def group_started(self, group):
+        """Called after a new group is created with its starter"""
+
+    def buyer_joined(self, group, buyer):
+        """Called after a buyer joins an open group"""
+
+    def group_closed(self, group):
+        """Called after a group is checked out (completed or failed)"""
+
+    def flush(self):
+        """Write any queued changes"""
+
+    def close(self):
+        """Flush and release resources"""
+
+# ==================== SQLITE BACKEND ====================
+# Money columns hold ringgit (sen / 100); loading turns them back into exact
+# integer sen with ROUND(value * 100), so the engine never sums REALs
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL,  -- encoded password hash (plaintext in databases from before hashing)
+    created_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS groups (
+    group_id INTEGER PRIMARY KEY,
+    product TEXT NOT NULL,
+    price REAL NOT NULL,
+    discount NUMERIC NOT NULL,
+    min_required INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    member_count INTEGER NOT NULL,
+    final_price REAL NOT NULL DEFAULT 0,
+    savings REAL NOT NULL DEFAULT 0,
+    created_at INTEGER NOT NULL,
+    completed_at INTEGER,
+    deadline INTEGER,
+    close_seq INTEGER  -- order in which groups closed (NULL for groups closed before it was recorded)
+);
+CREATE TABLE IF NOT EXISTS buyers (
+    group_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    username TEXT NOT NULL,
+    joined_at INTEGER NOT NULL,
+    PRIMARY KEY (group_id, position)
+);
+CREATE TABLE IF NOT EXISTS engine_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS groups_product ON groups (product);
+CREATE INDEX IF NOT EXISTS groups_status ON groups (status);
+CREATE INDEX IF NOT EXISTS buyers_username ON buyers (username);
+"""
+
+# Fixed statement texts so sqlite3's statement cache reuses the prepared statements
+INSERT_USER_SQL = "INSERT OR REPLACE INTO users (username, password, created_at) VALUES (?, ?, ?)"
+INSERT_GROUP_SQL = ("INSERT OR REPLACE INTO groups (group_id, product, price, discount, min_required, status, "
+                    "member_count, created_at, deadline) VALUES (?, ?, ?, ?, ?, 'open', ?, ?, ?)")
+INSERT_BUYER_SQL = "INSERT OR REPLACE INTO buyers (group_id, position, username, joined_at) VALUES (?, ?, ?, ?)"
+UPDATE_MEMBER_COUNT_SQL = "UPDATE groups SET member_count = ? WHERE group_id = ?"
+CLOSE_GROUP_SQL = ("UPDATE groups SET status = ?, member_count = ?, discount = ?, final_price = ?, savings = ?, "
+                   "completed_at = ?, close_seq = ? WHERE group_id = ?")
+SAVE_STATE_SQL = "INSERT OR REPLACE INTO engine_state (key, value) VALUES (?, ?)"
+
+class SQLiteStorage(MemoryStorage):
+    """SQLite backend (WAL mode) that writes engine changes in batched transactions
+
+    Changes are queued and committed once batch_size changes are pending or
+    flush_interval seconds have passed since the last commit, whichever comes
+    first. Anything still queued is written by flush() or close(). The hooks
+    may be called from several threads; one lock serialises the queue and
+    the connection.
+    """
+
+    def __init__(self, path, batch_size=500, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, cached_statements=64, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        # Databases created before group deadlines (or close order) existed lack the columns
+        group_columns = {row[1] for row in self.connection.execute("PRAGMA table_info(groups)")}
+        if "deadline" not in group_columns:
+            self.connection.execute("ALTER TABLE groups ADD COLUMN deadline INTEGER")
+        if "close_seq" not in group_columns:
+            self.connection.execute("ALTER TABLE groups ADD COLUMN close_seq INTEGER")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS groups_close_order ON groups (close_seq, group_id)")
+        self.connection.commit()
+        self.next_close_seq = (self.connection.execute("SELECT MAX(close_seq) FROM groups").fetchone()[0] or 0) + 1
+
+        self.engine = None
+        self.pending_users = []
+        self.pending_groups = []
+        self.pending_buyers = []
+        self.pending_member_counts = {}  # group_id -> member count
+        self.pending_closes = []
+        self.pending_count = 0
+        self.state_dirty = False
+        self.last_flush = time.monotonic()
+
+    # ----- loading -----
+    def load_into(self, engine):
+        """Restore users, open groups, recent archive records and counters into an engine"""
+        from groupbuy_engine import Buyer, GroupBuy, User
+
+        self.engine = engine
+        cursor = self.connection.cursor()
+
+        for username, password_hash, created_at in cursor.execute(
+                "SELECT username, password, created_at FROM users"):
+            user = User(username, password_hash)
+            user.created_at = created_at
+            engine.registered_users[username] = user
+
+        # Per-user activity totals over every closed group
+        for username, completed_count, failed_count, total_savings_sen in cursor.execute(
+                "SELECT b.username, SUM(g.status = 'completed'), SUM(g.status = 'failed'), "
+                "SUM(CASE WHEN g.status = 'completed' THEN CAST(ROUND(g.savings * 100) AS INTEGER) ELSE 0 END) "
+                "FROM buyers b JOIN groups g ON g.group_id = b.group_id "
+                "WHERE g.status != 'open' GROUP BY b.username"):
+            user = engine.registered_users.get(username)
+            if user is not None:
+                user.completed_count = completed_count
+                user.failed_count = failed_count
+                user.total_savings_sen = total_savings_sen
+
+        state = dict(cursor.execute("SELECT key, value FROM engine_state"))
+        if "app_stats" in state:
+            engine.app_stats.update(json.loads(state["app_stats"]))
+        engine.app_stats["total_users_registered"] = len(engine.registered_users)
+
+        # Revenue rollup, re-aggregated per product and hour of completion
+        for product, hour, revenue_sen, units, savings_sen, groups in cursor.execute(
+                "SELECT product, completed_at - completed_at % 3600 AS hour, "
+                "SUM(CAST(ROUND(final_price * 100) AS INTEGER) * member_count), SUM(member_count), "
+                "SUM(CAST(ROUND(savings * 100) AS INTEGER) * member_count), COUNT(*) "
+                "FROM groups WHERE status = 'completed' GROUP BY product, hour ORDER BY hour"):
+            engine.revenue.record(product, hour, revenue_sen, units, savings_sen, groups)
+
+        # Open groups with their buyers, rebuilt in start order
+        open_groups = {}
+        for group_id, product, price, discount, min_required, created_at, deadline in cursor.execute(
+                "SELECT group_id, product, price, discount, min_required, created_at, deadline "
+                "FROM groups WHERE status = 'open' ORDER BY group_id"):
+            if deadline is None:
+                deadline = created_at + engine.group_duration
+            open_groups[group_id] = (product, price, discount, min_required, created_at, deadline, [])
+        if open_groups:
+            for group_id, username, joined_at in cursor.execute(
+                    "SELECT b.group_id, b.username, b.joined_at FROM buyers b "
+                    "JOIN groups g ON g.group_id = b.group_id "
+                    "WHERE g.status = 'open' ORDER BY b.group_id, b.position"):
+                open_groups[group_id][6].append((username, joined_at))
+
+        for group_id, (product, price, discount, min_required, created_at, deadline, members) in open_groups.items():
+            if not members:
+                continue
+            starter_name, starter_joined_at = members[0]
+            group = GroupBuy(product, to_sen(price), to_basis_points(discount), min_required,
+                             engine.registered_users[starter_name], app_stats=engine.app_stats)
+            group.group_id = group_id
+            group.created_at = created_at
+            group.deadline = deadline
+            group.buyers[0].joined_at = starter_joined_at
+            for username, joined_at in members[1:]:
+                buyer = Buyer(engine.registered_users[username])
+                buyer.joined_at = joined_at
+                group.buyers.append(buyer)
+            engine.restore_open_group(group)
+
+        # Newest closed groups for the archive's in-memory window, in the order they
+        # closed (groups closed before close_seq was recorded sort first, by id)
+        archive = engine.archive
+        newest_closed_sql = ("SELECT group_id, product, price, discount, min_required, final_price, savings, "
+                             "created_at, completed_at, status FROM groups WHERE status != 'open' "
+                             "ORDER BY close_seq DESC, group_id DESC LIMIT ?")
+        closed_rows = cursor.execute(newest_closed_sql, (archive.max_in_memory,)).fetchall()
+        closed_rows.reverse()
+        # Members of exactly those groups: CROSS JOIN keeps the window as the outer loop,
+        # so each group is one primary-key lookup in buyers, however old the group is
+        members_by_group = {}
+        for group_id, username in cursor.execute(
+                f"SELECT b.group_id, b.username FROM ({newest_closed_sql}) AS closed "
+                f"CROSS JOIN buyers b ON b.group_id = closed.group_id ORDER BY b.group_id, b.position",
+                (archive.max_in_memory,)):
+            members_by_group.setdefault(group_id, []).append(username)
+        for (group_id, product, price, discount, min_required, final_price, savings,
+             created_at, completed_at, status) in closed_rows:
+            archive.add(ArchivedGroup(product, price, discount, min_required,
+                                      tuple(members_by_group.get(group_id, ())), final_price, savings,
+                                      created_at, completed_at, status == "completed"))
+        # Archive totals cover every closed group, not just the loaded window
+        archive.successful_count = engine.app_stats["successful_groups"]
+        archive.failed_count = engine.app_stats["failed_groups"]
+        archive.total_archived = archive.successful_count + archive.failed_count
+        archive.items_sold = engine.app_stats["total_items_sold"]
+
+        max_group_id = cursor.execute("SELECT MAX(group_id) FROM groups").fetchone()[0]
+        engine.next_group_id = (max_group_id or 0) + 1
+
+    # ----- change hooks -----
+    def user_registered(self, user):
+        with self.lock:
+            self.pending_users.append((user.username, user.password_hash, user.created_at))
+            self._queued()
+
+    def user_updated(self, user):
+        self.user_registered(user)
+
+    def group_started(self, group):
+        starter = group.buyers[0]
+        with self.lock:
+            self.pending_groups.append((group.group_id, group.product, group.price, group.discount,
+                                        group.min_required, len(group.buyers), group.created_at, group.deadline))
+            self.pending_buyers.append((group.group_id, 0, starter.user.username, starter.joined_at))
+            self.state_dirty = True
+            self._queued()
+
+    def buyer_joined(self, group, buyer):
+        position = len(group.buyers) - 1
+        with self.lock:
+            self.pending_buyers.append((group.group_id, position, buyer.user.username, buyer.joined_at))
+            self.pending_member_counts[group.group_id] = len(group.buyers)
+            self._queued()
+
+    def group_closed(self, group):
+        status = "completed" if group.completed_at else "failed"
+        first_buyer = group.buyers[0]
+        with self.lock:
+            self.pending_closes.append((status, len(group.buyers), group.discount, first_buyer.final_price,
+                                        first_buyer.savings, group.completed_at, self.next_close_seq,
+                                        group.group_id))
+            self.next_close_seq += 1
+            self.state_dirty = True
+            self._queued()
+
+    def _queued(self):
+        """Count a queued change and flush when the batch is full or stale"""
+        self.pending_count += 1
+        if (self.pending_count >= self.batch_size or
+                time.monotonic() - self.last_flush >= self.flush_interval):
+            self.flush()
+
+    # ----- writing -----
+    def flush(self):
+        """Write all queued changes in a single transaction"""
+        with self.lock:
+            self._flush_pending()
+
+    def _flush_pending(self):
+        if self.pending_count == 0 and not self.state_dirty:
+            return
+
+        with self.connection:
+            if self.pending_users:
+                self.connection.executemany(INSERT_USER_SQL, self.pending_users)
+            if self.pending_groups:
+                self.connection.executemany(INSERT_GROUP_SQL, self.pending_groups)
+            if self.pending_buyers:
+                self.connection.executemany(INSERT_BUYER_SQL, self.pending_buyers)
+            if self.pending_member_counts:
+                self.connection.executemany(
+                    UPDATE_MEMBER_COUNT_SQL,
+                    [(count, group_id) for group_id, count in self.pending_member_counts.items()])
+            if self.pending_closes:
+                self.connection.executemany(CLOSE_GROUP_SQL, self.pending_closes)
+            if self.state_dirty and self.engine is not None:
+                self.connection.executemany(SAVE_STATE_SQL, [
+                    ("app_stats", json.dumps(dict(self.engine.app_stats))),
+                    ("total_seller_revenue", json.dumps(self.engine.total_seller_revenue))
+                ])
+
+        self.pending_users = []
+        self.pending_groups = []
+        self.pending_buyers = []
+        self.pending_member_counts = {}
+        self.pending_closes = []
+        self.pending_count = 0
+        self.state_dirty = False
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        """Flush pending changes and close the database"""
+        with self.lock:
+            self._flush_pending()
+            self.connection.close()
@@ -0,0 +1,129 @@
+"""Multi-threaded stress run for the group-buy engine.
+
+Many threads start and join groups for a single hot product at the same time,
+then the run checks that no group was overfilled, every group was checked out
+exactly once, and the statistics agree with a full recount.
+
+    python groupbuy_stress.py --threads 32 --users 4000
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+from groupbuy_engine import GroupBuyEngine, STARTED, JOINED, COMPLETED, FAILED, GROUP_CLOSED, GROUP_EXPIRED
+from groupbuy_passwords import PasswordHasher
+from groupbuy_pricing import to_sen
+
+def hammer_hot_product(engine, product_info, usernames, rounds, seed):
+    """Have each user repeatedly join (or start) a group for one product"""
+    rng = random.Random(seed)
+    outcomes = {}
+    for _ in range(rounds):
+        for username in usernames:
+            user = engine.registered_users[username]
+            open_groups = engine.open_groups(product_info["name"])
+            if open_groups:
+                status, _ = engine.join_group_buy(user, rng.choice(open_groups))
+            else:
+                status, _ = engine.start_group_buy(user, product_info)
+            outcomes[status] = outcomes.get(status, 0) + 1
+    return outcomes
+
+def check_invariants(engine, product_info, completed_count):
+    """Return a list of invariant violations (empty when everything is consistent)"""
+    problems = []
+
+    mismatches = engine.update_app_statistics(consistency_check=True)
+    if mismatches:
+        problems.append(f"statistics drifted from recount: {mismatches}")
+
+    # No deadline passes during the run, so every success closed on reaching its top tier
+    discount_schedule = engine.discount_schedule(product_info)
+    archived = list(engine.archive.iter_records())
+    for record in archived:
+        if record.succeeded and len(record.member_usernames) != discount_schedule.full_size(record.completed_at):
+            problems.append(f"group closed with {len(record.member_usernames)} members: {record}")
+        if len(set(record.member_usernames)) != len(record.member_usernames):
+            problems.append(f"duplicate member in archived group: {record}")
+
+    for group in engine.open_groups(product_info["name"]):
+        if len(group.buyers) >= group.full_size():
+            problems.append(f"open group {group.group_id} is already full ({len(group.buyers)} members)")
+
+    successful = [record for record in archived if record.succeeded]
+    if len(successful) != engine.app_stats["successful_groups"]:
+        problems.append(f"{len(successful)} archived successes but counter says "
+                        f"{engine.app_stats['successful_groups']}")
+    if completed_count != engine.app_stats["successful_groups"]:
+        problems.append(f"callers saw {completed_count} checkouts but counter says "
+                        f"{engine.app_stats['successful_groups']}")
+
+    # Money is integer sen, so the totals must agree exactly
+    expected_revenue_sen = sum(to_sen(record.final_price) * len(record.member_usernames) for record in successful)
+    if expected_revenue_sen != engine.revenue.totals.revenue_sen:
+        problems.append(f"revenue {engine.revenue.totals.revenue_sen} sen != archived {expected_revenue_sen} sen")
+
+    seen = {}
+    for group in engine.open_groups(product_info["name"]):
+        for username in group.member_usernames:
+            if username in seen:
+                problems.append(f"{username} is in open groups {seen[username]} and {group.group_id}")
+            seen[username] = group.group_id
+
+    return problems
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hammer one hot product from many threads")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    # Switch threads as often as possible to provoke interleavings
+    sys.setswitchinterval(1e-6)
+
+    # Cheapest password hashing: this run is about group contention, not logins
+    engine = GroupBuyEngine(password_hasher=PasswordHasher(cost=1))
+    product_info = engine.products_catalog[0]
+    usernames = [f"stress{i:06d}" for i in range(args.users)]
+    for username in usernames:
+        engine.register_user(username, "pass")
+
+    per_thread = [usernames[i::args.threads] for i in range(args.threads)]
+    results = [None] * args.threads
+
+    def run(index):
+        results[index] = hammer_hot_product(engine, product_info, per_thread[index], args.rounds, args.seed + index)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    outcomes = {}
+    for result in results:
+        for status, count in result.items():
+            outcomes[status] = outcomes.get(status, 0) + count
+
+    print(f"🔥 {args.threads} threads, {args.users} users, {sum(outcomes.values())} operations in {elapsed:.2f}s")
+    for status in (STARTED, JOINED, COMPLETED, FAILED, GROUP_CLOSED, GROUP_EXPIRED):
+        print(f"  • {status}: {outcomes.get(status, 0)}")
+
+    problems = check_invariants(engine, product_info, outcomes.get(COMPLETED, 0))
+    if problems:
+        print("❌ INVARIANT VIOLATIONS:")
+        for problem in problems[:20]:
+            print(f"  • {problem}")
+        return 1
+
+    print("✅ No overfilled groups, every checkout happened exactly once, statistics consistent")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())